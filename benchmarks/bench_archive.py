@@ -0,0 +1,103 @@
+"""Recent-window reads before and after moving old years to archive partitions.
+
+Generates a multi-year market, times the hot queries (last 90 days through the partition
+router, one day's prices, one card's recent history), runs `db archive` for every year
+but the last, and times them again.
+
+Usage:
+    uv run python benchmarks/bench_archive.py --cards 1000 --years 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import text
+
+from poke_pricer.analytics.data_access import load_prices_df
+from poke_pricer.db import dispose_engines, get_engine, price_tables, qualified_name
+from poke_pricer.models import day_number
+from poke_pricer.services.archive import archive_prices
+from poke_pricer.services.market import generate_market, write_market_db
+
+END = date(2025, 6, 30)
+WINDOW = END - timedelta(days=90)
+
+
+def _best(fn: Callable[[], object], runs: int = 5) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _window_sql(sql: str, start: date) -> Callable[[], object]:
+    """Run `sql` (with {prices}) against every partition the router keeps for `start`."""
+
+    def run() -> object:
+        with get_engine().connect() as conn:
+            return [
+                conn.execute(
+                    text(sql.format(prices=qualified_name(t))), {"d": day_number(start)}
+                ).all()
+                for t in price_tables(conn, start)
+            ]
+
+    return run
+
+
+def _report(label: str, db: Path) -> None:
+    queries = {
+        "90-day avg per card": _window_sql(
+            "SELECT card_id, AVG(price) FROM {prices} WHERE date >= :d GROUP BY card_id", WINDOW
+        ),
+        "prices on one day": _window_sql(
+            "SELECT card_id, price FROM {prices} WHERE date = :d", END
+        ),
+        "one card, 90 days": _window_sql(
+            "SELECT date, price FROM {prices} WHERE card_id = 7 AND date >= :d", WINDOW
+        ),
+    }
+    size = db.stat().st_size / (1024 * 1024)
+    timings = " | ".join(f"{name} {_best(fn) * 1000:.2f} ms" for name, fn in queries.items())
+    load = _best(lambda: load_prices_df(start=WINDOW), runs=1)
+    print(f"{label:>8}: main file {size:.1f} MiB | {timings} | load_prices_df(90d) {load:.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=1_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--sources", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "bench.db"
+        os.environ["POKEPRICER_POSTGRES_DSN"] = ""
+        os.environ["POKEPRICER_SQLITE_PATH"] = str(db)
+        days = args.years * 365
+        _, rows = write_market_db(generate_market(args.cards, days, args.sources, end=END))
+        print(f"{rows:,} price rows, {END - timedelta(days=days - 1)} to {END}")
+        with get_engine().connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+        _report("before", db)
+
+        archived = archive_prices(END.year)
+        with get_engine().connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+        moved = sum(a.rows for a in archived)
+        print(f"archived {moved:,} rows into {len(archived)} files")
+        _report("after", db)
+        dispose_engines()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Ingest and read throughput: SQLite vs PostgreSQL.
+
+The PostgreSQL database must be a throwaway one: every table in it is dropped first.
+
+Usage:
+    uv run python benchmarks/bench_backends.py --cards 2000 --days 90 \
+        --postgres-dsn postgresql://postgres@localhost/pokepricer_bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import date
+from pathlib import Path
+
+from sqlmodel import SQLModel
+
+from poke_pricer.analytics.data_access import load_prices_df
+from poke_pricer.catalog.stats import catalog_summary_df
+from poke_pricer.db import dispose_engines, get_engine
+from poke_pricer.ingest.csv_ingest import DEFAULT_BATCH_SIZE, ingest_csv
+from poke_pricer.services.market import generate_market, write_market_file
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def _run(label: str, csv_path: Path, rows: int, batch_size: int) -> None:
+    fresh = _timed(lambda: ingest_csv(csv_path, batch_size=batch_size))
+    rerun = _timed(lambda: ingest_csv(csv_path, batch_size=batch_size))
+    load = _timed(load_prices_df)
+    summary = _timed(catalog_summary_df)
+    print(
+        f"{label:>8}: ingest {rows / fresh:>9,.0f} rows/s ({fresh:.2f}s)"
+        f" | re-ingest {rows / rerun:>9,.0f} rows/s ({rerun:.2f}s)"
+        f" | load_prices_df {load:.2f}s | catalog summary {summary:.3f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=2_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--postgres-dsn", default=os.environ.get("POKEPRICER_TEST_POSTGRES_DSN"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        csv_path = root / "market.csv"
+        chunks = generate_market(args.cards, args.days, 3, end=date(2025, 1, 1))
+        _, rows = write_market_file(chunks, csv_path)
+
+        os.environ["POKEPRICER_POSTGRES_DSN"] = ""
+        os.environ["POKEPRICER_SQLITE_PATH"] = str(root / "bench.db")
+        _run("sqlite", csv_path, rows, args.batch_size)
+
+        if not args.postgres_dsn:
+            print("postgres: skipped (no --postgres-dsn)")
+            return
+        os.environ["POKEPRICER_POSTGRES_DSN"] = args.postgres_dsn
+        SQLModel.metadata.drop_all(get_engine())
+        _run("postgres", csv_path, rows, args.batch_size)
+        SQLModel.metadata.drop_all(get_engine())
+        dispose_engines()
+
+
+if __name__ == "__main__":
+    main()
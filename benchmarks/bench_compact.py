@@ -0,0 +1,71 @@
+"""File size and full-scan time of the text price layout vs compact storage.
+
+Generates a market, rewrites its prices into the pre-compact text layout (ISO date and
+source name in every row), then converts it back with `compact_db`.
+
+Usage:
+    uv run python benchmarks/bench_compact.py --cards 5000 --days 90
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from poke_pricer.db import dispose_engines, get_engine
+from poke_pricer.services.compact import compact_db
+from poke_pricer.services.market import generate_market, write_market_db
+
+_TO_TEXT_LAYOUT = """
+DROP TABLE card_latest;
+CREATE TABLE pricepoint_text (
+    id INTEGER NOT NULL, card_id INTEGER NOT NULL, date DATE NOT NULL,
+    source VARCHAR NOT NULL, price FLOAT NOT NULL, PRIMARY KEY (id),
+    CONSTRAINT uq_price_card_date_source UNIQUE (card_id, date, source),
+    FOREIGN KEY(card_id) REFERENCES card (id)
+);
+INSERT INTO pricepoint_text
+    SELECT p.id, p.card_id, date(p.date * 86400, 'unixepoch'), s.name, p.price
+    FROM pricepoint p JOIN source s ON s.id = p.source ORDER BY p.id;
+DROP TABLE pricepoint;
+DROP TABLE source;
+ALTER TABLE pricepoint_text RENAME TO pricepoint;
+CREATE INDEX ix_price_date ON pricepoint (date);
+VACUUM;
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=5_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--sources", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "bench.db"
+        os.environ["POKEPRICER_POSTGRES_DSN"] = ""
+        os.environ["POKEPRICER_SQLITE_PATH"] = str(db)
+        write_market_db(generate_market(args.cards, args.days, args.sources, end=date(2025, 1, 1)))
+        with get_engine().connect() as conn:
+            conn.connection.executescript(_TO_TEXT_LAYOUT)
+        dispose_engines(db)
+
+        r = compact_db()
+        mib = 1024 * 1024
+        print(f"rows: {r.rows:,}")
+        print(
+            f"file size: text {r.size_before / mib:.1f} MiB -> compact {r.size_after / mib:.1f}"
+            f" MiB ({r.size_after / r.size_before:.0%})"
+        )
+        print(
+            f"full scan: text {r.scan_before * 1000:.0f} ms -> compact {r.scan_after * 1000:.0f} ms"
+        )
+        dispose_engines()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Memory and analytics time of the price frame with default and compact dtypes.
+
+Generates a market, prints the per-column memory report (`prices memory`) and times the
+analytics that consume the frame (signals, momentum backtest, daily movers, anomaly
+scan) on each dtypes mode.
+
+Usage:
+    uv run python benchmarks/bench_dtypes.py --cards 2000 --days 365
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import get_args
+
+import pandas as pd
+
+from poke_pricer.analytics.backtest import backtest_momentum_topk
+from poke_pricer.analytics.data_access import load_prices_df, price_memory_report
+from poke_pricer.analytics.movers import compute_top_movers
+from poke_pricer.analytics.signals import compute_signals
+from poke_pricer.config import PriceDtypes
+from poke_pricer.reports.anomalies import scan_anomalies_df
+from poke_pricer.services.market import generate_market, write_market_db
+
+ANALYTICS: dict[str, Callable[[pd.DataFrame], object]] = {
+    "signals": compute_signals,
+    "backtest": lambda df: backtest_momentum_topk(df, top_k=5),
+    "movers": compute_top_movers,
+    "anomalies": scan_anomalies_df,
+}
+
+
+def _seconds(fn: Callable[[pd.DataFrame], object], df: pd.DataFrame) -> float:
+    t0 = time.perf_counter()
+    fn(df)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=2_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sources", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["POKEPRICER_POSTGRES_DSN"] = ""
+        os.environ["POKEPRICER_SQLITE_PATH"] = str(Path(tmp) / "bench.db")
+        os.environ["POKEPRICER_DATA_DIR"] = str(Path(tmp) / "data")
+        _, rows = write_market_db(generate_market(args.cards, args.days, args.sources))
+        print(f"{rows:,} price rows; MiB per column:")
+        print((price_memory_report() / (1024 * 1024)).round(2).to_string())
+        for kind in get_args(PriceDtypes):
+            df = load_prices_df(dtypes=kind)
+            timings = " | ".join(
+                f"{name} {_seconds(fn, df):.3f}s" for name, fn in ANALYTICS.items()
+            )
+            print(f"{kind:>16}: {timings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Ingest throughput: row-by-row vs bulk `ingest_csv`.
+
+Usage:
+    uv run python benchmarks/bench_ingest.py --rows 20000 --cards 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from random import Random
+
+from poke_pricer.ingest.csv_ingest import DEFAULT_BATCH_SIZE, ingest_csv
+
+
+def write_synthetic_csv(
+    path: Path, rows: int, cards: int, seed: int = 7, start: date = date(2024, 1, 1)
+) -> None:
+    """Write `rows` price rows spread over `cards` cards (one row per card per day)."""
+    rng = Random(seed)
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "set_code", "number", "date", "price", "source", "rarity"])
+        for i in range(rows):
+            card = i % cards
+            day = start + timedelta(days=i // cards)
+            price = round(rng.uniform(1.0, 500.0), 2)
+            w.writerow([f"Card {card}", "BENCH", f"{card}/999", day, price, "bench", "Common"])
+
+
+def _run(csv_path: Path, db_path: Path, *, bulk: bool, batch_size: int) -> float:
+    os.environ["POKEPRICER_SQLITE_PATH"] = str(db_path)
+    t0 = time.perf_counter()
+    ingest_csv(csv_path, default_source="bench", bulk=bulk, batch_size=batch_size)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--cards", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        csv_path = root / "prices.csv"
+        write_synthetic_csv(csv_path, rows=args.rows, cards=args.cards)
+
+        for label, bulk in (("row-by-row", False), ("bulk", True)):
+            db_path = root / f"{label}.db"
+            first = _run(csv_path, db_path, bulk=bulk, batch_size=args.batch_size)
+            rerun = _run(csv_path, db_path, bulk=bulk, batch_size=args.batch_size)
+            print(
+                f"{label:>10}: fresh {args.rows / first:>10,.0f} rows/s ({first:.2f}s)"
+                f" | re-ingest {args.rows / rerun:>10,.0f} rows/s ({rerun:.2f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Wall-clock scaling of `ingest_dir` with 1..8 parse/validate workers.
+
+Usage:
+    uv run python benchmarks/bench_ingest_dir.py --files 16 --rows 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from bench_ingest import write_synthetic_csv
+
+from poke_pricer.ingest.csv_ingest import ingest_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=20_000, help="Rows per file")
+    parser.add_argument("--cards", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} files={args.files} rows/file={args.rows}")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        in_dir = root / "in"
+        in_dir.mkdir()
+        days_per_file = -(-args.rows // args.cards)
+        for i in range(args.files):
+            start = date(2020, 1, 1) + timedelta(days=i * days_per_file)
+            path = in_dir / f"day_{i:04d}.csv"
+            write_synthetic_csv(path, args.rows, args.cards, seed=i, start=start)
+
+        total_rows = args.files * args.rows
+        base: float | None = None
+        for workers in args.workers:
+            os.environ["POKEPRICER_SQLITE_PATH"] = str(root / f"w{workers}.db")
+            t0 = time.perf_counter()
+            ingest_dir(in_dir, default_source="bench", workers=workers)
+            elapsed = time.perf_counter() - t0
+            base = base or elapsed
+            print(
+                f"workers={workers}: {elapsed:6.2f}s  {total_rows / elapsed:>10,.0f} rows/s"
+                f"  speedup x{base / elapsed:.2f}"
+            )
+
+        # Nightly rerun over the same folder: the manifest skips unchanged files unread,
+        # unless forced to re-parse them and attempt every insert again.
+        for force in (True, False):
+            t0 = time.perf_counter()
+            ingest_dir(in_dir, default_source="bench", force=force)
+            elapsed = time.perf_counter() - t0
+            print(f"rerun {'(--force)' if force else '(manifest)'}: {elapsed:6.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""load_prices_df: the columnar loader against the previous row-by-row implementation.
+
+Generates a market, loads every price with both loaders, checks the frames are identical
+and reports wall time for each (plus peak traced memory with --memory, which makes
+both runs considerably slower).
+
+Usage:
+    uv run python benchmarks/bench_load_prices.py --cards 2000 --days 365
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from sqlalchemy import select
+from sqlmodel import col
+
+from poke_pricer.analytics.data_access import load_prices_df
+from poke_pricer.db import FETCH_ROWS, dispose_engines, get_engine, price_tables
+from poke_pricer.models import Card
+from poke_pricer.services.market import generate_market, write_market_db
+
+
+def load_prices_df_rows() -> pd.DataFrame:
+    """The previous implementation: one dict and one pd.to_datetime call per row."""
+    records: list[dict[str, Any]] = []
+    with get_engine().connect() as conn:
+        for t in price_tables(conn):
+            stmt = select(
+                t.c.card_id,
+                col(Card.name),
+                col(Card.set_code),
+                col(Card.number),
+                t.c.date,
+                t.c.source,
+                t.c.price,
+            ).join(Card, onclause=(t.c.card_id == Card.id))  # type: ignore[arg-type]
+            rows = conn.execute(stmt.execution_options(yield_per=FETCH_ROWS))
+            for card_id, name, set_code, number, day, source, price in rows:
+                records.append(
+                    {
+                        "card_id": card_id,
+                        "name": name,
+                        "set_code": set_code,
+                        "number": number,
+                        "date": pd.to_datetime(day),
+                        "source": source,
+                        "price": float(price),
+                    }
+                )
+    df = pd.DataFrame.from_records(records)
+    return df.sort_values(["card_id", "date"], kind="stable").reset_index(drop=True)
+
+
+def _timed(fn: Callable[[], pd.DataFrame]) -> tuple[pd.DataFrame, float]:
+    t0 = time.perf_counter()
+    df = fn()
+    return df, time.perf_counter() - t0
+
+
+def _peak_mib(fn: Callable[[], pd.DataFrame]) -> float:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=2_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sources", type=int, default=2)
+    parser.add_argument("--memory", action="store_true", help="also trace peak memory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["POKEPRICER_POSTGRES_DSN"] = ""
+        os.environ["POKEPRICER_SQLITE_PATH"] = str(Path(tmp) / "bench.db")
+        _, rows = write_market_db(generate_market(args.cards, args.days, args.sources))
+        print(f"{rows:,} price rows")
+        frames = {}
+        for label, fn in (("rows", load_prices_df_rows), ("columnar", load_prices_df)):
+            frames[label], elapsed = _timed(fn)
+            peak = f" | peak {_peak_mib(fn):7.1f} MiB" if args.memory else ""
+            print(f"{label:>9}: {elapsed:6.2f}s{peak}")
+        pd.testing.assert_frame_equal(frames["columnar"], frames["rows"])
+        print("frames identical")
+        dispose_engines()
+
+
+if __name__ == "__main__":
+    main()
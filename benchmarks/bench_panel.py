@@ -0,0 +1,129 @@
+"""Analytics on one shared PricePanel against the previous per-function groupbys.
+
+Generates a market, loads every price, then times the previous row-based
+implementations of the signals, momentum backtest and anomaly scan (one groupby per
+signal and window, on the long frame), each analytics function on the frame (building
+its own panel), and one panel build shared by all five functions.
+
+Usage:
+    uv run python benchmarks/bench_panel.py --cards 2000 --days 365
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+
+from poke_pricer.analytics.backtest import backtest_momentum_topk
+from poke_pricer.analytics.data_access import load_prices_df
+from poke_pricer.analytics.movers import compute_top_movers
+from poke_pricer.analytics.panel import PricePanel
+from poke_pricer.analytics.signals import compute_signals
+from poke_pricer.reports.anomalies import scan_anomalies_df
+from poke_pricer.reports.top_movers import compute_top_movers as report_top_movers
+from poke_pricer.services.market import generate_market, write_market_db
+
+ANALYTICS: dict[str, Callable[[pd.DataFrame | PricePanel], object]] = {
+    "signals": compute_signals,
+    "backtest": lambda data: backtest_momentum_topk(data, top_k=5),
+    "movers": compute_top_movers,
+    "anomalies": scan_anomalies_df,
+    "report top movers": report_top_movers,
+}
+
+
+def signals_rows(df: pd.DataFrame, windows: tuple[int, ...] = (7, 14, 30)) -> pd.DataFrame:
+    """The previous compute_signals: windows of rows, one groupby per signal."""
+    out = df.sort_values(["card_id", "date"], kind="stable").reset_index(drop=True)
+    out["ret"] = out.groupby("card_id")["price"].pct_change()
+    for w in windows:
+        out[f"sma_{w}"] = out.groupby("card_id")["price"].transform(
+            lambda s, w=w: s.rolling(w, min_periods=w).mean()
+        )
+        out[f"mom_{w}"] = out.groupby("card_id")["price"].transform(
+            lambda s, w=w: s / s.shift(w) - 1.0
+        )
+    return out
+
+
+def backtest_rows(df: pd.DataFrame, lookback: int = 14, top_k: int = 5) -> pd.DataFrame:
+    """The previous backtest_momentum_topk: a groupby per column, then a loop over dates."""
+    data = df.sort_values(["card_id", "date"], kind="stable").reset_index(drop=True)
+    data["mom"] = data.groupby("card_id")["price"].transform(lambda s: s / s.shift(lookback) - 1.0)
+    data["fwd_ret"] = data.groupby("card_id")["price"].shift(-1) / data["price"] - 1.0
+    results = []
+    for d, g in data.groupby("date", sort=True):
+        picks = g[["mom", "fwd_ret"]].dropna()
+        if not picks.empty:
+            top = picks.sort_values("mom", ascending=False).head(top_k)
+            results.append({"date": d, "portfolio_return": float(top["fwd_ret"].mean())})
+    return pd.DataFrame(results)
+
+
+def anomalies_rows(df: pd.DataFrame, lookback: int = 30) -> pd.DataFrame:
+    """The previous scan_anomalies_df's per-row work: rolling extremes over rows."""
+    work = df.sort_values(["card_id", "date"], kind="stable")
+    work["return_1d"] = work.groupby("card_id")["price"].pct_change()
+    for name, how in (("roll_max", "max"), ("roll_min", "min")):
+        work[name] = (
+            work.groupby("card_id")["price"]
+            .transform(lambda s, how=how: getattr(s.rolling(lookback, min_periods=1), how)())
+            .shift(1)
+        )
+    return work[work["date"] == work["date"].max()]
+
+
+def _seconds(fn: Callable[..., object], *args: object) -> float:
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=2_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sources", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["POKEPRICER_POSTGRES_DSN"] = ""
+        os.environ["POKEPRICER_SQLITE_PATH"] = str(Path(tmp) / "bench.db")
+        os.environ["POKEPRICER_DATA_DIR"] = str(Path(tmp) / "data")
+        _, rows = write_market_db(generate_market(args.cards, args.days, args.sources))
+        df = load_prices_df()
+        print(f"{rows:,} price rows")
+
+        previous = {
+            "signals": _seconds(signals_rows, df),
+            "backtest": _seconds(backtest_rows, df),
+            "anomalies": _seconds(anomalies_rows, df),
+        }
+        for name, seconds in previous.items():
+            print(f"{'previous ' + name:<28} {seconds:7.3f}s")
+
+        on_frame = {name: _seconds(fn, df) for name, fn in ANALYTICS.items()}
+        t0 = time.perf_counter()
+        panel = PricePanel.from_frame(df)
+        build = time.perf_counter() - t0
+        on_panel = {name: _seconds(fn, panel) for name, fn in ANALYTICS.items()}
+        for name in ANALYTICS:
+            print(f"{name:<28} {on_frame[name]:7.3f}s | on a built panel {on_panel[name]:7.3f}s")
+        print(
+            f"{'panel build':<28} {build:7.3f}s ({panel.shape[0]:,} cards x "
+            f"{panel.shape[1]:,} days, {panel.values.nbytes / 2**20:.1f} MiB)"
+        )
+        print(
+            f"{'all five':<28} {sum(on_frame.values()):7.3f}s | one shared panel "
+            f"{build + sum(on_panel.values()):7.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Incremental signal_values materialization against a full rebuild after a nightly ingest.
+
+Generates a market, materializes its signals once, then ingests one more day of prices
+for every card (a nightly run) and times bringing signal_values up to date
+incrementally, then rebuilding it in full, checking both leave identical tables.
+
+Usage:
+    uv run python benchmarks/bench_signal_values.py --cards 10000 --days 365
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import text
+
+from poke_pricer.analytics.data_access import load_latest_df
+from poke_pricer.db import get_engine
+from poke_pricer.ingest.csv_ingest import ingest_csv
+from poke_pricer.services.market import generate_market, write_market_db
+from poke_pricer.services.signal_values import SignalRun, materialize_signals
+
+
+def _next_day_csv(path: Path) -> int:
+    """A CSV of every card's latest price moved a little, dated the day after."""
+    latest = load_latest_df()
+    rng = np.random.default_rng(0)
+    latest["date"] = (latest["date"] + np.timedelta64(1, "D")).dt.strftime("%Y-%m-%d")
+    latest["price"] = (latest["price"] * rng.lognormal(0, 0.02, len(latest))).round(2)
+    cols = ["name", "set_code", "number", "date", "price", "source"]
+    latest[cols].to_csv(path, index=False)
+    return len(latest)
+
+
+def _keep_copy() -> None:
+    with get_engine().begin() as conn:
+        conn.execute(text("CREATE TABLE signal_values_before AS SELECT * FROM signal_values"))
+
+
+def _same_as_copy() -> bool:
+    """Whether signal_values holds exactly the copied rows (EXCEPT matches NULLs too)."""
+    with get_engine().connect() as conn:
+        return not any(
+            conn.execute(
+                text(f"SELECT 1 FROM (SELECT * FROM {a} EXCEPT SELECT * FROM {b}) AS d")
+            ).first()
+            for a, b in (
+                ("signal_values", "signal_values_before"),
+                ("signal_values_before", "signal_values"),
+            )
+        )
+
+
+def _timed(full: bool) -> tuple[float, SignalRun]:
+    t0 = time.perf_counter()
+    run = materialize_signals(full=full)
+    return time.perf_counter() - t0, run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sources", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["POKEPRICER_POSTGRES_DSN"] = ""
+        os.environ["POKEPRICER_SQLITE_PATH"] = str(Path(tmp) / "bench.db")
+        os.environ["POKEPRICER_DATA_DIR"] = str(Path(tmp) / "data")
+        _, rows = write_market_db(generate_market(args.cards, args.days, args.sources))
+        first, run = _timed(full=True)
+        print(f"{rows:,} price rows: first build {first:7.2f}s ({run.rows:,} signal rows)")
+
+        new = _next_day_csv(Path(tmp) / "next.csv")
+        ingest_csv(Path(tmp) / "next.csv")
+        incremental, run = _timed(full=False)
+        assert not run.full
+        print(
+            f"after ingesting {new:,} prices: incremental {incremental:7.2f}s "
+            f"({run.cards:,} cards, {run.rows:,} rows written)"
+        )
+        _keep_copy()
+        full, run = _timed(full=True)
+        assert _same_as_copy(), "incremental and full tables differ"
+        print(
+            f"{'':>{len(f'after ingesting {new:,} prices:')}} full rebuild {full:7.2f}s "
+            f"({run.rows:,} rows written, {full / incremental:.1f}x); tables identical"
+        )
+
+
+if __name__ == "__main__":
+    main()
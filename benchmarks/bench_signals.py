@@ -0,0 +1,111 @@
+"""compute_signals on observations against the dense panel and the row-based groupbys.
+
+For 1k, 10k and 100k generated cards, times `compute_signals` three ways on the same
+price frame:
+  - rows: the original implementation, a groupby lambda per card, signal and window
+    (windows of rows rather than days, so its values differ);
+  - panel: the previous calendar-day implementation on the dense cards x days arrays
+    (`returns`/`rolling` primitives on each source's layer), checked bit-for-bit against
+  - current: `compute_signals`, one pass over the observed cells for every window.
+
+Usage:
+    uv run python benchmarks/bench_signals.py --days 90 --windows 7 14 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from poke_pricer.analytics.panel import PricePanel, returns, rolling
+from poke_pricer.analytics.signals import compute_signals
+from poke_pricer.services.market import generate_market
+
+
+def market_frame(cards: int, days: int, sources: int) -> pd.DataFrame:
+    """A generated market as `load_prices_df` would return it, without a database."""
+    parts = []
+    for chunk in generate_market(cards, days, sources, end=date(2025, 6, 30)):
+        prices = chunk.prices.to_pandas()
+        attrs = chunk.cards.to_pandas().set_index("id").reindex(prices["card_id"])
+        for c in ("name", "set_code", "number"):
+            prices[c] = attrs[c].to_numpy()
+        parts.append(prices)
+    df = pd.concat(parts, ignore_index=True)
+    df["date"] = pd.to_datetime(df["date"])
+    df["source"] = df["source"].astype(object)
+    return df
+
+
+def signals_rows(df: pd.DataFrame, windows: list[int]) -> pd.DataFrame:
+    """The original compute_signals: windows of rows, one groupby lambda per signal."""
+    out = df.sort_values(["card_id", "date"], kind="stable").reset_index(drop=True)
+    out["ret"] = out.groupby("card_id")["price"].pct_change()
+    for w in windows:
+        out[f"sma_{w}"] = out.groupby("card_id")["price"].transform(
+            lambda s, w=w: s.rolling(w, min_periods=w).mean()
+        )
+        out[f"mom_{w}"] = out.groupby("card_id")["price"].transform(
+            lambda s, w=w: s / s.shift(w) - 1.0
+        )
+    return out
+
+
+def signals_panel(df: pd.DataFrame, windows: list[int]) -> pd.DataFrame:
+    """The previous compute_signals: the panel primitives on the dense arrays, one
+    source's layer at a time."""
+    panel = PricePanel.from_frame(df)
+    cells: list[tuple[np.ndarray, ...]] = []
+    computed: dict[str, list[np.ndarray]] = {}
+    for k, source in enumerate(panel.sources):
+        v = panel.source_values(source)
+        age = np.arange(1, v.shape[1] + 1) - np.argmax(~np.isnan(v), axis=1)[:, None]
+        columns = {"price": v, "ret": returns(v, 1)}
+        for w in windows:
+            columns[f"sma_{w}"] = np.where(age >= w, rolling(v, w, "mean"), np.nan)
+            columns[f"mom_{w}"] = returns(v, w)
+        card, day = np.nonzero(~np.isnan(v))
+        cells.append((card, np.full(len(card), k), day))
+        for name, values in columns.items():
+            computed.setdefault(name, []).append(values[card, day])
+    card, code, day = (np.concatenate(parts) for parts in zip(*cells, strict=True))
+    return panel.source_cells_frame(
+        card, code, day, {name: np.concatenate(parts) for name, parts in computed.items()}
+    )
+
+
+def _timed(
+    fn: Callable[..., pd.DataFrame], df: pd.DataFrame, windows: list[int]
+) -> tuple[float, pd.DataFrame]:
+    t0 = time.perf_counter()
+    out = fn(df, windows=windows)
+    return time.perf_counter() - t0, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--sources", type=int, default=2)
+    parser.add_argument("--windows", type=int, nargs="+", default=[7, 14, 30])
+    args = parser.parse_args()
+
+    for cards in args.cards:
+        df = market_frame(cards, args.days, args.sources)
+        rows, _ = _timed(signals_rows, df, args.windows)
+        panel, expected = _timed(signals_panel, df, args.windows)
+        current, got = _timed(compute_signals, df, args.windows)
+        pd.testing.assert_frame_equal(got, expected, check_exact=True)
+        print(
+            f"{cards:>7,} cards, {len(df):>10,} rows: rows {rows:7.2f}s | panel {panel:6.2f}s"
+            f" | current {current:6.2f}s ({rows / current:5.1f}x, {panel / current:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
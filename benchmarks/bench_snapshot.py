@@ -0,0 +1,112 @@
+"""Cold-start loads from SQL against the memory-mapped price snapshot.
+
+Generates a market, then times what a fresh `poke-pricer` process loads before it can
+start work (`backtest momentum`: every price; `signals compute`: every price in chunks;
+`movers top`/`alerts scan`: the latest day plus a lookback) straight from SQL and from
+the snapshot. Also times building the snapshot, refreshing it after one more day is
+ingested, and whole CLI runs in subprocesses both ways.
+
+Usage:
+    uv run python benchmarks/bench_snapshot.py --cards 2000 --days 365
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+
+from poke_pricer.analytics.data_access import (
+    iter_prices,
+    load_price_window,
+    load_prices_df,
+    price_snapshot,
+)
+from poke_pricer.analytics.frame_cache import clear_frame_cache
+from poke_pricer.ingest.csv_ingest import ingest_csv
+from poke_pricer.services.market import generate_market, write_market_db
+
+LOADS: dict[str, Callable[[], object]] = {
+    "backtest momentum (full history)": load_prices_df,
+    "signals compute (chunked history)": lambda: sum(len(c) for c in iter_prices()),
+    "movers top (31-day window)": lambda: load_price_window(None, 31),
+    "alerts scan (30-day window)": lambda: load_price_window(None, 30),
+}
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    clear_frame_cache()  # as in a new process
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def _cli(tmp: Path, *args: str) -> float:
+    t0 = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "poke_pricer", *args, "--out", str(tmp / "out.csv")],
+        check=True,
+        capture_output=True,
+    )
+    return time.perf_counter() - t0
+
+
+def _next_day(tmp: Path) -> Path:
+    """Every card's latest price again, one day later (a nightly ingest)."""
+    df = load_prices_df()
+    last = df[df["date"] == df["date"].max()]
+    path = tmp / "next_day.csv"
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "set_code", "number", "date", "price", "source"])
+        day = (df["date"].max() + timedelta(days=1)).date().isoformat()
+        for r in last.itertuples():
+            w.writerow([r.name, r.set_code, r.number, day, f"{r.price * 1.01:.2f}", r.source])
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=2_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--sources", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        os.environ["POKEPRICER_POSTGRES_DSN"] = ""
+        os.environ["POKEPRICER_SQLITE_PATH"] = str(tmp / "bench.db")
+        os.environ["POKEPRICER_DATA_DIR"] = str(tmp / "data")
+        _, rows = write_market_db(generate_market(args.cards, args.days, args.sources))
+        print(f"{rows:,} price rows")
+
+        os.environ["POKEPRICER_PRICE_SNAPSHOT"] = "0"
+        sql = {name: _timed(fn) for name, fn in LOADS.items()}
+        os.environ["POKEPRICER_PRICE_SNAPSHOT"] = "1"
+        build = _timed(price_snapshot)
+        snap = {name: _timed(fn) for name, fn in LOADS.items()}
+        for name in LOADS:
+            print(f"{name:<36} SQL {sql[name]:7.3f}s | snapshot {snap[name]:7.3f}s")
+        print(f"{'snapshot build':<36} {build:.3f}s")
+
+        ingest_csv(_next_day(tmp))
+        print(f"{'refresh after one more day':<36} {_timed(price_snapshot):.3f}s")
+
+        for command in (["backtest", "momentum"], ["movers", "top"]):
+            os.environ["POKEPRICER_PRICE_SNAPSHOT"] = "0"
+            without = _cli(tmp, *command)
+            os.environ["POKEPRICER_PRICE_SNAPSHOT"] = "1"
+            with_snapshot = _cli(tmp, *command)
+            label = "poke-pricer " + " ".join(command)
+            print(f"{label:<36} SQL {without:7.3f}s | snapshot {with_snapshot:7.3f}s (whole run)")
+
+
+if __name__ == "__main__":
+    main()
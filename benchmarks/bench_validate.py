@@ -0,0 +1,66 @@
+"""Validation throughput: per-row `PriceRow.model_validate` vs columnar `validate_csv`.
+
+Usage:
+    uv run python benchmarks/bench_validate.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import tempfile
+import time
+from pathlib import Path
+
+from bench_ingest import write_synthetic_csv
+from pydantic import ValidationError
+
+from poke_pricer.ingest.csv_ingest import validate_csv
+from poke_pricer.ingest.schema import PriceRow
+
+
+def validate_per_row(path: Path) -> tuple[int, int]:
+    """The previous implementation: one pydantic model per row."""
+    valid = 0
+    invalid = 0
+    with path.open("r", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                PriceRow.model_validate(dict(row))
+                valid += 1
+            except ValidationError:
+                invalid += 1
+    return (valid, invalid)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cards", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "prices.csv"
+        write_synthetic_csv(csv_path, rows=args.rows, cards=args.cards)
+        with csv_path.open("a", newline="") as f:
+            f.write("Bad,BENCH,1/999,2024-02-30,1.00,bench,Common\n")
+            f.write("Bad,BENCH,1/999,2024-01-01,n/a,bench,Common\n")
+
+        warmup = Path(tmp) / "warmup.csv"
+        write_synthetic_csv(warmup, rows=100, cards=10)
+
+        timings = {}
+        results = {}
+        for label, fn in (("per-row", validate_per_row), ("columnar", validate_csv)):
+            fn(warmup)  # one-off import/initialization costs are not per-row work
+            t0 = time.perf_counter()
+            results[label] = fn(csv_path)
+            timings[label] = time.perf_counter() - t0
+            rate = (args.rows + 2) / timings[label]
+            print(f"{label:>9}: {timings[label]:6.2f}s  {rate:>12,.0f} rows/s  {results[label]}")
+        assert results["per-row"] == results["columnar"], results
+        print(f"speedup x{timings['per-row'] / timings['columnar']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from typing import Any
-
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
 
+from .panel import PricePanel, ffill, rank, returns, shift
+
 
 def backtest_momentum_topk(
-    df: DataFrame,
+    df: DataFrame | PricePanel,
     *,
     lookback: int = 14,
     top_k: int = 1,
@@ -16,43 +17,32 @@ def backtest_momentum_topk(
     date_col: str = "date",
 ) -> DataFrame:
     """
-    Simple cross-sectional momentum backtest:
-      - For each date, pick top_k cards by momentum over `lookback` days.
-      - Portfolio return for that date = average next-day return of picks.
+    Simple cross-sectional momentum backtest, over calendar days:
+      - For each date, pick top_k cards by momentum over `lookback` days (price against
+        the last one observed `lookback` days earlier).
+      - Portfolio return for that date = average next-day return of picks (the price
+        held on the next day against today's).
       - Equity = cumulative product of (1 + portfolio_return).
 
+    `df` is a long price frame or the `PricePanel` of one.
+
     Robust to tiny datasets: if no valid picks exist (e.g., too short history),
     returns an empty DataFrame with columns ["date", "portfolio_return", "equity"].
     """
-    data = df.sort_values([id_col, date_col], kind="stable").reset_index(drop=True).copy()
-
-    # Ensure needed columns exist; compute them if absent.
-    if "ret" not in data:
-        data["ret"] = data.groupby(id_col)[price_col].pct_change()
-
-    if "mom" not in data:
-        # momentum over `lookback` days
-        data["mom"] = data.groupby(id_col)[price_col].transform(
-            lambda s: s / s.shift(lookback) - 1.0
-        )
-
-    if "fwd_ret" not in data:
-        data["fwd_ret"] = data.groupby(id_col)[price_col].shift(-1) / data[price_col] - 1.0
-
-    results: list[dict[str, Any]] = []
-    for d, g in data.groupby(date_col, sort=True):
-        picks = g[["mom", "fwd_ret"]].dropna()
-        if picks.empty:
-            continue
-        picks = picks.sort_values("mom", ascending=False).head(top_k)
-        port_ret = float(picks["fwd_ret"].mean())
-        results.append({"date": d, "portfolio_return": port_ret})
-
-    bt = pd.DataFrame(results)
-    if bt.empty:
+    panel = PricePanel.of(df, price_col=price_col, id_col=id_col, date_col=date_col)
+    prices = panel.values
+    mom = returns(prices, lookback)
+    fwd_ret = shift(ffill(prices), -1) / prices - 1.0
+    mom[np.isnan(fwd_ret)] = np.nan
+
+    picked = rank(mom) <= top_k
+    count = picked.sum(axis=0)
+    total = np.where(picked, fwd_ret, 0.0).sum(axis=0, dtype=np.float64)
+    days = count > 0
+    if not days.any():
         # Return a schema-stable empty frame (so callers can write it safely).
         return pd.DataFrame(columns=["date", "portfolio_return", "equity"])
 
-    bt = bt.sort_values("date", kind="stable").reset_index(drop=True)
+    bt = pd.DataFrame({"date": panel.dates[days], "portfolio_return": total[days] / count[days]})
     bt["equity"] = (1.0 + bt["portfolio_return"]).cumprod()
     return bt
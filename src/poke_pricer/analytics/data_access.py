@@ -1,41 +1,787 @@
 from __future__ import annotations
 
-from typing import Any
+import sys
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import date, timedelta
+from typing import Any, NamedTuple, get_args
 
+import numpy as np
 import pandas as pd
-from sqlmodel import Session, select
+from sqlalchemy import BindParameter, Select, Table, TextClause, bindparam, func, text
+from sqlalchemy import select as sa_select
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import col
 
-from ..db import get_engine
-from ..models import Card, PricePoint
+from ..config import PriceDtypes
+from ..db import (
+    FETCH_ROWS,
+    ID_BATCH,
+    CardKey,
+    current_settings,
+    data_version,
+    ensure_card_latest,
+    find_card_ids,
+    get_engine,
+    get_session,
+    price_tables,
+    qualified_name,
+)
+from ..models import Card, CardLatest, Source, day_number
+from .frame_cache import cached_frame
+from .snapshot import (
+    ROW_DTYPES,
+    PriceSnapshot,
+    append_snapshot,
+    merge_rows,
+    read_snapshot,
+    snapshot_root,
+    write_snapshot,
+)
 
+PRICE_COLUMNS = ["card_id", "name", "set_code", "number", "date", "source", "price"]
+_CARD_COLUMNS = ["name", "set_code", "number"]
+# Stored price fields as fetched from a partition: day numbers and source ids.
+_PRICE_DTYPES = {
+    "id": np.int64,
+    "card_id": np.int64,
+    "date": np.int64,
+    "source": np.int64,
+    "price": np.float64,
+}
+_CARD_DIMENSION = sa_select(col(Card.id), col(Card.name), col(Card.set_code), col(Card.number))
+_SOURCE_DIMENSION = sa_select(col(Source.id), col(Source.name)).order_by(col(Source.id))
 
-def load_prices_df() -> pd.DataFrame:
-    """Return dataframe with columns:
-    card_id, name, set_code, number, date (datetime64), source, price (float)."""
+LATEST_COLUMNS = [
+    "card_id",
+    "name",
+    "set_code",
+    "number",
+    "date",
+    "source",
+    "price",
+    "prev_date",
+    "prev_price",
+    "return_1d",
+]
+
+
+def _query(sql: str, params: Mapping[str, Any]) -> TextClause:
+    """`sql` with list-valued parameters bound as expanding `IN` lists."""
+    lists: list[BindParameter[Any]] = [
+        bindparam(k, expanding=True) for k, v in params.items() if isinstance(v, list)
+    ]
+    return text(sql).bindparams(*lists)
+
+
+class _PriceFilter(NamedTuple):
+    where: list[str]  # SQL conditions on a price partition
+    params: dict[str, Any]
+    batches: list[list[int] | None]  # card ids bound per pass (ascending); [None]: any card
+
+
+def _where(where: Sequence[str]) -> str:
+    return f" WHERE {' AND '.join(where)}" if where else ""
+
+
+def _batch_params(f: _PriceFilter, batch: list[int] | None) -> dict[str, Any]:
+    return f.params if batch is None else {**f.params, "card_ids": batch}
+
+
+def _id_batches(ids: Sequence[int]) -> list[list[int] | None]:
+    ordered = sorted(ids)
+    return [ordered[i : i + ID_BATCH] for i in range(0, len(ordered), ID_BATCH)]
+
+
+def _price_filter(
+    conn: Connection,
+    start: date | None,
+    end: date | None,
+    ids: set[int] | None,
+    sources: Iterable[str] | None,
+) -> _PriceFilter | None:
+    """The SQL form of the loader's filters, or None if they cannot match any row."""
+    where: list[str] = []
+    params: dict[str, Any] = {}
+    for name, op, bound in (("start", ">=", start), ("end", "<=", end)):
+        if bound is not None:
+            where.append(f"date {op} :{name}")
+            params[name] = day_number(bound)
+    batches: list[list[int] | None] = [None]
+    if ids is not None:
+        if not ids:
+            return None
+        # One pass per id batch (ascending), so each batch stays in (card_id, date) order.
+        batches = _id_batches(list(ids))
+        where.append("card_id IN :card_ids")
+    if sources is not None:
+        names = list(sources)
+        found = conn.execute(sa_select(col(Source.id)).where(col(Source.name).in_(names)))
+        params["sources"] = list(found.scalars())
+        if not params["sources"]:
+            return None
+        where.append("source IN :sources")
+    return _PriceFilter(where, params, batches)
+
+
+def _fetch_prices(
+    conn: Connection,
+    table: Table,
+    fields: Sequence[str],
+    where: Sequence[str],
+    params: Mapping[str, Any],
+) -> dict[str, np.ndarray]:
+    """`fields` (stored values: day numbers, source ids) of one partition's rows matching
+    `where`, ordered by (card_id, date, id).
+
+    The arrays are sized by a COUNT first and filled chunk by chunk, so no per-row Python
+    objects outlive a chunk.
+    """
+    prices = qualified_name(table)
+    clause = _where(where)
+    size = int(
+        conn.execute(_query(f"SELECT COUNT(*) FROM {prices}{clause}", params), params).scalar_one()
+    )
+    cols = [np.empty(size, _PRICE_DTYPES[f]) for f in fields]
+    n = 0
+    # Server-side cursor where the backend has one (PostgreSQL): rows arrive in
+    # batches instead of the whole result being buffered by the driver first.
+    sql = f"SELECT {', '.join(fields)} FROM {prices}{clause} ORDER BY card_id, date, id"
+    result = conn.execute(_query(sql, params).execution_options(yield_per=FETCH_ROWS), params)
+    for chunk in result.partitions(FETCH_ROWS):
+        m = len(chunk)
+        if n + m > size:  # rows committed between the COUNT and the SELECT
+            size = max(2 * size, n + m)
+            cols = [np.resize(c, size) for c in cols]
+        for c, values in zip(cols, zip(*chunk, strict=True), strict=True):
+            c[n : n + m] = values
+        n += m
+    return {f: c[:n] for f, c in zip(fields, cols, strict=True)}
+
+
+def _dimension(conn: Connection, stmt: Select[Any]) -> list[np.ndarray]:
+    """Columns of a small lookup table: int64 ids first (as ordered), then object arrays."""
+    rows = conn.execute(stmt).all()
+    cols = list(zip(*rows, strict=True)) or [()] * len(stmt.selected_columns)
+    return [np.asarray(cols[0], dtype=np.int64)] + [np.asarray(c, dtype=object) for c in cols[1:]]
+
+
+def _positions(ids: np.ndarray, wanted: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Index of each of `wanted` in the ascending `ids`, and whether it is there at all."""
+    if not len(ids):
+        return np.zeros(len(wanted), dtype=np.intp), np.zeros(len(wanted), dtype=bool)
+    pos = np.minimum(np.searchsorted(ids, wanted), len(ids) - 1)
+    return pos, ids[pos] == wanted
+
+
+def _load_prices(
+    conn: Connection,
+    tables: Sequence[Table],
+    wanted: Sequence[str],
+    f: _PriceFilter,
+    dtypes: PriceDtypes,
+    card_range: tuple[int, int] | None = None,
+) -> pd.DataFrame:
+    """The `wanted` columns of the rows `f` matches (within `card_range`, inclusive)."""
+    if card_range is not None:
+        f = f._replace(
+            where=[*f.where, "card_id BETWEEN :lo AND :hi"],
+            params={**f.params, "lo": card_range[0], "hi": card_range[1]},
+        )
+    fields = ["card_id", "date", *(c for c in ("source", "price") if c in wanted)]
+    parts = [
+        _fetch_prices(conn, t, fields, f.where, _batch_params(f, batch))
+        for t in tables
+        for batch in f.batches
+    ]
+    cards: list[np.ndarray] | None = None
+    if any(c in wanted for c in _CARD_COLUMNS):
+        stmt = _CARD_DIMENSION
+        if card_range is not None:
+            stmt = stmt.where(col(Card.id).between(*card_range))
+        dims = [
+            _dimension(
+                conn,
+                (stmt if batch is None else stmt.where(col(Card.id).in_(batch))).order_by(
+                    col(Card.id)
+                ),
+            )
+            for batch in f.batches
+        ]
+        cards = [np.concatenate(c) for c in zip(*dims, strict=True)]
+    source_dim: list[np.ndarray] | None = None
+    if "source" in wanted:
+        source_dim = _dimension(conn, _SOURCE_DIMENSION)
+    return _frame(_sorted_parts(parts), wanted, cards, source_dim, dtypes)
+
+
+def _sorted_parts(parts: Sequence[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    """Partitions' fetched columns as one set, in (card_id, date) order."""
+    data = {c: np.concatenate([p[c] for p in parts]) for c in parts[0]}
+    if len(parts) > 1:
+        # Archives follow the main table: restore (card_id, date) order, stably.
+        order = np.lexsort((data["date"], data["card_id"]))
+        data = {c: v[order] for c, v in data.items()}
+    return data
+
+
+def _categorical(values: np.ndarray, pos: np.ndarray) -> pd.Categorical:
+    """`values[pos]` as a categorical of the (sorted) values that occur, built from the
+    small `values` array instead of one object per row."""
+    used = np.flatnonzero(np.bincount(pos, minlength=len(values)))
+    categories, codes = np.unique(values[used], return_inverse=True)
+    lookup = np.zeros(len(values), dtype=np.int32)
+    lookup[used] = codes
+    return pd.Categorical.from_codes(lookup[pos], categories=categories)
+
+
+def _frame(
+    data: dict[str, np.ndarray],
+    wanted: Sequence[str],
+    cards: list[np.ndarray] | None,
+    source_dim: list[np.ndarray] | None,
+    dtypes: PriceDtypes = "default",
+) -> pd.DataFrame:
+    """The `wanted` columns of stored price fields in `data`, card attributes and source
+    names joined on from the `cards` and `source_dim` dimensions, typed per `dtypes`."""
+    keep = np.ones(len(data["card_id"]), dtype=bool)  # inner joins, as in SQL
+    if cards is not None:
+        card_pos, found_card = _positions(cards[0], data["card_id"])
+        keep &= found_card
+    if source_dim is not None:
+        source_pos, found_source = _positions(source_dim[0], data["source"])
+        keep &= found_source
+    if not keep.all():
+        data = {c: v[keep] for c, v in data.items()}
+        if cards is not None:
+            card_pos = card_pos[keep]
+        if source_dim is not None:
+            source_pos = source_pos[keep]
+    if not len(data["card_id"]):
+        return pd.DataFrame(columns=list(wanted))
+
+    compact = dtypes != "default"
+    out: dict[str, np.ndarray | pd.Categorical] = {}
+    for c in wanted:
+        if c in _CARD_COLUMNS:
+            assert cards is not None
+            values = cards[1 + _CARD_COLUMNS.index(c)]
+            out[c] = _categorical(values, card_pos) if compact else values[card_pos]
+        elif c == "source":
+            assert source_dim is not None
+            names = source_dim[1]
+            out[c] = _categorical(names, source_pos) if compact else names[source_pos]
+        elif c == "date":
+            out[c] = data["date"].astype("datetime64[D]").astype("datetime64[ns]")
+        elif c == "card_id" and compact and data[c].max() <= np.iinfo(np.int32).max:
+            out[c] = data[c].astype(np.int32)
+        elif c == "price" and dtypes == "compact_float32":
+            out[c] = data[c].astype(np.float32)
+        else:
+            out[c] = data[c]
+    return pd.DataFrame(out)
+
+
+def _wanted_columns(columns: Sequence[str] | None) -> list[str]:
+    wanted = list(PRICE_COLUMNS if columns is None else columns)
+    unknown = [c for c in wanted if c not in PRICE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown price columns: {', '.join(unknown)}")
+    return wanted
+
+
+def _dtypes(dtypes: PriceDtypes | None) -> PriceDtypes:
+    kind = current_settings().price_dtypes if dtypes is None else dtypes
+    if kind not in get_args(PriceDtypes):
+        raise ValueError(f"Unknown price dtypes: {kind}")
+    return kind
+
+
+def _filter_ids(
+    engine: Engine, card_ids: Iterable[int] | None, keys: Sequence[CardKey] | None
+) -> set[int] | None:
+    """The card ids `card_ids` and `keys` (both, if given) select; None for every card."""
+    ids = None if card_ids is None else set(card_ids)
+    if keys is not None:
+        with get_session(engine) as session:
+            by_key = set(find_card_ids(session, list(keys)).values())
+        ids = by_key if ids is None else ids & by_key
+    return ids
+
+
+def _partition(table: Table) -> str:
+    return table.schema or "main"
+
+
+def _dimensions(conn: Connection) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    """The cards (by ascending id) and sources dimensions, as a snapshot stores them."""
+    cards = _dimension(conn, _CARD_DIMENSION.order_by(col(Card.id)))
+    return cards, _dimension(conn, _SOURCE_DIMENSION)
+
+
+def _watermark(part: dict[str, np.ndarray], previous: int = 0) -> int:
+    return int(part["id"].max()) if len(part["id"]) else previous
+
+
+def _build_snapshot(conn: Connection, version: tuple[str, int]) -> PriceSnapshot:
+    """Every price of every partition, read through the columnar loader."""
+    parts = {
+        _partition(t): _fetch_prices(conn, t, list(ROW_DTYPES), [], {}) for t in price_tables(conn)
+    }
+    watermarks = {name: _watermark(part) for name, part in parts.items()}
+    cards, sources = _dimensions(conn)
+    return PriceSnapshot(version, _sorted_parts(list(parts.values())), cards, sources, watermarks)
+
+
+class PriceChanges(NamedTuple):
+    """The price rows written after a set of watermarks (`prices_since`)."""
+
+    rows: dict[str, np.ndarray]  # the requested stored fields, in (card_id, date) order
+    watermarks: dict[str, int]  # highest price id per partition, these rows included
+    total: int  # price rows across partitions
+
+
+def price_watermarks(conn: Connection) -> PriceChanges:
+    """The current watermarks of every partition ("main" or archive schema) and the row
+    count, as the `PriceChanges` of no rows: what to pass `prices_since` later."""
+    watermarks: dict[str, int] = {}
+    total = 0
+    for t in price_tables(conn):
+        top, n = conn.execute(text(f"SELECT MAX(id), COUNT(*) FROM {qualified_name(t)}")).one()
+        watermarks[_partition(t)] = int(top or 0)
+        total += int(n)
+    return PriceChanges({}, watermarks, total)
+
+
+def prices_since(
+    conn: Connection, watermarks: Mapping[str, int], total: int, fields: Sequence[str]
+) -> PriceChanges | None:
+    """`fields` (stored values) of the price rows written after `watermarks`, when there
+    were `total` rows; only those rows are read. None when rows may also have moved or
+    gone since (a partition added or dropped, counts that don't add up).
+
+    Prices are only ever inserted, with ids above those already in their partition, and
+    a (card, date) lives in a single partition.
+    """
+    tables = {_partition(t): t for t in price_tables(conn)}
+    if tables.keys() != watermarks.keys():
+        return None
+    now = sum(
+        int(conn.execute(text(f"SELECT COUNT(*) FROM {qualified_name(t)}")).scalar_one())
+        for t in tables.values()
+    )
+    wanted = list(dict.fromkeys([*fields, "id"]))
+    parts = {
+        name: _fetch_prices(conn, t, wanted, ["id > :after"], {"after": watermarks[name]})
+        for name, t in tables.items()
+    }
+    new = _sorted_parts(list(parts.values()))
+    if total + len(new["id"]) != now:
+        return None
+    marks = {name: _watermark(part, watermarks[name]) for name, part in parts.items()}
+    return PriceChanges({f: new[f] for f in fields}, marks, now)
+
+
+def _refresh_snapshot(
+    conn: Connection, snap: PriceSnapshot, version: tuple[str, int]
+) -> PriceSnapshot | None:
+    """`snap` brought to `version` by the rows written since (`prices_since`), stored as
+    a delta beside it (`append_snapshot`); None when it has to be rebuilt."""
+    changes = prices_since(conn, snap.watermarks, snap.row_count(), list(ROW_DTYPES))
+    if changes is None:
+        return None
+    cards, sources = _dimensions(conn)
+    return append_snapshot(snap, version, changes.rows, changes.watermarks, cards, sources)
+
+
+def price_snapshot(*, refresh: bool = True) -> PriceSnapshot | None:
+    """The on-disk snapshot of the price history (`analytics.snapshot`) at the database's
+    current data version, memory-mapped.
+
+    An older generation is brought up to date by reading only the rows written since
+    and appending them to it as a delta file; the history is read in full when there
+    is no snapshot yet or it can't be refreshed (then written as a new base). Without
+    `refresh`, only a snapshot that is already current is returned. None when snapshots
+    are off (`Settings.price_snapshot`).
+    """
     engine = get_engine()
-    with Session(engine) as session:
-        stmt = select(PricePoint, Card).join(Card, onclause=(PricePoint.card_id == Card.id))  # type: ignore[arg-type]
-        rows = session.exec(stmt).all()
+    version = data_version(engine)
+    if version is None or snapshot_root(version[0]) is None:
+        return None
+    snap = read_snapshot(version[0])
+    if snap is not None and snap.version == version:
+        return snap
+    if not refresh:
+        return None
+    with engine.connect() as conn:
+        fresh = None if snap is None else _refresh_snapshot(conn, snap, version)
+        if fresh is not None:
+            return fresh
+        built = _build_snapshot(conn, version)
+    return write_snapshot(built)
+
+
+def _spans(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """The indexes in [lo[k], hi[k]) for every k, in order."""
+    lengths = hi - lo
+    return np.repeat(lo - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+
+class _Selection(NamedTuple):
+    """Rows of a snapshot: of its base (a slice when that is all of them) and positions
+    in its `added` rows, each ascending."""
+
+    base: slice | np.ndarray
+    added: np.ndarray
+
+
+def _selected(
+    rows: Mapping[str, np.ndarray],
+    source_dim: list[np.ndarray],
+    start: date | None,
+    end: date | None,
+    ids: set[int] | None,
+    sources: Iterable[str] | None,
+) -> slice | np.ndarray:
+    """The positions of the rows (in (card_id, date) order) the loader's filters match,
+    ascending, or a slice when that is all of them."""
+    selected: slice | np.ndarray = slice(None)
+    if ids is not None:
+        wanted = np.array(sorted(ids), dtype=np.int64)
+        cards = rows["card_id"]
+        selected = _spans(
+            np.searchsorted(cards, wanted, "left"), np.searchsorted(cards, wanted, "right")
+        )
+    mask: np.ndarray | None = None
+    for bound, op in ((start, np.greater_equal), (end, np.less_equal)):
+        if bound is not None:
+            hit = op(rows["date"][selected], day_number(bound))
+            mask = hit if mask is None else mask & hit
+    if sources is not None:
+        names = set(sources)
+        source_ids = source_dim[0][[n in names for n in source_dim[1]]]
+        hit = np.isin(rows["source"][selected], source_ids)
+        mask = hit if mask is None else mask & hit
+    if mask is None:
+        return selected
+    return np.flatnonzero(mask) if isinstance(selected, slice) else selected[mask]
+
+
+def _snapshot_selection(
+    snap: PriceSnapshot,
+    start: date | None,
+    end: date | None,
+    ids: set[int] | None,
+    sources: Iterable[str] | None,
+) -> _Selection:
+    """The rows of `snap` the loader's filters match."""
+    base = _selected(snap.rows, snap.sources, start, end, ids, sources)
+    if snap.added is None:
+        return _Selection(base, np.empty(0, dtype=np.intp))
+    added = _selected(snap.added, snap.sources, start, end, ids, sources)
+    if isinstance(added, slice):
+        added = np.arange(len(snap.added["id"]))
+    return _Selection(base, added)
+
+
+def _snapshot_frame(
+    snap: PriceSnapshot, wanted: Sequence[str], selected: _Selection, dtypes: PriceDtypes
+) -> pd.DataFrame:
+    fields = ["card_id", "date", *(c for c in ("source", "price") if c in wanted)]
+    data = {c: np.asarray(snap.rows[c][selected.base]) for c in fields}
+    if snap.added is not None and len(selected.added):
+        data = merge_rows(data, {c: snap.added[c][selected.added] for c in fields})
+    cards = snap.cards if any(c in wanted for c in _CARD_COLUMNS) else None
+    return _frame(data, wanted, cards, snap.sources if "source" in wanted else None, dtypes)
+
+
+def load_prices_df(
+    start: date | None = None,
+    end: date | None = None,
+    *,
+    card_ids: Iterable[int] | None = None,
+    keys: Sequence[CardKey] | None = None,
+    sources: Iterable[str] | None = None,
+    columns: Sequence[str] | None = None,
+    dtypes: PriceDtypes | None = None,
+) -> pd.DataFrame:
+    """Return dataframe with columns:
+    card_id, name, set_code, number, date (datetime64), source, price (float),
+    ordered by (card_id, date).
+
+    Filters are applied in SQL, so the cost follows the slice rather than the history:
+    prices dated within [start, end] (archive partitions (`db archive`) outside the range
+    are not read at all), of the cards in `card_ids` and/or with the (name, set_code,
+    number) `keys`, from the named `sources`. `columns` selects (and orders) a subset of
+    the columns above; unneeded ones are not fetched.
+
+    Prices are fetched as plain numbers into NumPy arrays; card attributes and source
+    names are joined on afterwards by id, and dates converted in one vectorized step.
+    They come from the memory-mapped price snapshot (`price_snapshot`) instead of SQL
+    while it is current, so a new process doesn't re-read the history; an unfiltered
+    load also brings a stale one up to date (or builds it) first. Filtered loads never
+    do: they go to SQL, at the cost of their slice.
+
+    `dtypes` (default `Settings.price_dtypes`) "compact" returns name, set_code, number
+    and source as categoricals (of the values present, sorted) and card_id as int32;
+    "compact_float32" also price as float32. Compact frames take a fraction of the memory
+    (`prices memory`) and every analytics, report and API function accepts them.
+
+    Frames are cached per set of arguments until the next price write (`frame_cache`)
+    and are read-only: assign columns freely, but copy before writing into values.
+    """
+    wanted = _wanted_columns(columns)
+    kind = _dtypes(dtypes)
+    id_set = None if card_ids is None else tuple(sorted(set(card_ids)))
+    key_set = None if keys is None else tuple(sorted(set(keys)))
+    source_set = None if sources is None else tuple(sorted(set(sources)))
 
-    if not rows:
-        return pd.DataFrame(
-            columns=["card_id", "name", "set_code", "number", "date", "source", "price"]
+    def load() -> pd.DataFrame:
+        engine = get_engine()
+        ids = _filter_ids(engine, id_set, key_set)
+        # Only a load of every price pays for bringing the snapshot up to date.
+        full = ids is None and start is None and end is None and source_set is None
+        snap = price_snapshot(refresh=full)
+        if snap is not None:
+            selected = _snapshot_selection(snap, start, end, ids, source_set)
+            return _snapshot_frame(snap, wanted, selected, kind)
+        with engine.connect() as conn:
+            f = _price_filter(conn, start, end, ids, source_set)
+            if f is None:
+                return pd.DataFrame(columns=wanted)
+            return _load_prices(conn, price_tables(conn, start, end), wanted, f, kind)
+
+    key = ("prices", start, end, id_set, key_set, source_set, kind, *wanted)
+    return cached_frame(key, load)
+
+
+def _column_bytes(values: pd.Series) -> int:
+    """Memory held by a column. Rows share the string objects of an object column, so
+    each distinct string is counted once (pandas' deep count adds it for every row)."""
+    if values.dtype == object:
+        array = values.to_numpy()
+        return int(array.nbytes) + sum(sys.getsizeof(v) for v in pd.unique(array))
+    return int(values.memory_usage(index=False, deep=True))
+
+
+def price_memory_report(start: date | None = None, end: date | None = None) -> pd.DataFrame:
+    """Bytes per column of `load_prices_df(start, end)` under each `dtypes` mode (one
+    column each), with a "total" row."""
+    frames = {kind: load_prices_df(start, end, dtypes=kind) for kind in get_args(PriceDtypes)}
+    report = pd.DataFrame(
+        {kind: {c: _column_bytes(df[c]) for c in df.columns} for kind, df in frames.items()}
+    )
+    report.loc["total"] = report.sum()
+    return report
+
+
+def _card_row_counts(
+    conn: Connection, tables: Sequence[Table], f: _PriceFilter
+) -> tuple[np.ndarray, np.ndarray]:
+    """Ascending card ids with matching rows, and how many each has across `tables`."""
+    ids: list[np.ndarray] = []
+    counts: list[np.ndarray] = []
+    for t in tables:
+        sql = f"SELECT card_id, COUNT(*) FROM {qualified_name(t)}{_where(f.where)} GROUP BY card_id"
+        for batch in f.batches:
+            params = _batch_params(f, batch)
+            rows = conn.execute(_query(sql, params), params).all()
+            ids.append(np.array([r[0] for r in rows], dtype=np.int64))
+            counts.append(np.array([r[1] for r in rows], dtype=np.int64))
+    cards, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+    return cards, np.bincount(inverse, weights=np.concatenate(counts)).astype(np.int64)
+
+
+def _card_ranges(
+    cards: np.ndarray, counts: np.ndarray, chunk_cards: int | None, chunk_rows: int | None
+) -> Iterator[tuple[int, int]]:
+    """Consecutive (first, last) card id spans of at most `chunk_cards` cards and
+    `chunk_rows` rows (a single card may exceed `chunk_rows` on its own)."""
+    lo = hi = -1
+    n_cards = n_rows = 0
+    for card, n in zip(cards.tolist(), counts.tolist(), strict=True):
+        full_cards = chunk_cards is not None and n_cards >= chunk_cards
+        full_rows = chunk_rows is not None and n_rows + n > chunk_rows
+        if n_cards and (full_cards or full_rows):
+            yield lo, hi
+            n_cards = n_rows = 0
+        if not n_cards:
+            lo = card
+        hi = card
+        n_cards += 1
+        n_rows += n
+    if n_cards:
+        yield lo, hi
+
+
+def _run_counts(cards: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """The distinct ids of ascending `cards` and how often each occurs."""
+    if not len(cards):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, cards[1:] != cards[:-1]])
+    return np.asarray(cards[starts]), np.diff(np.r_[starts, len(cards)])
+
+
+def _snapshot_chunks(
+    snap: PriceSnapshot,
+    wanted: Sequence[str],
+    selected: _Selection,
+    chunk_cards: int | None,
+    chunk_rows: int | None,
+    dtypes: PriceDtypes,
+) -> Iterator[pd.DataFrame]:
+    """`iter_prices` over the `selected` rows of a snapshot: only each chunk's slice of
+    the mapped columns is read."""
+    cards = snap.rows["card_id"][selected.base]
+    added = np.empty(0, dtype=np.int64)
+    if snap.added is not None:
+        added = snap.added["card_id"][selected.added]
+    (base_ids, base_counts), (added_ids, added_counts) = _run_counts(cards), _run_counts(added)
+    ids, inverse = np.unique(np.r_[base_ids, added_ids], return_inverse=True)
+    counts = np.bincount(inverse, weights=np.r_[base_counts, added_counts]).astype(np.int64)
+    for lo, hi in _card_ranges(ids, counts, chunk_cards, chunk_rows):
+        a, b = int(np.searchsorted(cards, lo, "left")), int(np.searchsorted(cards, hi, "right"))
+        c, d = int(np.searchsorted(added, lo, "left")), int(np.searchsorted(added, hi, "right"))
+        base = slice(a, b) if isinstance(selected.base, slice) else selected.base[a:b]
+        df = _snapshot_frame(snap, wanted, _Selection(base, selected.added[c:d]), dtypes)
+        if not df.empty:
+            yield df
+
+
+def iter_prices(
+    start: date | None = None,
+    end: date | None = None,
+    *,
+    chunk_cards: int | None = None,
+    chunk_rows: int | None = 250_000,
+    card_ids: Iterable[int] | None = None,
+    keys: Sequence[CardKey] | None = None,
+    sources: Iterable[str] | None = None,
+    columns: Sequence[str] | None = None,
+    dtypes: PriceDtypes | None = None,
+) -> Iterator[pd.DataFrame]:
+    """`load_prices_df` in pieces, for jobs that don't need every price in memory at once.
+
+    Yields frames with the same columns and filters, in (card_id, date) order overall.
+    Each holds whole cards: at most `chunk_cards` of them and `chunk_rows` rows (unless
+    one card alone has more), so per-card computations can run chunk by chunk. Chunks
+    are planned from per-card row counts, then each is read as a card id range through
+    the same streaming cursor as `load_prices_df`, or sliced from the price snapshot
+    while it is current. A stale snapshot is left alone: bringing it up to date is for
+    full loads (`load_prices_df`, `db snapshot`), and chunks shouldn't wait on the
+    history. With compact `dtypes`, each chunk's categoricals hold that chunk's values
+    (`pd.api.types.union_categoricals` combines them).
+    """
+    for name, limit in (("chunk_cards", chunk_cards), ("chunk_rows", chunk_rows)):
+        if limit is not None and limit < 1:
+            raise ValueError(f"{name} must be at least 1 (got {limit})")
+    wanted = _wanted_columns(columns)
+    kind = _dtypes(dtypes)
+    engine = get_engine()
+    ids = _filter_ids(engine, card_ids, keys)
+    snap = price_snapshot(refresh=False)
+    if snap is not None:
+        yield from _snapshot_chunks(
+            snap,
+            wanted,
+            _snapshot_selection(snap, start, end, ids, sources),
+            chunk_cards,
+            chunk_rows,
+            kind,
         )
+        return
+    with engine.connect() as conn:
+        f = _price_filter(conn, start, end, ids, sources)
+        if f is None:
+            return
+        tables = price_tables(conn, start, end)
+        cards, counts = _card_row_counts(conn, tables, f)
+        for lo, hi in _card_ranges(cards, counts, chunk_cards, chunk_rows):
+            chunk = f
+            if ids is not None:
+                span = cards[(cards >= lo) & (cards <= hi)].tolist()
+                chunk = f._replace(batches=_id_batches(span))
+            df = _load_prices(conn, tables, wanted, chunk, kind, (lo, hi))
+            if not df.empty:
+                yield df
+
+
+def latest_price_date() -> date | None:
+    """The most recent price date of all, or None without prices."""
+    engine = get_engine()
+    ensure_card_latest(engine)
+    with engine.connect() as conn:
+        day: date | None = conn.execute(sa_select(func.max(col(CardLatest.date)))).scalar_one()
+    return day
+
+
+def load_price_window(
+    on_date: date | str | None,
+    days: int,
+    *,
+    columns: Sequence[str] | None = None,
+    dtypes: PriceDtypes | None = None,
+) -> pd.DataFrame:
+    """`load_prices_df` for the `days` days before `on_date` (default: the latest price
+    date) and `on_date` itself: what a report about one day needs to look back over."""
+    day = latest_price_date() if on_date is None else pd.to_datetime(on_date).date()
+    if day is None:
+        return pd.DataFrame(columns=list(PRICE_COLUMNS if columns is None else columns))
+    return load_prices_df(day - timedelta(days=days), day, columns=columns, dtypes=dtypes)
 
-    records: list[dict[str, Any]] = []
-    for p, c in rows:
-        records.append(
-            {
-                "card_id": p.card_id,
-                "name": c.name,
-                "set_code": c.set_code,
-                "number": c.number,
-                "date": pd.to_datetime(p.date),
-                "source": p.source,
-                "price": float(p.price),
-            }
+
+def load_latest_df(
+    card_ids: Sequence[int] | None = None,
+    *,
+    keys: Sequence[CardKey] | None = None,
+    name_pattern: str | None = None,
+    latest_date_only: bool = False,
+) -> pd.DataFrame:
+    """Latest price per card from the card_latest table, one row per card.
+
+    Columns: card_id, name, set_code, number, date (datetime64), source, price,
+    prev_date (datetime64), prev_price, return_1d. Optionally only `card_ids`, cards with
+    the (name, set_code, number) `keys`, cards whose name matches the regular expression
+    `name_pattern` anywhere (case-insensitive, as `Series.str.contains`) or, with
+    `latest_date_only`, cards priced on the most recent date of all. Ordered by card_id.
+    """
+    engine = get_engine()
+    ensure_card_latest(engine)
+    if keys is not None:
+        card_ids = sorted(_filter_ids(engine, card_ids, keys) or ())
+    if name_pattern is not None:
+        # Only the names are read to match the pattern; the rows are then read by id.
+        named = sa_select(col(Card.id), col(Card.name)).join(
+            CardLatest,
+            onclause=(CardLatest.card_id == Card.id),  # type: ignore[arg-type]
         )
+        with engine.connect() as conn:
+            names = pd.DataFrame(conn.execute(named).all(), columns=["card_id", "name"])
+        hit = names["name"].str.contains(name_pattern, case=False, na=False)
+        matched = set(names.loc[hit, "card_id"].tolist())
+        card_ids = sorted(matched if card_ids is None else matched.intersection(card_ids))
+    stmt = sa_select(
+        col(CardLatest.card_id),
+        col(Card.name),
+        col(Card.set_code),
+        col(Card.number),
+        col(CardLatest.date),
+        col(Source.name),
+        col(CardLatest.price),
+        col(CardLatest.prev_date),
+        col(CardLatest.prev_price),
+        col(CardLatest.return_1d),
+    )
+    stmt = stmt.join(Card, onclause=(CardLatest.card_id == Card.id))  # type: ignore[arg-type]
+    stmt = stmt.join(Source, onclause=(CardLatest.source == Source.id))  # type: ignore[arg-type]
+    if card_ids is not None:
+        stmt = stmt.where(col(CardLatest.card_id).in_(list(card_ids)))
+    if latest_date_only:
+        last_day = sa_select(func.max(col(CardLatest.date))).scalar_subquery()
+        stmt = stmt.where(col(CardLatest.date) == last_day)
+    with engine.connect() as conn:
+        rows = conn.execute(stmt.order_by(col(CardLatest.card_id))).all()
 
-    df = pd.DataFrame.from_records(records)
-    df = df.sort_values(["card_id", "date"], kind="stable").reset_index(drop=True)
+    df = pd.DataFrame.from_records(rows, columns=LATEST_COLUMNS)
+    for c in ("date", "prev_date"):
+        df[c] = pd.to_datetime(df[c])
     return df
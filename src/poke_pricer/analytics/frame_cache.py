@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from ..db import current_settings, data_version, get_engine
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int  # frames dropped for the memory budget (not for a new data version)
+    entries: int
+    nbytes: int  # held by the cached frames (object columns counted by reference)
+    budget: int  # bytes
+
+
+def _read_only(df: pd.DataFrame) -> pd.DataFrame:
+    """`df` rebuilt on read-only views of its columns, so a write into the values raises
+    instead of reaching everyone else holding the frame."""
+    cols: dict[str, np.ndarray | pd.Categorical] = {}
+    for c in df.columns:
+        column = df[c].array
+        if isinstance(column, pd.Categorical):  # codes come back as a read-only view
+            cols[c] = pd.Categorical.from_codes(column.codes, dtype=column.dtype)
+            continue
+        values = df[c].to_numpy()
+        values.flags.writeable = False
+        cols[c] = values
+    return pd.DataFrame(cols, index=df.index, copy=False)
+
+
+class FrameCache:
+    """Loaded frames by (database, key), least recently used evicted first once they
+    take more than `budget` bytes.
+
+    A database's frames are all dropped as soon as a lookup brings a different data
+    version for it. Frames are stored read-only and handed out as shallow copies:
+    callers may add, replace or drop columns of theirs, but writing into the shared
+    values raises.
+    """
+
+    def __init__(self, budget: int) -> None:
+        self.budget = budget
+        self._frames: OrderedDict[tuple[str, Hashable], tuple[pd.DataFrame, int]] = OrderedDict()
+        self._versions: dict[str, Hashable] = {}
+        self._nbytes = 0
+        self._hits = self._misses = self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(
+        self, db: str, version: Hashable, key: Hashable, load: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """The frame for `key` in `db` at `version`, from `load()` on a miss."""
+        with self._lock:
+            if self._versions.get(db) != version:
+                for k in [k for k in self._frames if k[0] == db]:
+                    self._nbytes -= self._frames.pop(k)[1]
+                self._versions[db] = version
+            cached = self._frames.get((db, key))
+            if cached is not None:
+                self._frames.move_to_end((db, key))
+                self._hits += 1
+                return cached[0].copy(deep=False)
+            self._misses += 1
+        # Loaded outside the lock: a slow load doesn't hold up hits on other keys.
+        frame = _read_only(load())
+        nbytes = int(frame.memory_usage(index=False).sum())
+        with self._lock:
+            if nbytes <= self.budget and self._versions.get(db) == version:
+                previous = self._frames.pop((db, key), None)  # a concurrent miss got here first
+                if previous is not None:
+                    self._nbytes -= previous[1]
+                self._frames[(db, key)] = (frame, nbytes)
+                self._nbytes += nbytes
+                self._evict()
+        return frame.copy(deep=False)
+
+    def resize(self, budget: int) -> None:
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._versions.clear()
+            self._nbytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._frames),
+                self._nbytes,
+                self.budget,
+            )
+
+    def _evict(self) -> None:
+        while self._nbytes > self.budget and self._frames:
+            _, (_, nbytes) = self._frames.popitem(last=False)
+            self._nbytes -= nbytes
+            self._evictions += 1
+
+
+_shared = FrameCache(0)
+
+
+def cached_frame(key: Hashable, load: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """`load()` through the process-wide cache, for the current database at its current
+    data version (`db.data_version`, bumped by every price write). The budget is
+    `Settings.frame_cache_mb`; with 0 every call loads."""
+    _shared.resize(current_settings().frame_cache_mb * 1024 * 1024)
+    engine = get_engine()
+    version = data_version(engine)
+    if not _shared.budget or version is None:
+        return load()
+    return _shared.get(str(engine.url), version, key, load)
+
+
+def frame_cache_stats() -> CacheStats:
+    return _shared.stats()
+
+
+def clear_frame_cache() -> None:
+    _shared.clear()
+
+
+__all__ = ["CacheStats", "FrameCache", "cached_frame", "clear_frame_cache", "frame_cache_stats"]
@@ -2,9 +2,17 @@ from __future__ import annotations
 
 from collections.abc import Iterable
 from datetime import date as _date
+from typing import Final
 
+import numpy as np
 import pandas as pd
 
+from .panel import PricePanel, returns
+
+# Days of history loaded before the day of interest (`load_price_window`): a card's
+# previous observation must fall within them for its 1D return to be defined.
+RETURN_LOOKBACK_DAYS: Final[int] = 31
+
 
 def _to_ts(d: _date | str | None) -> pd.Timestamp | None:
     if d is None:
@@ -13,7 +21,7 @@ def _to_ts(d: _date | str | None) -> pd.Timestamp | None:
 
 
 def compute_top_movers(
-    df: pd.DataFrame,
+    df: pd.DataFrame | PricePanel,
     *,
     k: int = 5,
     on_date: _date | str | None = None,
@@ -23,38 +31,36 @@ def compute_top_movers(
     group_cols: Iterable[str] = ("card_id", "name", "set_code", "number"),
 ) -> pd.DataFrame:
     """
-    Return top/bottom k movers for a given day (simple 1D pct-change).
-    Expects columns: id_col, 'name','set_code','number', date_col, price_col, 'source'.
+    Return top/bottom k movers for a given day (simple 1D pct-change per card and
+    source, against that source's previous price for the card).
+    Expects columns: id_col, 'name','set_code','number', date_col, price_col, 'source'
+    (or the `PricePanel` of such a frame).
     """
-    if df.empty:
-        return pd.DataFrame(
-            columns=[*group_cols, "source", price_col, "return_1d", "bucket", date_col]
-        )
-
-    work = df.copy()
-    work[date_col] = pd.to_datetime(work[date_col])
-
-    # Sort and compute 1D return per card_id
-    work = work.sort_values([id_col, date_col], kind="stable")
-    work["return_1d"] = work.groupby(id_col)[price_col].pct_change()
+    group_cols = list(group_cols)
+    empty = pd.DataFrame(
+        columns=[*group_cols, "source", price_col, "return_1d", "bucket", date_col]
+    )
+    panel = PricePanel.of(df, price_col=price_col, id_col=id_col, date_col=date_col)
 
     # Select the day of interest (default = latest available)
-    day_ts = _to_ts(on_date) or work[date_col].max()
+    day = panel.day_index(_to_ts(on_date) or panel.dates[-1]) if len(panel.dates) else None
+    if day is None:
+        return empty
 
-    today = work[work[date_col] == day_ts].copy()
-    # Keep only rows where return is defined (needs prior day)
-    today = today.dropna(subset=["return_1d"])
+    def on_day(layer: np.ndarray) -> dict[str, np.ndarray]:
+        return {price_col: layer[:, -1], "return_1d": returns(layer)[:, -1]}
 
-    if today.empty:
-        return pd.DataFrame(
-            columns=[*group_cols, "source", price_col, "return_1d", "bucket", date_col]
-        )
+    # Keep only rows where return is defined (needs a prior price)
+    moves = panel.source_frame(day, on_day, id_col=id_col, date_col=date_col)
+    moves = moves.dropna(subset=["return_1d"])
+    if moves.empty:
+        return empty
 
     cols = [*group_cols, "source", price_col, "return_1d", date_col]
-    today = today.loc[:, cols]
+    moves = moves.loc[:, cols]
 
-    winners = today.sort_values("return_1d", ascending=False, kind="stable").head(k).copy()
-    losers = today.sort_values("return_1d", ascending=True, kind="stable").head(k).copy()
+    winners = moves.sort_values("return_1d", ascending=False, kind="stable").head(k).copy()
+    losers = moves.sort_values("return_1d", ascending=True, kind="stable").head(k).copy()
     winners["bucket"] = "winner"
     losers["bucket"] = "loser"
 
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from functools import cached_property
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+_CARD_COLUMNS = ["name", "set_code", "number"]
+
+
+def shift(values: np.ndarray, days: int) -> np.ndarray:
+    """`values` moved `days` calendar days later along the last axis (earlier when
+    negative); vacated days are NaN."""
+    out = np.full(values.shape, np.nan, dtype=values.dtype)
+    if days >= 0:
+        out[..., days:] = values[..., : values.shape[-1] - days]
+    else:
+        out[..., :days] = values[..., -days:]
+    return out
+
+
+def ffill(values: np.ndarray) -> np.ndarray:
+    """Each day's value, or else the last one observed before it (NaN before the first)."""
+    if not values.size:
+        return values.copy()
+    last = np.where(np.isnan(values), 0, np.arange(values.shape[-1]))
+    np.maximum.accumulate(last, axis=-1, out=last)
+    return np.take_along_axis(values, last, axis=-1)
+
+
+def returns(values: np.ndarray, days: int = 1) -> np.ndarray:
+    """Return over `days` calendar days: each observed value against the last one
+    observed on or before `days` days earlier; NaN without either."""
+    out: np.ndarray = values / shift(ffill(values), days) - 1.0
+    return out
+
+
+def rolling(
+    values: np.ndarray,
+    window: int,
+    how: Literal["sum", "count", "mean", "max", "min"] = "mean",
+    min_periods: int = 1,
+) -> np.ndarray:
+    """`how` over the observed values of the trailing `window` calendar days (today
+    included); NaN where fewer than `min_periods` days were observed.
+
+    Sums, counts and means come from cumulative sums, so the cost doesn't grow with the
+    window.
+    """
+    if window < 1:
+        raise ValueError(f"window must be at least 1 (got {window})")
+    observed = ~np.isnan(values)
+    counts = _window_total(observed.astype(np.int64), window)
+    if how == "count":
+        out = counts.astype(values.dtype)
+    elif how in ("sum", "mean"):
+        out = _window_total(np.where(observed, values, 0), window)
+        if how == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out = out / counts
+    else:
+        days = values.shape[-1]
+        padded = np.concatenate(
+            [np.full((*values.shape[:-1], window - 1), np.nan, values.dtype), values], axis=-1
+        )
+        windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=-1)
+        reduce = np.fmax if how == "max" else np.fmin  # both skip NaN
+        out = reduce.reduce(windows, axis=-1)[..., :days]
+    return np.where(counts >= max(min_periods, 1), out, np.nan)
+
+
+def _window_total(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing `window`-day sums along the last axis, from one cumulative sum."""
+    zero = np.zeros((*values.shape[:-1], 1), dtype=values.dtype)
+    total = np.concatenate([zero, np.cumsum(values, axis=-1)], axis=-1)
+    end = np.arange(1, values.shape[-1] + 1)
+    out: np.ndarray = total[..., end] - total[..., np.maximum(end - window, 0)]
+    return out
+
+
+def rank(values: np.ndarray, ascending: bool = False) -> np.ndarray:
+    """Rank of each card among those observed on the same day (1 = highest by default,
+    ties by card order); NaN where unobserved."""
+    ranked = pd.DataFrame(values).rank(axis=0, method="first", ascending=ascending)
+    out: np.ndarray = ranked.to_numpy(dtype=np.float64)
+    return out
+
+
+class PricePanel:
+    """Prices as a dense cards × calendar days array, built once from a long price frame
+    (`load_prices_df`) and shared by every analytics function.
+
+    `values[i, j]` is card `card_ids[i]`'s price on `dates[j]`: the mean of the prices
+    its sources reported that day, NaN on days without one. `source_values(name)` is the
+    same array for a single source (the mean of its duplicate rows, if any). `cards`
+    holds the card attributes (name, set_code, number, those present in the frame)
+    aligned with `card_ids`. The module's `shift`, `returns`, `rolling` and `rank` work
+    along the day axis of these arrays, so a window of N days means N calendar days,
+    whatever the gaps.
+
+    `observations()` gives the non-NaN cells of `values` as flat arrays, and
+    `source_observations()` those of every source's layer; the dense arrays are only
+    built when first used.
+    """
+
+    def __init__(
+        self,
+        card_ids: np.ndarray,
+        dates: np.ndarray,
+        observed: tuple[np.ndarray, np.ndarray, np.ndarray],
+        cards: pd.DataFrame,
+        rows: Mapping[str, np.ndarray],
+        sources: np.ndarray,
+    ) -> None:
+        self.card_ids = card_ids
+        self.dates = dates
+        self.cards = cards
+        self.sources = sources
+        self._observed = observed  # card and day positions and prices, in that order
+        self._rows = rows  # per input row: card and day position, source code, price
+        self._by_source: dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        *,
+        price_col: str = "price",
+        id_col: str = "card_id",
+        date_col: str = "date",
+    ) -> PricePanel:
+        """The panel of a long frame with a row per (card, date[, source]) price."""
+        if df[price_col].isna().any():
+            df = df[df[price_col].notna()]
+        price = df[price_col].to_numpy()
+        dtype = np.result_type(price.dtype, np.float32) if len(df) else np.float64
+        price = price.astype(dtype, copy=False)
+        card_pos, card_ids = pd.factorize(df[id_col].to_numpy(), sort=True)
+        seen = pd.Series(card_pos).drop_duplicates().index.to_numpy()
+        first = np.empty_like(seen)
+        first[card_pos[seen]] = seen  # each card's first row, in card order
+        day = df[date_col]
+        if not pd.api.types.is_datetime64_any_dtype(day):
+            day = pd.to_datetime(day)
+        day = day.to_numpy().astype("datetime64[D]")
+        start = day.min() if len(day) else np.datetime64("1970-01-01", "D")
+        day_pos = (day - start).astype(np.int64)
+        n_days = int(day_pos.max()) + 1 if len(day_pos) else 0
+        dates = np.arange(start, start + n_days).astype("datetime64[ns]")
+
+        # One mean per (card, day) over the sources.
+        cell = card_pos.astype(np.int64) * n_days + day_pos
+        in_order = price
+        if (cell[1:] < cell[:-1]).any():  # loader output is in (card, date) order already
+            order = np.argsort(cell, kind="stable")
+            cell, in_order = cell[order], price[order]
+        starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]]) if len(cell) else cell
+        sums = np.add.reduceat(in_order, starts) if len(cell) else price
+        counts = np.diff(np.r_[starts, len(cell)])
+        cell = cell[starts]
+        observed = (cell // max(n_days, 1), cell % max(n_days, 1), sums / counts)
+
+        present = [c for c in _CARD_COLUMNS if c in df.columns]
+        cards = pd.DataFrame({c: df[c].to_numpy()[first] for c in present})
+        if "source" in df.columns:
+            source_code, sources = pd.factorize(df["source"].to_numpy(dtype=object), sort=True)
+        else:
+            sources, source_code = np.array([], dtype=object), np.zeros(len(df), dtype=np.intp)
+        rows = {"card": card_pos, "day": day_pos, "source": source_code, "price": price}
+        return cls(card_ids, dates, observed, cards, rows, sources)
+
+    @classmethod
+    def of(
+        cls,
+        df: pd.DataFrame | PricePanel,
+        *,
+        price_col: str = "price",
+        id_col: str = "card_id",
+        date_col: str = "date",
+    ) -> PricePanel:
+        """`df` if it is a panel already, else the panel built from it (`from_frame`)."""
+        if isinstance(df, PricePanel):
+            return df
+        return cls.from_frame(df, price_col=price_col, id_col=id_col, date_col=date_col)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.card_ids), len(self.dates)
+
+    @cached_property
+    def values(self) -> np.ndarray:
+        card, day, price = self._observed
+        values = np.full(self.shape, np.nan, dtype=price.dtype)
+        values[card, day] = price
+        return values
+
+    def observations(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The observed cells of `values` in (card, day) order: card positions, day
+        positions and prices."""
+        return self._observed
+
+    @cached_property
+    def _source_observed(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        rows = self._rows
+        n_sources, n_days = max(len(self.sources), 1), max(len(self.dates), 1)
+        key = (rows["card"].astype(np.int64) * n_sources + rows["source"]) * n_days + rows["day"]
+        price = rows["price"]
+        if (key[1:] < key[:-1]).any():  # the loader's order is (card, date, source)
+            order = np.argsort(key, kind="stable")
+            key, price = key[order], price[order]
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]]) if len(key) else key
+        sums = np.add.reduceat(price, starts) if len(key) else price
+        counts = np.diff(np.r_[starts, len(key)])
+        series, day = np.divmod(key[starts], n_days)
+        card, source = np.divmod(series, n_sources)
+        return card, source, day, sums / counts
+
+    def source_observations(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """The observed cells of every `source_values` layer in (card, source, day) order:
+        card positions, source codes (positions in `sources`; all 0 for a frame without
+        sources), day positions and prices (the mean of duplicate rows)."""
+        return self._source_observed
+
+    def day_index(self, day: pd.Timestamp | str) -> int | None:
+        """Position of `day` on the day axis, or None outside the panel."""
+        if not len(self.dates):
+            return None
+        j = int(
+            (np.datetime64(pd.Timestamp(day), "D") - self.dates[0].astype("datetime64[D]")).astype(
+                int
+            )
+        )
+        return j if 0 <= j < len(self.dates) else None
+
+    def source_values(self, source: str) -> np.ndarray:
+        """Prices from `source` alone, like `values` (built on first use)."""
+        layer = self._by_source.get(source)
+        if layer is None:
+            codes = np.flatnonzero(self.sources == source)
+            layer = np.full(self.shape, np.nan, dtype=self.values.dtype)
+            if len(codes):
+                card, code, day, price = self._source_observed
+                mine = code == codes[0]
+                layer[card[mine], day[mine]] = price[mine]
+            self._by_source[source] = layer
+        return layer
+
+    def source_frame(
+        self,
+        day: int,
+        columns: Callable[[np.ndarray], Mapping[str, np.ndarray]],
+        *,
+        id_col: str = "card_id",
+        date_col: str = "date",
+    ) -> pd.DataFrame:
+        """A frame of the prices each source reported on `day` (a position on the day
+        axis), in card then source order: card id, card attributes, source, date, then
+        `columns(layer)` for each source's layer up to that day (arrays over cards)."""
+        cards: list[np.ndarray] = []
+        codes: list[np.ndarray] = []
+        computed: dict[str, list[np.ndarray]] = {}
+        for code, source in enumerate(self.sources):
+            layer = self.source_values(source)[:, : day + 1]
+            mine = np.flatnonzero(~np.isnan(layer[:, -1]))
+            cards.append(mine)
+            codes.append(np.full(len(mine), code))
+            for name, values in columns(layer).items():
+                computed.setdefault(name, []).append(values[mine])
+        empty = [np.array([], dtype=np.intp)]
+        order = np.lexsort((np.concatenate(codes or empty), np.concatenate(cards or empty)))
+        card = np.concatenate(cards or empty)[order]
+        code = np.concatenate(codes or empty)[order]
+        out: dict[str, np.ndarray] = {id_col: self.card_ids[card]}
+        for c in self.cards.columns:
+            out[c] = self.cards[c].to_numpy()[card]
+        out["source"] = self.sources[code]
+        out[date_col] = np.repeat(self.dates[day : day + 1], len(card))
+        for name, parts in computed.items():
+            out[name] = np.concatenate(parts)[order]
+        return pd.DataFrame(out)
+
+    def source_cells_frame(
+        self,
+        card: np.ndarray,
+        source: np.ndarray,
+        day: np.ndarray,
+        columns: Mapping[str, np.ndarray],
+        *,
+        id_col: str = "card_id",
+        date_col: str = "date",
+    ) -> pd.DataFrame:
+        """A long frame of per-source cells given by their positions (as from
+        `source_observations`), in (card, date, source) order: card id, card attributes,
+        date, source (for a frame with sources), then each of `columns` (aligned with the
+        positions)."""
+        key = (card.astype(np.int64) * len(self.dates) + day) * max(len(self.sources), 1)
+        order = np.argsort(key + source, kind="stable")  # runs of sorted keys: fast
+        card, source, day = card[order], source[order], day[order]
+        out: dict[str, np.ndarray] = {id_col: self.card_ids[card]}
+        for c in self.cards.columns:
+            out[c] = self.cards[c].to_numpy()[card]
+        out[date_col] = self.dates[day]
+        if len(self.sources):
+            out["source"] = self.sources[source]
+        out.update({name: values[order] for name, values in columns.items()})
+        return pd.DataFrame(out)
+
+    def to_frame(
+        self,
+        columns: Mapping[str, np.ndarray],
+        where: np.ndarray | None = None,
+        *,
+        id_col: str = "card_id",
+        date_col: str = "date",
+    ) -> pd.DataFrame:
+        """A long frame of the cells `where` is true, in (card, date) order: card id,
+        card attributes, date, then each of `columns` (panel-shaped arrays). Without
+        `where`, the frame of the observed cells, with `columns` given per observation
+        (aligned with `observations()`)."""
+        if where is None:
+            card, day, _ = self._observed
+            picked = dict(columns)
+        else:
+            card, day = np.nonzero(where)
+            picked = {name: values[card, day] for name, values in columns.items()}
+        out: dict[str, np.ndarray] = {id_col: self.card_ids[card]}
+        for c in self.cards.columns:
+            out[c] = self.cards[c].to_numpy()[card]
+        out[date_col] = self.dates[day]
+        out.update(picked)
+        return pd.DataFrame(out)
+
+
+__all__ = ["PricePanel", "ffill", "rank", "returns", "rolling", "shift"]
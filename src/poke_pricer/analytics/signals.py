@@ -1,31 +1,120 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator, Sequence
+
+import numpy as np
 import pandas as pd
 
+from .panel import PricePanel
+
+DEFAULT_WINDOWS = (7, 14, 30)
+# Cells per zero-padded (series × observations) block the running totals are summed on.
+_BLOCK_CELLS = 1 << 22
+
 
 def compute_signals(
-    df: pd.DataFrame,
+    df: pd.DataFrame | PricePanel,
     price_col: str = "price",
     id_col: str = "card_id",
     date_col: str = "date",
     windows: list[int] | None = None,
 ) -> pd.DataFrame:
-    """Compute simple signals: pct return, rolling SMAs, and momentum over windows."""
-    if windows is None:
-        windows = [7, 14, 30]
+    """Compute simple signals per card, source and observed day, over calendar days: pct
+    return since the previous observation from that source, rolling SMAs of the source's
+    prices observed over each window (once its history spans it), and momentum against
+    its price `w` days earlier (the last one observed by then).
+
+    `df` is a long price frame or the `PricePanel` of one; duplicate rows for a card,
+    source and day are averaged, and the output has a row per (card, date, source) in
+    that order. Every window is computed in one pass over the panel's observations,
+    without its dense arrays; the values are exactly those of the panel primitives
+    `returns(layer, 1)`, `rolling(layer, w, "mean")` and `returns(layer, w)` on each
+    source's `source_values` layer.
+    """
+    panel = PricePanel.of(df, price_col=price_col, id_col=id_col, date_col=date_col)
+    card, source, day, price = panel.source_observations()
+    series = card * max(len(panel.sources), 1) + source
+    signals, _ = signal_arrays(series, day, price, DEFAULT_WINDOWS if windows is None else windows)
+    return panel.source_cells_frame(
+        card, source, day, {price_col: price, **signals}, id_col=id_col, date_col=date_col
+    )
+
+
+def signal_arrays(
+    series: np.ndarray,
+    day: np.ndarray,
+    price: np.ndarray,
+    windows: Sequence[int],
+    *,
+    first_day: np.ndarray | None = None,
+    opening_total: np.ndarray | None = None,
+) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """ret, sma_<w> and mom_<w> of observations sorted by (series, day) (non-negative
+    integer series keys such as a card's position, or a (card, source) pair's; integer
+    days; prices), and each row's running total of its series' prices.
 
-    out = df.copy()
-    out = out.sort_values([id_col, date_col], kind="stable").reset_index(drop=True)
+    The start of each row's window is a binary search on the (series, day) keys, and the
+    window's sum a difference of the series' running totals.
 
-    out["ret"] = out.groupby(id_col)[price_col].pct_change()
+    To continue a series' signals from part of its history, pass its rows from some
+    observation on, with `first_day` the day the series was first observed and
+    `opening_total` its running total through the first row given (both per row, read at
+    each series' first one): rows at least max(windows) days after that first row come
+    out exactly as from the whole history (`services.signal_values`).
+    """
+    n = len(series)
+    row = np.arange(n)
+    new_series = np.r_[True, series[1:] != series[:-1]] if n else np.zeros(0, dtype=bool)
+    first = np.maximum.accumulate(np.where(new_series, row, 0)) if n else row
+    key = series.astype(np.int64) * (int(day.max()) + 1 if n else 1) + day
+    opening = price if opening_total is None else np.where(new_series, opening_total, price)
+    total = _running_total(series, row - first, opening)
+    start = day[first] if first_day is None else first_day[first]
+    age = day - start + 1  # days since the series' first observation, counting both
 
-    for w in windows:
-        _w = int(w)
-        out[f"sma_{_w}"] = out.groupby(id_col)[price_col].transform(
-            lambda s, _w=_w: s.rolling(_w, min_periods=_w).mean()
-        )
-        out[f"mom_{_w}"] = out.groupby(id_col)[price_col].transform(
-            lambda s, _w=_w: s / s.shift(_w) - 1.0
-        )
+    def before(days: int) -> tuple[np.ndarray, np.ndarray]:
+        """Each row's last observation of its series at least `days` days earlier, and
+        whether there is one."""
+        prior = np.searchsorted(key, key - days, side="right") - 1
+        return prior, prior >= first
 
+    out = {"ret": price / np.where(new_series, np.nan, np.roll(price, 1)) - 1.0}
+    for w in map(int, windows):
+        prior, has_prior = before(w)
+        window_sum = total - np.where(has_prior, total[prior], 0)
+        count = np.where(has_prior, row - prior, row - first + 1)
+        out[f"sma_{w}"] = np.where(age >= w, window_sum / count, np.nan)
+        out[f"mom_{w}"] = price / np.where(has_prior, price[prior], np.nan) - 1.0
+    return out, total
+
+
+def _running_total(series: np.ndarray, rank: np.ndarray, price: np.ndarray) -> np.ndarray:
+    """Cumulative sum of each series' `price` values (`rank`: position within it).
+
+    Series are summed a block at a time as rows of a zero-padded (series × observations)
+    array, so each total comes from the same additions, in the same order, as a
+    cumulative sum along the series' days in its dense panel layer.
+    """
+    out = np.empty_like(price)
+    if not len(price):
+        return out
+    width = int(rank.max()) + 1
+    step = max(1, _BLOCK_CELLS // width)
+    for lo in range(int(series[0]), int(series[-1]) + 1, step):
+        a, b = np.searchsorted(series, [lo, lo + step])
+        cell = (series[a:b] - lo, rank[a:b])
+        block = np.zeros((step, width), dtype=price.dtype)
+        block[cell] = price[a:b]
+        np.cumsum(block, axis=1, out=block)
+        out[a:b] = block[cell]
     return out
+
+
+def iter_signals(
+    chunks: Iterable[pd.DataFrame], windows: list[int] | None = None
+) -> Iterator[pd.DataFrame]:
+    """`compute_signals` chunk by chunk. Every signal is per card and source, so for chunks
+    that hold whole cards (`iter_prices`) the concatenated output equals one call on all
+    prices."""
+    for chunk in chunks:
+        yield compute_signals(chunk, windows=windows)
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+import uuid
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from ..db import current_settings
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 2
+# Stored per price row, in (card_id, date, id) order: day numbers and source ids.
+ROW_DTYPES = {
+    "id": np.int64,
+    "card_id": np.int64,
+    "date": np.int32,
+    "source": np.int32,
+    "price": np.float64,
+}
+_DIMENSIONS = {"cards": ["id", "name", "set_code", "number"], "sources": ["id", "name"]}
+# A refresh is stored as a delta beside the base until the deltas would hold more than
+# this share of the base's rows, or this many files; then a new base is written.
+_DELTA_SHARE = 0.125
+_MAX_DELTAS = 32
+
+
+class PriceSnapshot(NamedTuple):
+    """The full price history of one database as plain columns, at one data version:
+    a base written once, plus the rows written since (stored as per-generation deltas)."""
+
+    version: tuple[str, int]  # `db.data_version` of the database it was read from
+    rows: dict[str, np.ndarray]  # the base's ROW_DTYPES fields; memory-mapped once written
+    cards: list[np.ndarray]  # ids (ascending), names, set codes, numbers
+    sources: list[np.ndarray]  # ids (ascending), names
+    watermarks: dict[str, int]  # highest price id read, per partition ("main" or schema)
+    path: Path | None = None  # the base's directory, once written
+    added: dict[str, np.ndarray] | None = None  # rows since the base, same fields and order
+    deltas: int = 0  # delta files `added` was read from
+
+    def row_count(self) -> int:
+        return len(self.rows["id"]) + (0 if self.added is None else len(self.added["id"]))
+
+
+def _row_keys(rows: Mapping[str, np.ndarray]) -> np.ndarray:
+    """One ascending int64 per (card_id, date) of rows in that order (days within ±2**20)."""
+    return rows["card_id"].astype(np.int64) * (1 << 21) + (
+        rows["date"].astype(np.int64) + (1 << 20)
+    )
+
+
+def merge_rows(
+    rows: Mapping[str, np.ndarray], added: Mapping[str, np.ndarray]
+) -> dict[str, np.ndarray]:
+    """The fields `rows` and `added` (both in (card_id, date, id) order) have in common,
+    as one set in that order. Added rows go after those of the same (card, date): they
+    were written later, so their ids are higher."""
+    fields = [f for f in rows if f in added]
+    if not len(added["card_id"]):
+        return {f: np.asarray(rows[f]) for f in fields}
+    at = np.searchsorted(_row_keys(rows), _row_keys(added), side="right")
+    return {f: np.insert(rows[f], at, added[f]) for f in fields}
+
+
+def snapshot_root(token: str) -> Path | None:
+    """Where the snapshots of the database with data version `token` live, or None when
+    snapshots are off (`Settings.price_snapshot`)."""
+    settings = current_settings()
+    if not settings.price_snapshot:
+        return None
+    return settings.data_dir / "snapshots" / token
+
+
+def _concat(parts: Sequence[Mapping[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    """Sets of rows, each in (card_id, date, id) order and each written after the ones
+    before it, as one set in that order."""
+    rows = {f: np.concatenate([p[f] for p in parts]) for f in ROW_DTYPES}
+    order = np.lexsort((rows["date"], rows["card_id"]))  # stable: later parts stay after
+    return {f: v[order] for f, v in rows.items()}
+
+
+def _complete(root: Path, prefix: str) -> list[tuple[str, Path]]:
+    """(name without `prefix`, path) of the complete snapshot directories under `root`
+    whose names start with `prefix`."""
+    if not root.is_dir():
+        return []
+    return [
+        (path.name[len(prefix) :], path)
+        for path in root.iterdir()
+        if path.name.startswith(prefix) and (path / "meta.json").exists()
+    ]
+
+
+def _generations(root: Path) -> list[Path]:
+    """The complete base directories under `root`, newest generation first."""
+    found = [(int(name), path) for name, path in _complete(root, "g") if name.isdigit()]
+    return [path for _, path in sorted(found, reverse=True)]
+
+
+def _delta_chain(base: Path, generation: int) -> list[Path]:
+    """The deltas of `base` (generation `generation`) that apply in turn: each starts
+    from the generation the previous one reached, taking the furthest-reaching one
+    where processes refreshed from the same generation at once."""
+    reach: dict[int, tuple[int, Path]] = {}
+    for name, path in _complete(base, "d"):
+        to, _, since = name.partition("-")
+        if to.isdigit() and since.isdigit() and int(to) > reach.get(int(since), (-1,))[0]:
+            reach[int(since)] = (int(to), path)
+    chain = []
+    while generation in reach:
+        generation, path = reach[generation]
+        chain.append(path)
+    return chain
+
+
+def _load_dimensions(path: Path) -> list[list[np.ndarray]]:
+    dims = [
+        [np.load(path / f"{dim}.{f}.npy") for f in fields] for dim, fields in _DIMENSIONS.items()
+    ]
+    return [[d[0], *(v.astype(object) for v in d[1:])] for d in dims]
+
+
+def _meta(path: Path) -> dict[str, Any]:
+    meta: dict[str, Any] = json.loads((path / "meta.json").read_text())
+    if meta["format"] != SNAPSHOT_FORMAT:
+        raise ValueError(f"snapshot format {meta['format']} (expected {SNAPSHOT_FORMAT})")
+    return meta
+
+
+def _read(path: Path) -> PriceSnapshot:
+    meta = _meta(path)
+    rows = {f: np.load(path / f"{f}.npy", mmap_mode="r") for f in ROW_DTYPES}
+    chain = _delta_chain(path, int(meta["generation"]))
+    added = None
+    if chain:
+        added = _concat([{f: np.load(d / f"{f}.npy") for f in ROW_DTYPES} for d in chain])
+        meta = _meta(chain[-1])
+    cards, sources = _load_dimensions(chain[-1] if chain else path)
+    version = (str(meta["token"]), int(meta["generation"]))
+    return PriceSnapshot(
+        version, rows, cards, sources, dict(meta["watermarks"]), path, added, len(chain)
+    )
+
+
+def read_snapshot(token: str) -> PriceSnapshot | None:
+    """The newest snapshot written for the database with data version `token` (whatever
+    its generation), memory-mapped; None if there is none."""
+    root = snapshot_root(token)
+    if root is None:
+        return None
+    for path in _generations(root):
+        try:
+            return _read(path)
+        except (OSError, KeyError, ValueError):  # removed meanwhile, or another format
+            continue
+    return None
+
+
+def _write_dir(
+    final: Path,
+    rows: Mapping[str, np.ndarray],
+    cards: list[np.ndarray],
+    sources: list[np.ndarray],
+    meta: dict[str, Any],
+) -> bool:
+    """Write one snapshot directory: into a scratch directory renamed into place when
+    complete, so readers never see a partial one. False if it can't be written."""
+    scratch = final.parent / f".tmp-{uuid.uuid4().hex}"
+    try:
+        scratch.mkdir(parents=True)
+        for f, dtype in ROW_DTYPES.items():
+            np.save(scratch / f"{f}.npy", np.ascontiguousarray(rows[f], dtype=dtype))
+        for dim, values in (("cards", cards), ("sources", sources)):
+            for f, v in zip(_DIMENSIONS[dim], values, strict=True):
+                np.save(scratch / f"{dim}.{f}.npy", v if f == "id" else np.asarray(v, dtype=str))
+        meta = {"format": SNAPSHOT_FORMAT, "rows": len(rows["id"]), **meta}
+        (scratch / "meta.json").write_text(json.dumps(meta))
+        if not final.exists():  # else another process wrote it first
+            scratch.rename(final)
+    except OSError as e:
+        log.warning("price snapshot not written to %s: %s", final, e)
+        return False
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return True
+
+
+def _version_meta(snap: PriceSnapshot) -> dict[str, Any]:
+    return {"token": snap.version[0], "generation": snap.version[1], "watermarks": snap.watermarks}
+
+
+def write_snapshot(snap: PriceSnapshot) -> PriceSnapshot:
+    """Store `snap` as a new base for its data version and return it memory-mapped from
+    there (its `added` rows merged in); older bases and their deltas are removed
+    afterwards. If the files can't be written, `snap` is returned as it is.
+    """
+    root = snapshot_root(snap.version[0])
+    if root is None:
+        return snap
+    rows = snap.rows if snap.added is None else merge_rows(snap.rows, snap.added)
+    final = root / f"g{snap.version[1]}"
+    if not _write_dir(final, rows, snap.cards, snap.sources, _version_meta(snap)):
+        return snap
+    for path in _generations(root):
+        if path != final:
+            shutil.rmtree(path, ignore_errors=True)
+    try:
+        return _read(final)
+    except (OSError, KeyError, ValueError):  # already replaced by a newer base
+        return snap
+
+
+def append_snapshot(
+    snap: PriceSnapshot,
+    version: tuple[str, int],
+    rows: Mapping[str, np.ndarray],
+    watermarks: dict[str, int],
+    cards: list[np.ndarray],
+    sources: list[np.ndarray],
+) -> PriceSnapshot:
+    """`snap` brought to `version` by the price `rows` written since (ROW_DTYPES fields,
+    in (card_id, date, id) order), read up to `watermarks`, with the current `cards` and
+    `sources` dimensions; memory-mapped from disk where it could be stored.
+
+    Only the new rows are written, as a delta beside `snap`'s base: the history is not
+    rewritten. Once the deltas would hold more than 1/8 of the base's rows (or 32
+    files), a new base is written instead (`write_snapshot`).
+    """
+    added = dict(rows) if snap.added is None else _concat([snap.added, rows])
+    fresh = snap._replace(
+        version=version, cards=cards, sources=sources, watermarks=watermarks, added=added
+    )
+    base = snap.path
+    full = snap.deltas >= _MAX_DELTAS or len(added["id"]) > _DELTA_SHARE * len(snap.rows["id"])
+    if base is None or full:
+        return write_snapshot(fresh)
+    final = base / f"d{version[1]}-{snap.version[1]}"
+    if not _write_dir(final, rows, cards, sources, _version_meta(fresh)):
+        return fresh
+    try:
+        return _read(base)
+    except (OSError, KeyError, ValueError):  # the base was replaced meanwhile
+        return fresh
+
+
+__all__ = [
+    "ROW_DTYPES",
+    "PriceSnapshot",
+    "append_snapshot",
+    "merge_rows",
+    "read_snapshot",
+    "snapshot_root",
+    "write_snapshot",
+]
@@ -6,9 +6,11 @@ from fastapi import Body, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from ..analytics.data_access import load_prices_df
-from ..analytics.movers import compute_top_movers
+from ..analytics.data_access import load_latest_df, load_price_window, load_prices_df
+from ..analytics.frame_cache import frame_cache_stats
+from ..analytics.movers import RETURN_LOOKBACK_DAYS, compute_top_movers
 from ..catalog.stats import catalog_summary_df
+from ..db import get_engine, pool_stats, read_pragmas
 
 # -------------------------------
 # Pydantic models (request/response)
@@ -20,6 +22,31 @@ class HealthResponse(BaseModel):
     version: str
 
 
+class PoolStats(BaseModel):
+    url: str
+    pool: str
+    size: int | None = None
+    checkedin: int | None = None
+    checkedout: int | None = None
+    overflow: int | None = None
+
+
+class FrameCacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    nbytes: int
+    budget: int
+
+
+class DbInfo(BaseModel):
+    url: str
+    pragmas: dict[str, str]
+    pools: list[PoolStats]
+    frame_cache: FrameCacheStats
+
+
 class CatalogSummary(BaseModel):
     total_cards: int
     total_prices: int
@@ -150,18 +177,6 @@ def _normalize_prices_df(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
-def _latest_per_card(df: pd.DataFrame) -> pd.DataFrame:
-    """Return latest row per card_id based on 'date'."""
-    if df.empty:
-        return df.copy()
-    if "card_id" not in df.columns or "date" not in df.columns:
-        return df.iloc[0:0].copy()
-
-    srt = df.sort_values(["card_id", "date"])
-    latest = srt.groupby("card_id", as_index=False).tail(1).reset_index(drop=True)
-    return latest
-
-
 # -------------------------------
 # Endpoints
 # -------------------------------
@@ -173,6 +188,18 @@ def health() -> HealthResponse:
     return HealthResponse(status="ok", version="0.1.0")
 
 
+@app.get("/v1/meta/db", response_model=DbInfo, tags=["Meta"])  # type: ignore[misc]
+def db_info() -> DbInfo:
+    """Database URL, the connection settings in effect, pool and frame-cache statistics."""
+    engine = get_engine()
+    return DbInfo(
+        url=str(engine.url),
+        pragmas=read_pragmas(engine),
+        pools=[PoolStats(**p) for p in pool_stats()],
+        frame_cache=FrameCacheStats(**frame_cache_stats()._asdict()),
+    )
+
+
 @app.get(
     "/v1/catalog/summary",
     response_model=CatalogSummary,
@@ -215,7 +242,7 @@ def top_movers(
     Return top-K winners and losers for a day.
     When there is no data, returns an empty list.
     """
-    df = load_prices_df()
+    df = load_price_window(on_date, RETURN_LOOKBACK_DAYS)
     if df.empty:
         return []
 
@@ -250,15 +277,7 @@ def card_search(
     ),
 ) -> list[CardSearchItem]:
     """Search by name across the latest snapshot of each card."""
-    df_raw = load_prices_df()
-    if df_raw.empty:
-        return []
-
-    df = _normalize_prices_df(df_raw)
-    latest = _latest_per_card(df)
-
-    mask = latest["name"].str.contains(q, case=False, na=False)
-    hits = latest.loc[mask, ["card_id", "name", "set_code", "number"]]
+    hits = load_latest_df(name_pattern=q)
     out = [
         CardSearchItem(
             card_id=int(r["card_id"]),
@@ -278,16 +297,11 @@ def card_search(
 )  # type: ignore[misc]
 def card_by_id(card_id: int) -> CardDetail:
     """Return card details using the latest price snapshot for that card."""
-    df_raw = load_prices_df()
-    if df_raw.empty:
-        raise HTTPException(status_code=404, detail="Card not found")
-
-    df = _normalize_prices_df(df_raw)
-    one = df.loc[df["card_id"] == card_id]
+    one = load_latest_df([card_id])
     if one.empty:
         raise HTTPException(status_code=404, detail="Card not found")
 
-    last = one.sort_values("date").tail(1).iloc[0]
+    last = one.iloc[0]
     return CardDetail(
         card_id=int(last["card_id"]),
         name=str(last["name"]),
@@ -314,7 +328,7 @@ def card_prices(
     ),
 ) -> list[CardPricePoint]:
     """Return price history for a card (most recent first)."""
-    df_raw = load_prices_df()
+    df_raw = load_prices_df(card_ids=[card_id], columns=["card_id", "date", "source", "price"])
     if df_raw.empty:
         return []
 
@@ -349,17 +363,7 @@ def portfolio_value(
     ),
 ) -> PortfolioValueResponse:
     """Compute current portfolio value based on latest prices."""
-    df_raw = load_prices_df()
-    if df_raw.empty:
-        return PortfolioValueResponse(
-            total_value=0.0,
-            positions=[],
-            missing_card_ids=[h.card_id for h in req.holdings],
-        )
-
-    df = _normalize_prices_df(df_raw)
-    latest = _latest_per_card(df)
-
+    latest = load_latest_df([h.card_id for h in req.holdings])
     idx = latest.set_index("card_id")
     positions: list[PositionValue] = []
     missing: list[int] = []
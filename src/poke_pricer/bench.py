@@ -0,0 +1,296 @@
+"""Benchmark harness for the hot paths (`poke-pricer bench`).
+
+Each scale is a deterministic synthetic market (`services.market`), loaded into its own
+SQLite file. Every case is timed over a few runs (best and median wall time), then run
+once more under tracemalloc for its peak Python-heap allocation (numpy/pandas buffers
+included; Arrow's own allocator is not). Results are plain JSON, so a saved run can be
+the baseline later runs are compared against.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator, Sequence
+from datetime import UTC, date, datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from . import __version__
+from .config import Settings
+from .db import dispose_engines, get_engine
+from .services.market import generate_market, write_market_db, write_market_file
+
+
+class Scale(NamedTuple):
+    cards: int
+    days: int
+    sources: int
+
+
+SCALES: dict[str, Scale] = {
+    "tiny": Scale(cards=40, days=30, sources=2),
+    "small": Scale(cards=200, days=180, sources=3),
+    "medium": Scale(cards=5_000, days=365, sources=3),
+    "large": Scale(cards=20_000, days=1_095, sources=3),
+}
+
+# Fixed, so a scale and seed always describe the same dataset.
+_END = date(2025, 1, 1)
+_FORMAT_VERSION = 1
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[], object]
+    setup: Callable[[], None] | None = None  # before every run, untimed
+
+
+class BenchResult(NamedTuple):
+    scale: str
+    name: str
+    seconds: float  # best of `repeat`
+    median: float
+    repeat: int
+    peak_mb: float
+
+
+class Comparison(NamedTuple):
+    scale: str
+    name: str
+    metric: str  # "seconds" or "peak_mb"
+    baseline: float
+    current: float
+    regressed: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+@contextlib.contextmanager
+def _sqlite_path(path: Path) -> Iterator[None]:
+    """Point every `get_engine()` (the code under test) at `path` for the duration."""
+    old = os.environ.get("POKEPRICER_SQLITE_PATH")
+    os.environ["POKEPRICER_SQLITE_PATH"] = str(path)
+    try:
+        yield
+    finally:
+        if old is None:
+            del os.environ["POKEPRICER_SQLITE_PATH"]
+        else:
+            os.environ["POKEPRICER_SQLITE_PATH"] = old
+
+
+def prepare_dataset(scale: str, data_dir: Path, seed: int = 42) -> tuple[Path, Path]:
+    """(SQLite DB, CSV) holding the scale's market; reused when already in `data_dir`."""
+    s = SCALES[scale]
+    stem = f"bench-{scale}-{s.cards}x{s.days}x{s.sources}-seed{seed}"
+    db_path = data_dir / f"{stem}.db"
+    csv_path = data_dir / f"{stem}.csv"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    if not db_path.exists():
+        tmp = db_path.with_suffix(".tmp")
+        tmp.unlink(missing_ok=True)
+        engine = get_engine(Settings(sqlite_path=tmp))
+        write_market_db(generate_market(*s, seed, end=_END), engine)
+        dispose_engines(tmp)
+        tmp.rename(db_path)
+    if not csv_path.exists():
+        tmp = csv_path.with_suffix(".tmp.csv")
+        write_market_file(generate_market(*s, seed, end=_END), tmp)
+        tmp.rename(csv_path)
+    return db_path, csv_path
+
+
+def _cases(csv_path: Path, scratch_db: Path) -> list[Case]:
+    """The hot paths, run against the DB that `POKEPRICER_SQLITE_PATH` points at."""
+    from fastapi.testclient import TestClient
+
+    from .analytics.backtest import backtest_momentum_topk
+    from .analytics.data_access import load_prices_df
+    from .analytics.frame_cache import clear_frame_cache
+    from .analytics.movers import compute_top_movers
+    from .analytics.panel import PricePanel
+    from .analytics.signals import compute_signals
+    from .api.app import app
+    from .ingest.csv_ingest import ingest_csv, validate_csv
+    from .reports.anomalies import scan_anomalies_df
+
+    df = load_prices_df()
+    card_ids = sorted(df["card_id"].unique().tolist())
+    card_id = int(card_ids[len(card_ids) // 2])
+    holdings = [
+        {"card_id": int(c), "quantity": 2.0} for c in card_ids[:: max(1, len(card_ids) // 25)]
+    ]
+    client = TestClient(app)
+
+    def get(url: str) -> Callable[[], object]:
+        def run() -> object:
+            r = client.get(url)
+            r.raise_for_status()
+            return r
+
+        return run
+
+    def portfolio() -> object:
+        r = client.post("/v1/portfolio/value", json={"holdings": holdings})
+        r.raise_for_status()
+        return r
+
+    def fresh_scratch() -> None:
+        dispose_engines(scratch_db)
+        scratch_db.unlink(missing_ok=True)
+
+    def ingest() -> object:
+        with _sqlite_path(scratch_db):
+            return ingest_csv(csv_path)
+
+    return [
+        Case("load_prices_df", load_prices_df, setup=clear_frame_cache),
+        Case("PricePanel.from_frame", lambda: PricePanel.from_frame(df)),
+        Case("compute_signals", lambda: compute_signals(df)),
+        Case("backtest_momentum_topk", lambda: backtest_momentum_topk(df, lookback=14, top_k=5)),
+        Case("scan_anomalies_df", lambda: scan_anomalies_df(df)),
+        Case("compute_top_movers", lambda: compute_top_movers(df, k=10)),
+        Case("api.catalog_summary", get("/v1/catalog/summary")),
+        Case("api.top_movers", get("/v1/reports/top-movers?k=10")),
+        Case("api.card_search", get("/v1/cards/search?q=chu")),
+        Case("api.card_detail", get(f"/v1/cards/{card_id}")),
+        Case("api.card_prices", get(f"/v1/cards/{card_id}/prices?limit=100")),
+        Case("api.portfolio_value", portfolio),
+        Case("validate_csv", lambda: validate_csv(csv_path)),
+        Case("ingest_csv", ingest, setup=fresh_scratch),
+    ]
+
+
+def _measure(case: Case, repeat: int) -> tuple[list[float], float]:
+    times: list[float] = []
+    for _ in range(repeat):
+        if case.setup is not None:
+            case.setup()
+        gc.collect()
+        started = time.perf_counter()
+        case.run()
+        times.append(time.perf_counter() - started)
+    # Memory in a separate run: tracemalloc slows allocation-heavy code down.
+    if case.setup is not None:
+        case.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return times, peak / 2**20
+
+
+def run_benchmarks(
+    scales: Sequence[str],
+    data_dir: Path,
+    *,
+    repeat: int = 3,
+    only: Sequence[str] | None = None,
+    seed: int = 42,
+    on_result: Callable[[BenchResult], None] | None = None,
+) -> list[BenchResult]:
+    """Time every case (or the ones named in `only`) at each scale."""
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        raise ValueError(f"unknown scale(s) {unknown}; choose from {list(SCALES)}")
+    if repeat < 1:
+        raise ValueError(f"repeat must be >= 1 (got {repeat})")
+    results: list[BenchResult] = []
+    for scale in scales:
+        db_path, csv_path = prepare_dataset(scale, data_dir, seed)
+        with _sqlite_path(db_path):
+            cases = _cases(csv_path, data_dir / f"bench-{scale}-ingest.db")
+            names = {c.name for c in cases}
+            missing = [n for n in only or () if n not in names]
+            if missing:
+                raise ValueError(f"unknown case(s) {missing}; choose from {sorted(names)}")
+            for case in cases:
+                if only and case.name not in only:
+                    continue
+                times, peak_mb = _measure(case, repeat)
+                result = BenchResult(
+                    scale, case.name, min(times), statistics.median(times), repeat, peak_mb
+                )
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        dispose_engines(data_dir / f"bench-{scale}-ingest.db")
+        (data_dir / f"bench-{scale}-ingest.db").unlink(missing_ok=True)
+    return results
+
+
+def save_results(path: Path, results: Sequence[BenchResult], *, seed: int = 42) -> None:
+    payload: dict[str, Any] = {
+        "format": _FORMAT_VERSION,
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        },
+        "results": [r._asdict() for r in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def load_results(path: Path) -> list[BenchResult]:
+    payload = json.loads(path.read_text())
+    if payload.get("format") != _FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark file format {payload.get('format')!r}")
+    return [BenchResult(**r) for r in payload["results"]]
+
+
+def compare(
+    results: Sequence[BenchResult],
+    baseline: Sequence[BenchResult],
+    *,
+    time_threshold: float = 0.25,
+    memory_threshold: float = 0.25,
+    min_seconds: float = 0.01,
+) -> list[Comparison]:
+    """Compare each (scale, case) present in both runs.
+
+    A case regresses when its best time grows by more than `time_threshold` (a fraction)
+    and by at least `min_seconds` (timer noise on very fast cases), or its peak memory
+    grows by more than `memory_threshold`.
+    """
+    base = {(b.scale, b.name): b for b in baseline}
+    out: list[Comparison] = []
+    for r in results:
+        b = base.get((r.scale, r.name))
+        if b is None:
+            continue
+        slower = (
+            r.seconds > b.seconds * (1 + time_threshold) and r.seconds - b.seconds >= min_seconds
+        )
+        bigger = r.peak_mb > b.peak_mb * (1 + memory_threshold)
+        out.append(Comparison(r.scale, r.name, "seconds", b.seconds, r.seconds, slower))
+        out.append(Comparison(r.scale, r.name, "peak_mb", b.peak_mb, r.peak_mb, bigger))
+    return out
+
+
+__all__ = [
+    "SCALES",
+    "Scale",
+    "BenchResult",
+    "Comparison",
+    "prepare_dataset",
+    "run_benchmarks",
+    "save_results",
+    "load_results",
+    "compare",
+]
@@ -5,11 +5,12 @@ from pathlib import Path
 from typing import Any
 
 import pandas as pd
-from sqlalchemy import func
-from sqlmodel import Session, select
+from sqlalchemy import func, select, union_all
+from sqlmodel import col
 
-from ..db import get_engine
-from ..models import PricePoint
+from ..analytics.frame_cache import cached_frame
+from ..db import get_engine, price_tables
+from ..models import Source
 
 
 def _normalize_sources(values: Sequence[Any]) -> list[str]:
@@ -28,18 +29,36 @@ def _normalize_sources(values: Sequence[Any]) -> list[str]:
 
 
 def catalog_summary_df() -> pd.DataFrame:
-    """Return a one-row DataFrame with dataset summary."""
-    engine = get_engine()
-    with Session(engine) as session:
-        total_prices = session.exec(select(func.count()).select_from(PricePoint)).one()
+    """Return a one-row DataFrame with dataset summary (cached until the next price
+    write, see `analytics.frame_cache`)."""
+    return cached_frame(("catalog_summary",), _catalog_summary_df)
+
 
-        total_cards = session.exec(select(func.count(func.distinct(PricePoint.card_id)))).one()
+def _catalog_summary_df() -> pd.DataFrame:
+    engine = get_engine()
+    with engine.connect() as conn:
+        # Across the main table and any archive partitions (`db archive`).
+        tables = price_tables(conn)
+        total_prices = sum(
+            conn.execute(select(func.count()).select_from(t)).scalar_one() for t in tables
+        )
 
-        min_date = session.exec(select(func.min(PricePoint.date))).one_or_none()
+        card_ids = union_all(*(select(t.c.card_id) for t in tables)).subquery()
+        total_cards = conn.execute(
+            select(func.count(func.distinct(card_ids.c.card_id)))
+        ).scalar_one()
 
-        max_date = session.exec(select(func.max(PricePoint.date))).one_or_none()
+        spans = [conn.execute(select(func.min(t.c.date), func.max(t.c.date))).one() for t in tables]
+        min_date = min((lo for lo, _ in spans if lo is not None), default=None)
+        max_date = max((hi for _, hi in spans if hi is not None), default=None)
 
-        sources_raw = session.exec(select(PricePoint.source).distinct()).all()
+        # Distinct stored ids first, so each name is looked up once rather than per row.
+        used_ids = union_all(*(select(t.c.source).distinct() for t in tables))
+        sources_raw = (
+            conn.execute(select(col(Source.name)).where(col(Source.id).in_(used_ids)))
+            .scalars()
+            .all()
+        )
         sources_list = _normalize_sources(sources_raw)
 
     df = pd.DataFrame(
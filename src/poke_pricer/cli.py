@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import contextlib
+import tempfile
+import time
+from datetime import date
 from pathlib import Path
 from typing import Annotated
 
@@ -7,16 +11,34 @@ import typer
 from rich.console import Console
 
 from .analytics.backtest import backtest_momentum_topk
-from .analytics.data_access import load_prices_df
-from .analytics.signals import compute_signals
+from .analytics.data_access import (
+    iter_prices,
+    load_prices_df,
+    price_memory_report,
+    price_snapshot,
+)
+from .analytics.signals import iter_signals
 from .catalog.stats import catalog_summary_df, export_catalog_csv
 from .config import Settings
-from .db import init_db
-from .ingest.csv_ingest import ingest_csv, ingest_dir, validate_csv
+from .db import get_engine, init_db, pool_stats, read_pragmas, rebuild_card_latest
+from .ingest.csv_ingest import (
+    DEFAULT_BATCH_SIZE,
+    ingest_csv,
+    ingest_dir_per_file,
+    validate_csv,
+)
+from .ingest.watch import FolderWatcher, WatchResult
 from .io.csv_io import export_prices_csv
+from .services.archive import archive_prices
+from .services.compact import compact_db
+from .services.market import generate_market, write_market_db, write_market_file
+from .services.optimize import optimize_db
 from .services.seed import seed_demo
+from .services.signal_values import materialize_signals
 
 console = Console()
+# `bench` datasets: reused across runs, kept out of the working tree
+BENCH_DATA_DIR = Path(tempfile.gettempdir()) / "poke-pricer-bench"
 app = typer.Typer(no_args_is_help=True)
 
 db_app = typer.Typer()
@@ -84,11 +106,113 @@ def env() -> None:
 # ---- db ----
 @db_app.command("init")
 def db_init() -> None:
-    """Create database tables."""
+    """Create database tables (converting one from before compact storage)."""
     init_db()
     console.print("[green]DB initialized[/green]")
 
 
+@db_app.command("optimize")
+def db_optimize() -> None:
+    """Add covering price indexes, run ANALYZE and show query plans before/after."""
+    started = time.perf_counter()
+    try:
+        result = optimize_db()
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+    for label, before in result.before.items():
+        console.print(f"[bold]{label}[/bold]")
+        for line in before:
+            console.print(f"  before: {line}")
+        for line in result.after[label]:
+            console.print(f"  after:  {line}")
+    created = ", ".join(result.created) or "none (already present)"
+    console.print(
+        f"[green]Optimized[/green] in {time.perf_counter() - started:.2f}s; "
+        f"indexes created: {created}"
+    )
+
+
+@db_app.command("compact")
+def db_compact() -> None:
+    """Convert prices to compact storage (day numbers, source ids) in place and VACUUM."""
+    try:
+        result = compact_db()
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+    status = "Converted" if result.converted else "Already compact, vacuumed"
+    mib = 1024 * 1024
+    console.print(f"[green]{status}[/green]: {result.rows} price rows")
+    console.print(
+        f"file size: {result.size_before / mib:.1f} MiB -> {result.size_after / mib:.1f} MiB"
+    )
+    console.print(f"full scan: {result.scan_before:.3f}s -> {result.scan_after:.3f}s")
+
+
+@db_app.command("archive")
+def db_archive(
+    before: Annotated[
+        int,
+        typer.Option("--before", help="Move prices dated before 1 January of this year", min=1),
+    ],
+) -> None:
+    """Move old prices into one archive SQLite file per year, attached on every connection."""
+    started = time.perf_counter()
+    try:
+        archived = archive_prices(before)
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+    if not archived:
+        console.print(f"[yellow]No prices before {before} in the main database.[/yellow]")
+        return
+    for a in archived:
+        console.print(f"{a.year}: {a.rows} price rows -> {a.path}")
+    total = sum(a.rows for a in archived)
+    console.print(
+        f"[green]Archived[/green] {total} price rows in {time.perf_counter() - started:.2f}s"
+    )
+
+
+@db_app.command("rebuild-latest")
+def db_rebuild_latest() -> None:
+    """Regenerate the card_latest table (latest price per card) from the price history."""
+    started = time.perf_counter()
+    init_db()
+    n = rebuild_card_latest()
+    console.print(
+        f"[green]Rebuilt[/green] card_latest: {n} cards in {time.perf_counter() - started:.2f}s"
+    )
+
+
+@db_app.command("snapshot")
+def db_snapshot() -> None:
+    """Bring the on-disk price snapshot up to date now (refreshed or rebuilt) and show it."""
+    started = time.perf_counter()
+    snap = price_snapshot()
+    if snap is None:
+        console.print("[yellow]Price snapshots are off (POKEPRICER_PRICE_SNAPSHOT).[/yellow]")
+        return
+    console.print(
+        f"[green]Snapshot[/green] of {snap.row_count()} price rows at data version "
+        f"{snap.version[1]} in {time.perf_counter() - started:.2f}s"
+    )
+    if snap.path is not None:
+        size = sum(p.stat().st_size for p in snap.path.rglob("*") if p.is_file())
+        console.print(
+            f"path = {snap.path} ({size / (1024 * 1024):.1f} MiB, {snap.deltas} delta files)"
+        )
+
+
+@db_app.command("info")
+def db_info() -> None:
+    """Show the database URL, connection PRAGMAs in effect and pool statistics."""
+    engine = get_engine()
+    console.print(f"url = {engine.url}")
+    for name, value in read_pragmas(engine).items():
+        console.print(f"{name} = {value}")
+    for stats in pool_stats():
+        console.print(" ".join(f"{k}={v}" for k, v in stats.items()))
+
+
 # ---- demo ----
 @demo_app.command("seed")
 def demo_seed() -> None:
@@ -97,6 +221,46 @@ def demo_seed() -> None:
     console.print(f"[green]Seeded[/green] {num_cards} cards and {num_prices} price points.")
 
 
+@demo_app.command("generate")
+def demo_generate(
+    cards: Annotated[int, typer.Option("--cards", help="Number of cards", min=1)] = 1000,
+    days: Annotated[int, typer.Option("--days", help="Days of price history", min=1)] = 365,
+    sources: Annotated[int, typer.Option("--sources", help="Price sources", min=1)] = 3,
+    seed: Annotated[int, typer.Option("--seed", help="Random seed (same seed, same data)")] = 42,
+    end: Annotated[
+        str | None,
+        typer.Option("--end", help="Last day of history, YYYY-MM-DD (defaults to today)"),
+    ] = None,
+    out: Annotated[
+        Path | None,
+        typer.Option(
+            "--out",
+            help="Write an ingestable .csv[.gz|.bz2|.xz]/.parquet/.arrow file instead of the DB",
+            dir_okay=False,
+        ),
+    ] = None,
+) -> None:
+    """Generate a synthetic market (random walks, jumps, gaps, new sets) for load testing."""
+    try:
+        last_day = date.fromisoformat(end) if end else None
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--end") from e
+    started = time.perf_counter()
+    chunks = generate_market(cards, days, sources, seed, end=last_day)
+    try:
+        if out is None:
+            num_cards, num_prices = write_market_db(chunks)
+        else:
+            num_cards, num_prices = write_market_file(chunks, out)
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+    elapsed = time.perf_counter() - started
+    console.print(
+        f"[green]Generated[/green] {num_cards} cards and {num_prices} price points "
+        f"into {out or 'the database'} in {elapsed:.1f}s ({num_prices / elapsed:,.0f} rows/s)."
+    )
+
+
 # ---- prices ----
 @prices_app.command("export")
 def prices_export(
@@ -116,6 +280,21 @@ def prices_export(
     console.print(f"[green]Exported[/green] {n} rows to {out}")
 
 
+@prices_app.command("memory")
+def prices_memory() -> None:
+    """Show the memory each column of the price frame takes, default vs compact dtypes."""
+    report = price_memory_report()
+    mib = 1024 * 1024
+    console.print(f"{'column':<10}" + "".join(f"{kind:>18}" for kind in report.columns))
+    for column, row in report.iterrows():
+        cells = "".join(f"{n / mib:>14.1f} MiB" for n in row)
+        console.print(f"{column!s:<10}{cells}")
+    total = report.loc["total"]
+    for kind in report.columns[1:]:
+        share = total[kind] / total["default"] if total["default"] else 1.0
+        console.print(f"{kind}: {share:.0%} of default")
+
+
 # ---- signals ----
 @signals_app.command("compute")
 def signals_compute(
@@ -131,17 +310,48 @@ def signals_compute(
     ],
 ) -> None:
     """Compute basic signals and write CSV."""
-    df = load_prices_df()
-    if df.empty:
+    n = 0
+    # A chunk of whole cards at a time: memory follows the chunk, not the history.
+    for sig in iter_signals(iter_prices()):
+        if not n:
+            out.parent.mkdir(parents=True, exist_ok=True)
+        sig.to_csv(out, index=False, mode="a" if n else "w", header=not n)
+        n += len(sig)
+    if not n:
         console.print(
             "[yellow]No price data found. Seed or ingest first "
             "('poke-pricer demo seed' or 'poke-pricer ingest csv').[/yellow]"
         )
         raise typer.Exit(code=0)
-    sig = compute_signals(df)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    sig.to_csv(out, index=False)
-    console.print(f"[green]Signals written[/green] to {out} ({len(sig)} rows).")
+    console.print(f"[green]Signals written[/green] to {out} ({n} rows).")
+
+
+@signals_app.command("materialize")
+def signals_materialize(
+    windows: Annotated[
+        list[int] | None,
+        typer.Option(
+            "--window",
+            help="Window in days, repeatable (default: the stored windows, else 7, 14, 30)",
+        ),
+    ] = None,
+    full: Annotated[
+        bool,
+        typer.Option("--full", help="Rebuild from every price, not just the cards with new ones"),
+    ] = False,
+) -> None:
+    """Bring the signal_values table up to date with the prices written since the last run."""
+    started = time.perf_counter()
+    try:
+        run = materialize_signals(windows, full=full)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--window") from e
+    status = "Rebuilt" if run.full else "Updated"
+    console.print(
+        f"[green]{status}[/green] signal_values in {time.perf_counter() - started:.2f}s: "
+        f"{run.rows} rows for {run.cards} cards "
+        f"(windows {', '.join(map(str, run.windows))})"
+    )
 
 
 # ---- backtest ----
@@ -194,7 +404,10 @@ def ingest_csv_cmd(
         Path,
         typer.Option(
             "--file",
-            help="CSV with columns: name,set_code,number,date,price[,source,rarity]",
+            help=(
+                "CSV (optionally .gz/.bz2/.xz), Parquet or Arrow file with columns: "
+                "name,set_code,number,date,price[,source,rarity]"
+            ),
             exists=True,
             file_okay=True,
             dir_okay=False,
@@ -207,9 +420,26 @@ def ingest_csv_cmd(
             help="Default source name",
         ),
     ] = None,
+    bulk: Annotated[
+        bool,
+        typer.Option(
+            "--bulk/--no-bulk",
+            help="Write in set-based chunks (default) or one transaction per row",
+        ),
+    ] = True,
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            "--batch-size",
+            help="Rows validated and written per transaction (bounds memory use)",
+            min=1,
+        ),
+    ] = DEFAULT_BATCH_SIZE,
 ) -> None:
-    """Ingest a CSV file into the local database."""
-    created, inserted, skipped = ingest_csv(file, default_source=source or "csv")
+    """Ingest a price file (CSV, compressed CSV, Parquet or Arrow) into the local database."""
+    created, inserted, skipped = ingest_csv(
+        file, default_source=source or "csv", bulk=bulk, batch_size=batch_size
+    )
     console.print(
         "[green]Ingest complete[/green] "
         f"(cards_created={created}, prices_inserted={inserted}, skipped={skipped})."
@@ -222,16 +452,26 @@ def ingest_validate_cmd(
         Path,
         typer.Option(
             "--file",
-            help="CSV to validate",
+            help="CSV (optionally compressed), Parquet or Arrow file to validate",
             exists=True,
             file_okay=True,
             dir_okay=False,
         ),
     ],
+    rejects: Annotated[
+        Path | None,
+        typer.Option(
+            "--rejects",
+            help="Write invalid rows here as CSV (line, reason)",
+            dir_okay=False,
+        ),
+    ] = None,
 ) -> None:
     """Validate a CSV against the expected schema."""
-    valid, invalid = validate_csv(file)
+    valid, invalid = validate_csv(file, rejects=rejects)
     console.print(f"[green]Valid[/green]: {valid}, [yellow]Invalid[/yellow]: {invalid}")
+    if rejects is not None:
+        console.print(f"Rejects written to {rejects}")
 
 
 @ingest_app.command("dir")
@@ -240,7 +480,7 @@ def ingest_dir_cmd(
         Path,
         typer.Option(
             "--path",
-            help="Folder containing CSV files",
+            help="Folder containing CSV, .csv.gz/.bz2/.xz, Parquet or Arrow files",
             exists=True,
             file_okay=False,
             dir_okay=True,
@@ -253,15 +493,155 @@ def ingest_dir_cmd(
             help="Default source name",
         ),
     ] = None,
+    bulk: Annotated[
+        bool,
+        typer.Option(
+            "--bulk/--no-bulk",
+            help="Write in set-based chunks (default) or one transaction per row",
+        ),
+    ] = True,
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            "--batch-size",
+            help="Rows validated and written per transaction (bounds memory use)",
+            min=1,
+        ),
+    ] = DEFAULT_BATCH_SIZE,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers",
+            help="Processes parsing/validating files in parallel (one DB writer)",
+            min=1,
+        ),
+    ] = 1,
+    force: Annotated[
+        bool,
+        typer.Option(
+            "--force",
+            help="Re-read every file in full, even if the ingest manifest says it is unchanged",
+        ),
+    ] = False,
 ) -> None:
-    """Ingest all CSV files from a directory (non-recursive)."""
-    created, inserted, skipped = ingest_dir(path, default_source=source or "csv")
+    """Ingest all price files from a directory (non-recursive)."""
+    if workers > 1 and not bulk:
+        raise typer.BadParameter("--workers > 1 requires --bulk", param_hint="--workers")
+    per_file = ingest_dir_per_file(
+        path,
+        default_source=source or "csv",
+        bulk=bulk,
+        batch_size=batch_size,
+        workers=workers,
+        force=force,
+    )
+    created = inserted = skipped = 0
+    for f, (c, i, s), status in per_file:
+        if status == "unchanged":
+            console.print(f"  {f.name}: unchanged, skipped")
+            continue
+        suffix = " (appended rows only)" if status == "appended" else ""
+        console.print(f"  {f.name}: cards_created={c}, prices_inserted={i}, skipped={s}{suffix}")
+        created += c
+        inserted += i
+        skipped += s
     console.print(
         "[green]Dir ingest complete[/green] "
         f"(cards_created={created}, prices_inserted={inserted}, skipped={skipped})."
     )
 
 
+@ingest_app.command("watch")
+def ingest_watch_cmd(
+    path: Annotated[
+        Path,
+        typer.Option(
+            "--path",
+            help="Folder the scrapers write to (polled, non-recursive)",
+            exists=True,
+            file_okay=False,
+            dir_okay=True,
+        ),
+    ],
+    archive: Annotated[
+        Path | None,
+        typer.Option(
+            "--archive",
+            help="Move each processed file here (default: leave it, track it in the manifest)",
+            file_okay=False,
+        ),
+    ] = None,
+    source: Annotated[
+        str | None,
+        typer.Option(
+            "--source",
+            help="Default source name",
+        ),
+    ] = None,
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            "--batch-size",
+            help="Rows validated and written per transaction (bounds memory use)",
+            min=1,
+        ),
+    ] = DEFAULT_BATCH_SIZE,
+    interval: Annotated[
+        float,
+        typer.Option("--interval", help="Seconds between polls", min=0.0),
+    ] = 1.0,
+    settle: Annotated[
+        float,
+        typer.Option(
+            "--settle",
+            help="Only pick up files untouched for this many seconds (skips partial writes)",
+            min=0.0,
+        ),
+    ] = 1.0,
+    once: Annotated[
+        bool,
+        typer.Option("--once", help="Poll a single time and exit"),
+    ] = False,
+) -> None:
+    """Keep ingesting new or grown price files from a folder until interrupted."""
+
+    def report(results: list[WatchResult]) -> None:
+        for r in results:
+            name = r.path.name
+            moved = f" -> {r.archived}" if r.archived is not None else ""
+            if r.error is not None and r.status != "failed":
+                moved = f" [yellow](archiving failed: {r.error})[/yellow]"
+            if r.status == "failed":
+                console.print(f"  [red]{name}: failed[/red] ({r.error})")
+            elif r.status == "unchanged":
+                console.print(f"  {name}: unchanged, skipped{moved}")
+            else:
+                c, i, sk = r.counts
+                console.print(
+                    f"  {name}: cards_created={c}, prices_inserted={i}, skipped={sk}, "
+                    f"lag={r.lag:.1f}s{moved}"
+                )
+
+    with FolderWatcher(
+        path,
+        archive_dir=archive,
+        default_source=source or "csv",
+        batch_size=batch_size,
+        settle=settle,
+    ) as watcher:
+        if not once:
+            console.print(f"Watching {path} (every {interval:g}s, Ctrl-C to stop)")
+        with contextlib.suppress(KeyboardInterrupt):
+            watcher.run(interval, max_polls=1 if once else None, on_poll=report)
+        st = watcher.stats
+        console.print(
+            "[green]Watch stopped[/green] "
+            f"(files={st.files}, failed={st.failed}, rows={st.rows}, "
+            f"prices_inserted={st.prices_inserted}, rows/s={st.rows_per_second:.0f}, "
+            f"max_lag={st.max_lag:.1f}s)."
+        )
+
+
 # ---- alerts ----
 alerts_app = typer.Typer(no_args_is_help=True)
 app.add_typer(alerts_app, name="alerts")
@@ -303,10 +683,10 @@ def alerts_scan(
     ] = None,
 ) -> None:
     """Scan latest day for spikes/new highs/lows and write a CSV."""
-    from .analytics.data_access import load_prices_df
+    from .analytics.data_access import load_price_window
     from .reports.anomalies import scan_anomalies_df
 
-    df = load_prices_df()
+    df = load_price_window(date, lookback)
     if df.empty:
         console.print("[yellow]No price data found. Seed or ingest first.[/yellow]")
         raise typer.Exit(code=0)
@@ -424,7 +804,7 @@ def catalog_top_movers(
     from .analytics.data_access import load_prices_df
     from .reports.top_movers import compute_top_movers
 
-    df = load_prices_df()
+    df = load_prices_df(columns=["card_id", "name", "set_code", "number", "date", "price"])
     if df.empty:
         console.print(
             "[yellow]No price data found. Ingest or seed first "
@@ -467,10 +847,10 @@ def movers_top(
     ] = None,
 ) -> None:
     """Compute/write top-K winners & losers for a day."""
-    from .analytics.data_access import load_prices_df
-    from .analytics.movers import compute_top_movers
+    from .analytics.data_access import load_price_window
+    from .analytics.movers import RETURN_LOOKBACK_DAYS, compute_top_movers
 
-    df = load_prices_df()
+    df = load_price_window(on_date, RETURN_LOOKBACK_DAYS)
     if df.empty:
         console.print(
             "[yellow]No price data found. Seed or ingest data first."
@@ -667,3 +1047,79 @@ def api_serve(
 
 
 app.add_typer(api_app, name="api")
+
+
+# ---- bench ----
+@app.command("bench")
+def bench(
+    scale: Annotated[
+        str,
+        typer.Option("--scale", help="Comma-separated dataset scales: tiny, small, medium, large"),
+    ] = "small",
+    only: Annotated[
+        str | None,
+        typer.Option("--only", help="Comma-separated case names (default: all)"),
+    ] = None,
+    repeat: Annotated[int, typer.Option("--repeat", help="Timed runs per case", min=1)] = 3,
+    out: Annotated[
+        Path,
+        typer.Option("--out", help="Where to write the results (JSON)", dir_okay=False),
+    ] = Path("artifacts/bench.json"),
+    baseline: Annotated[
+        Path | None,
+        typer.Option(
+            "--baseline",
+            help="Earlier results to compare against; exits 1 on a regression",
+            exists=True,
+            dir_okay=False,
+        ),
+    ] = None,
+    time_threshold: Annotated[
+        float,
+        typer.Option("--time-threshold", help="Allowed slowdown vs baseline (0.25 = +25%)"),
+    ] = 0.25,
+    memory_threshold: Annotated[
+        float,
+        typer.Option("--memory-threshold", help="Allowed peak-memory growth vs baseline"),
+    ] = 0.25,
+    data_dir: Annotated[
+        Path,
+        typer.Option("--data-dir", help="Generated datasets are kept (and reused) here"),
+    ] = BENCH_DATA_DIR,
+    seed: Annotated[int, typer.Option("--seed", help="Dataset seed")] = 42,
+) -> None:
+    """Time the hot paths on deterministic synthetic datasets and record peak memory."""
+    from .bench import BenchResult, compare, load_results, run_benchmarks, save_results
+
+    def show(r: BenchResult) -> None:
+        console.print(
+            f"  {r.scale:<6} {r.name:<24} {r.seconds:>9.4f}s (median {r.median:.4f}s)"
+            f"  peak {r.peak_mb:>8.1f} MB"
+        )
+
+    scales = [s.strip() for s in scale.split(",") if s.strip()]
+    names = [n.strip() for n in only.split(",") if n.strip()] if only else None
+    try:
+        results = run_benchmarks(
+            scales, data_dir, repeat=repeat, only=names, seed=seed, on_result=show
+        )
+        base = load_results(baseline) if baseline is not None else None
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+    save_results(out, results, seed=seed)
+    console.print(f"[green]Results[/green] written to {out}")
+    if base is None:
+        return
+
+    comparisons = compare(
+        results, base, time_threshold=time_threshold, memory_threshold=memory_threshold
+    )
+    regressions = [c for c in comparisons if c.regressed]
+    for c in regressions:
+        console.print(
+            f"  [red]REGRESSION[/red] {c.scale} {c.name} {c.metric}: "
+            f"{c.baseline:.4f} -> {c.current:.4f} (x{c.ratio:.2f})"
+        )
+    if regressions:
+        raise typer.Exit(code=1)
+    console.print(f"[green]No regressions[/green] ({len(comparisons)} metrics vs {baseline}).")
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Literal
 
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Column types of loaded price frames (analytics.data_access.load_prices_df)
+PriceDtypes = Literal["default", "compact", "compact_float32"]
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment/.env with prefix POKEPRICER_."""
@@ -23,6 +27,20 @@ class Settings(BaseSettings):
     # Local SQLite database path (used for Sprint 1)
     sqlite_path: Path = Path("data/poke_pricer.db")
 
+    # SQLite connection profile, applied by PRAGMA to every new pooled connection
+    sqlite_journal_mode: Literal["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # bytes; 0 disables memory-mapped reads
+    sqlite_cache_size: int = -64_000  # pages, or KiB when negative (SQLite convention)
+    sqlite_temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    sqlite_busy_timeout_ms: int = 5_000
+
+    # In-process cache of loaded price frames (analytics.frame_cache); 0 disables it
+    frame_cache_mb: int = 512
+    # On-disk columnar copy of the price history under data_dir (analytics.snapshot)
+    price_snapshot: bool = True
+    price_dtypes: PriceDtypes = "default"
+
     # API credentials (stubs for later sprints)
     tcgplayer_public_key: SecretStr | None = None
     tcgplayer_private_key: SecretStr | None = None
@@ -30,7 +48,7 @@ class Settings(BaseSettings):
     psa_api_key: SecretStr | None = None
     cgc_api_key: SecretStr | None = None
 
-    # Optional Postgres DSN (unused in Sprint 1)
+    # PostgreSQL DSN; when set, used instead of SQLite (needs the `postgres` extra)
     postgres_dsn: str | None = None
 
     def as_public_dict(self) -> dict[str, str]:
@@ -44,6 +62,15 @@ class Settings(BaseSettings):
             "log_level": self.log_level,
             "data_dir": str(self.data_dir),
             "sqlite_path": str(self.sqlite_path),
+            "sqlite_journal_mode": self.sqlite_journal_mode,
+            "sqlite_synchronous": self.sqlite_synchronous,
+            "sqlite_mmap_size": str(self.sqlite_mmap_size),
+            "sqlite_cache_size": str(self.sqlite_cache_size),
+            "sqlite_temp_store": self.sqlite_temp_store,
+            "sqlite_busy_timeout_ms": str(self.sqlite_busy_timeout_ms),
+            "frame_cache_mb": str(self.frame_cache_mb),
+            "price_snapshot": str(self.price_snapshot),
+            "price_dtypes": self.price_dtypes,
             "tcgplayer_public_key": mask(self.tcgplayer_public_key),
             "tcgplayer_private_key": mask(self.tcgplayer_private_key),
             "ebay_app_id": mask(self.ebay_app_id),
@@ -53,4 +80,4 @@ class Settings(BaseSettings):
         }
 
 
-__all__ = ["Settings"]
+__all__ = ["PriceDtypes", "Settings"]
@@ -1,30 +1,380 @@
 from __future__ import annotations
 
+import atexit
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+import weakref
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from datetime import date
 from pathlib import Path
+from typing import Any, TypeVar
 
-from sqlalchemy.engine import Engine
+from sqlalchemy import (
+    Column,
+    Index,
+    MetaData,
+    Table,
+    UniqueConstraint,
+    bindparam,
+    event,
+    inspect,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel import Session, SQLModel, col, create_engine, select
 
 from .config import Settings
-from .models import Card, PricePoint
+from .models import Card, CardLatest, DataVersion, PricePoint, Source
+
+T = TypeVar("T")
+
+log = logging.getLogger(__name__)
+
+# (name, set_code, number) — the natural key ingestion uses to identify a card.
+CardKey = tuple[str, str, str]
+
+# SQLite >= 3.32 allows 32766 bound parameters per statement; stay below it.
+_SQLITE_MAX_VARIABLES = 32_000
+
+# Ids bound into one `IN (...)` by readers that filter on a caller's id list, leaving
+# room below the limit for the statement's other parameters.
+ID_BATCH = _SQLITE_MAX_VARIABLES // 2
+
+
+# Rows fetched per round trip when streaming query results (server-side cursor on
+# PostgreSQL).
+FETCH_ROWS = 10_000
+
+# Temporary table that Postgres bulk writes COPY into before merging into pricepoint.
+_PG_STAGE = "pricepoint_stage"
+
+# Year partitions (SQLite): the prices of one year moved out by `db archive` live in
+# their own file next to the main database (poke_pricer.2019.db), attached to every
+# connection as schema archive_2019. The main database stays the hot partition.
+_ARCHIVE_SCHEMA = re.compile(r"archive_(\d{4})")
+# SQLite attaches at most 10 databases to a connection (SQLITE_MAX_ATTACHED).
+MAX_ARCHIVES = 10
 
 
 def _sqlite_url(path: Path) -> str:
     return f"sqlite:///{path}"
 
 
+def _postgres_url(dsn: str) -> str:
+    """SQLAlchemy URL for a libpq-style DSN; psycopg (3) unless a driver is named."""
+    for prefix in ("postgresql://", "postgres://"):
+        if dsn.startswith(prefix):
+            return "postgresql+psycopg://" + dsn[len(prefix) :]
+    return dsn
+
+
+# Engines whose database is known to have card_latest (see `ensure_card_latest`).
+_latest_ready: weakref.WeakSet[Engine] = weakref.WeakSet()
+
+# Process-wide engines, one per (resolved DB URL, connection profile), so repeated
+# `get_engine()` calls (every API request, every CLI helper) share a warm pool.
+_engines: dict[tuple[str, tuple[tuple[str, str], ...]], Engine] = {}
+_settings_cache: dict[tuple[Any, ...], Settings] = {}
+_registry_lock = threading.Lock()
+
+
+def current_settings() -> Settings:
+    """`Settings()`, re-read only when the POKEPRICER_* environment, cwd or .env change."""
+    env = Path(".env")
+    try:
+        env_mtime = env.stat().st_mtime_ns
+    except OSError:
+        env_mtime = None
+    key = (
+        os.getcwd(),
+        env_mtime,
+        tuple(sorted((k, v) for k, v in os.environ.items() if k.upper().startswith("POKEPRICER_"))),
+    )
+    with _registry_lock:
+        s = _settings_cache.get(key)
+        if s is None:
+            _settings_cache.clear()
+            s = _settings_cache[key] = Settings()
+    return s
+
+
+def sqlite_pragmas(settings: Settings) -> dict[str, str]:
+    """The PRAGMAs `get_engine` applies to each new connection, in order."""
+    return {
+        "busy_timeout": str(settings.sqlite_busy_timeout_ms),
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "cache_size": str(settings.sqlite_cache_size),
+        "mmap_size": str(settings.sqlite_mmap_size),
+        "temp_store": settings.sqlite_temp_store,
+    }
+
+
+def _apply_pragmas(engine: Engine, pragmas: Mapping[str, str]) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn: Any, _record: Any) -> None:
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def archive_path(db_path: Path, year: int) -> Path:
+    """The archive file holding `year`'s prices for the SQLite database at `db_path`."""
+    return db_path.with_name(f"{db_path.stem}.{year}{db_path.suffix}")
+
+
+def archive_files(db_path: Path) -> dict[int, Path]:
+    """{year: path} of the archive files that exist for the database at `db_path`."""
+    found: dict[int, Path] = {}
+    pattern = re.compile(rf"{re.escape(db_path.stem)}\.(\d{{4}}){re.escape(db_path.suffix)}")
+    for path in db_path.parent.glob(f"{db_path.stem}.*{db_path.suffix}"):
+        m = pattern.fullmatch(path.name)
+        if m:
+            found[int(m.group(1))] = path
+    return dict(sorted(found.items()))
+
+
+def _attach_archives(engine: Engine, db_path: Path) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn: Any, _record: Any) -> None:
+        # Files are looked up per connection: a new archive shows up on the next one.
+        for year, path in archive_files(db_path).items():
+            dbapi_conn.execute(f"ATTACH DATABASE ? AS archive_{year}", (str(path),))
+
+
 def get_engine(settings: Settings | None = None) -> Engine:
-    s = settings or Settings()
-    path = Path(s.sqlite_path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    return create_engine(_sqlite_url(path), echo=False)
+    """The shared engine for the configured database (created on first use).
+
+    PostgreSQL when `postgres_dsn` is set (needs the `postgres` extra), otherwise the
+    SQLite file at `sqlite_path`. Engines are cached per resolved database URL and
+    connection profile, so callers get pooled connections that already carry the
+    profile's PRAGMAs (WAL journal, page cache, mmap, ...) and have the database's year
+    archives attached. Don't `dispose()` a shared engine; use `dispose_engines()`.
+    """
+    s = settings or current_settings()
+    if s.postgres_dsn:
+        url = _postgres_url(s.postgres_dsn)
+        with _registry_lock:
+            engine = _engines.get((url, ()))
+            if engine is None:
+                engine = _engines[(url, ())] = create_engine(url, echo=False, pool_pre_ping=True)
+        return engine
+    path = Path(s.sqlite_path).resolve()
+    pragmas = sqlite_pragmas(s)
+    key = (_sqlite_url(path), tuple(pragmas.items()))
+    with _registry_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            engine = create_engine(key[0], echo=False)
+            _apply_pragmas(engine, pragmas)
+            _attach_archives(engine, path)
+            _engines[key] = engine
+    return engine
+
+
+def dispose_engines(path: Path | None = None) -> int:
+    """Close the pooled connections of cached engines (all, or those for `path`).
+
+    Call before moving or deleting a database file. Returns the number of engines dropped
+    from the registry; a later `get_engine()` creates a fresh one.
+    """
+    url = None if path is None else _sqlite_url(Path(path).resolve())
+    with _registry_lock:
+        keys = [k for k in _engines if url is None or k[0] == url]
+        engines = [_engines.pop(k) for k in keys]
+    for engine in engines:
+        engine.dispose()
+    return len(engines)
+
+
+# Close pooled connections cleanly (server sessions end at once, not on socket timeout).
+atexit.register(dispose_engines)
+
+
+def read_pragmas(engine: Engine | None = None) -> dict[str, str]:
+    """The profile's PRAGMAs as a pooled connection of `engine` actually reports them.
+
+    Empty for a non-SQLite engine.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name != "sqlite":
+        return {}
+    with engine.connect() as conn:
+        return {
+            name: str(conn.exec_driver_sql(f"PRAGMA {name}").scalar())
+            for name in sqlite_pragmas(current_settings())
+        }
+
+
+def pool_stats() -> list[dict[str, Any]]:
+    """Connection-pool figures for each cached engine (url, size, checked in/out, ...)."""
+    with _registry_lock:
+        items = list(_engines.items())
+    out: list[dict[str, Any]] = []
+    for _, engine in items:
+        pool: Any = engine.pool
+        stats: dict[str, Any] = {"url": str(engine.url), "pool": type(pool).__name__}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            fn = getattr(pool, name, None)
+            if callable(fn):
+                stats[name] = fn()
+        out.append(stats)
+    return out
+
+
+_archive_tables: dict[str, Table] = {}
+
+
+def price_table(schema: str | None = None) -> Table:
+    """The pricepoint table of the main database, or of the archive attached as `schema`.
+
+    Archive tables have the same columns (same storage types), unique key and date index,
+    but no foreign keys: SQLite can't reference a table in another file.
+    """
+    main: Table = PricePoint.__table__  # type: ignore[attr-defined]
+    if schema is None:
+        return main
+    with _registry_lock:
+        table = _archive_tables.get(schema)
+        if table is None:
+            table = _archive_tables[schema] = Table(
+                main.name,
+                MetaData(),
+                *(
+                    Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                    for c in main.columns
+                ),
+                UniqueConstraint("card_id", "date", "source"),
+                Index("ix_price_date", "date"),
+                schema=schema,
+            )
+    return table
+
+
+def qualified_name(table: Table) -> str:
+    return f"{table.schema}.{table.name}" if table.schema else table.name
+
+
+def attached_archives(conn: Connection) -> dict[int, str]:
+    """{year: schema} of the archive partitions attached to `conn` (none on PostgreSQL)."""
+    if conn.dialect.name != "sqlite":
+        return {}
+    found: dict[int, str] = {}
+    for _, name, _ in conn.exec_driver_sql("PRAGMA database_list"):
+        m = _ARCHIVE_SCHEMA.fullmatch(name)
+        if m:
+            found[int(m.group(1))] = name
+    return dict(sorted(found.items()))
+
+
+def price_tables(
+    conn: Connection, start: date | None = None, end: date | None = None
+) -> list[Table]:
+    """The price partitions that can hold rows dated within [start, end], main first.
+
+    The main (hot) table is always included: ingest writes every date there unless its
+    year has an archive. An archive is included only if its year overlaps the range, so
+    a recent window never touches one.
+    """
+    tables = [price_table()]
+    for year, schema in attached_archives(conn).items():
+        if (start is None or year >= start.year) and (end is None or year <= end.year):
+            tables.append(price_table(schema))
+    return tables
+
+
+def is_text_layout(tables: Iterable[str]) -> bool:
+    """Whether a database with `tables` predates compact storage (text dates and sources)."""
+    names = set(tables)
+    return PricePoint.__tablename__ in names and Source.__tablename__ not in names
+
+
+def _migrate_text_layout(engine: Engine) -> None:
+    """Rewrite pricepoint from text dates/sources to day numbers and `source` ids, in place.
+
+    One transaction: the old table is renamed aside, copied into the new layout (indexes
+    built after the copy) and dropped. card_latest is dropped too, for the caller to
+    rebuild. Indexes added by `db optimize` have to be created again.
+    """
+    if engine.dialect.name != "sqlite":
+        raise ValueError(f"converting the text layout needs SQLite (got {engine.dialect.name})")
+    prices, sources = PricePoint.__tablename__, Source.__tablename__
+    old = f"{prices}_text"
+    indexes = list(PricePoint.__table__.indexes)  # type: ignore[attr-defined]
+    with engine.begin() as conn:
+        named = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t"),
+            {"t": prices},
+        ).scalars()
+        for name in [n for n in named if not n.startswith("sqlite_autoindex")]:
+            conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text(f"ALTER TABLE {prices} RENAME TO {old}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {CardLatest.__tablename__}"))
+        Source.__table__.create(conn)  # type: ignore[attr-defined]
+        PricePoint.__table__.create(conn)  # type: ignore[attr-defined]
+        for index in indexes:
+            index.drop(conn)
+        conn.execute(
+            text(f"INSERT INTO {sources} (name) SELECT DISTINCT source FROM {old} ORDER BY 1")
+        )
+        conn.execute(
+            text(
+                f"INSERT INTO {prices} (id, card_id, date, source, price) "
+                "SELECT p.id, p.card_id, CAST(julianday(p.date) - 2440587.5 AS INTEGER), "
+                f"s.id, p.price FROM {old} p JOIN {sources} s ON s.name = p.source ORDER BY p.id"
+            )
+        )
+        conn.execute(text(f"DROP TABLE {old}"))
+        for index in indexes:
+            index.create(conn)
 
 
 def init_db(engine: Engine | None = None) -> None:
+    """Create missing tables and derive card_latest if it is missing.
+
+    A database from before compact storage (text dates and sources) is converted in place
+    the first time it is opened: a one-time migration, logged as it starts and ends.
+    """
     engine = engine or get_engine()
-    SQLModel.metadata.create_all(engine)
+    tables = set(inspect(engine).get_table_names())
+    text_layout = is_text_layout(tables)
+    if text_layout:
+        log.warning(
+            "converting %s to compact storage (one-time migration, one transaction)",
+            engine.url.database,
+        )
+        started = time.perf_counter()
+        _migrate_text_layout(engine)
+    with engine.begin() as conn:
+        SQLModel.metadata.create_all(conn)
+        conn.execute(
+            _insert(conn, DataVersion.__table__)  # type: ignore[attr-defined]
+            .values(id=1, token=uuid.uuid4().hex, generation=0)
+            .on_conflict_do_nothing()
+        )
+    if PricePoint.__tablename__ in tables and (
+        text_layout or CardLatest.__tablename__ not in tables
+    ):
+        # card_latest missing (older database) or dropped by the conversion: derive it once.
+        rebuild_card_latest(engine)
+    if text_layout:
+        log.warning(
+            "converted %s to compact storage in %.1fs; rerun `db optimize` for its indexes",
+            engine.url.database,
+            time.perf_counter() - started,
+        )
 
 
 def get_session(engine: Engine | None = None) -> Session:
@@ -51,14 +401,316 @@ def upsert_card(
     return c
 
 
+def source_ids(conn: Connection, names: Iterable[str]) -> dict[str, int]:
+    """Return {name: id} for the source names, registering the ones not seen before."""
+    wanted = sorted(set(names))
+    if not wanted:
+        return {}
+    table = Source.__table__  # type: ignore[attr-defined]
+    conn.execute(_insert(conn, table).on_conflict_do_nothing(), [{"name": n} for n in wanted])
+    rows = conn.execute(select(Source.id, Source.name).where(col(Source.name).in_(wanted)))
+    return {name: source_id for source_id, name in rows}
+
+
 def insert_price_if_absent(
     session: Session, card_id: int, dt: date, source: str, price: float
 ) -> bool:
-    p = PricePoint(card_id=card_id, date=dt, source=source, price=price)
+    conn = session.connection()
+    archive = attached_archives(conn).get(dt.year)
     try:
-        session.add(p)
+        source_id = source_ids(conn, [source])[source]
+        if archive is None:
+            session.add(PricePoint(card_id=card_id, date=dt, source=source_id, price=price))
+            session.flush()
+        else:  # the year was archived: its partition holds (and dedups) the row
+            row = {"card_id": card_id, "date": dt, "source": source_id, "price": price}
+            conn.execute(price_table(archive).insert(), row)
+        refresh_card_latest(session, [card_id])
         session.commit()
         return True
     except IntegrityError:
         session.rollback()
         return False
+
+
+def _batched(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def find_card_ids(session: Session, keys: Sequence[CardKey]) -> dict[CardKey, int]:
+    """Return {key: card_id} for the given (name, set_code, number) keys that exist."""
+    found: dict[CardKey, int] = {}
+    for part in _batched(keys, _SQLITE_MAX_VARIABLES // 3):
+        stmt = select(Card.id, Card.name, Card.set_code, Card.number).where(
+            tuple_(col(Card.name), col(Card.set_code), col(Card.number)).in_(part)
+        )
+        for card_id, name, set_code, number in session.exec(stmt):
+            assert card_id is not None
+            found[(name, set_code, number)] = card_id
+    return found
+
+
+def iter_card_ids(session: Session) -> Iterator[tuple[CardKey, int]]:
+    """Stream (key, card_id) for every card."""
+    stmt = select(Card.id, Card.name, Card.set_code, Card.number)
+    for card_id, name, set_code, number in session.exec(stmt):
+        assert card_id is not None
+        yield (name, set_code, number), card_id
+
+
+def _insert(conn: Connection, table: Any) -> Any:
+    """The dialect's INSERT construct (both support ON CONFLICT DO NOTHING)."""
+    return (pg_insert if conn.dialect.name == "postgresql" else sqlite_insert)(table)
+
+
+def insert_cards_bulk(session: Session, cards: Mapping[CardKey, str | None]) -> dict[CardKey, int]:
+    """Insert new cards ({key: rarity}) without committing and return their ids.
+
+    Uses INSERT ... ON CONFLICT DO NOTHING RETURNING, so the ids come back from the insert
+    itself; keys that already exist (e.g. inserted by a concurrent ingest) are looked up
+    instead. A key is missing from the result only if its (set_code, number) belongs to a
+    card with a different name.
+    """
+    if not cards:
+        return {}
+    rows = [
+        {"name": name, "set_code": set_code, "number": number, "rarity": rarity}
+        for (name, set_code, number), rarity in cards.items()
+    ]
+    conn = session.connection()
+    stmt = _insert(conn, Card).on_conflict_do_nothing()
+    if not conn.dialect.insert_executemany_returning:
+        # SQLite < 3.35 has no RETURNING.
+        conn.execute(stmt, rows)
+        return find_card_ids(session, list(cards))
+    returning = stmt.returning(col(Card.id), col(Card.name), col(Card.set_code), col(Card.number))
+    ids = {(name, s, n): card_id for card_id, name, s, n in conn.execute(returning, rows)}
+    if len(ids) < len(cards):
+        ids.update(find_card_ids(session, [k for k in cards if k not in ids]))
+    return ids
+
+
+def insert_prices_bulk(session: Session, rows: Sequence[Mapping[str, Any]]) -> int:
+    """Insert price rows (card_id, date, source name, price) without committing.
+
+    Runs one `INSERT ... ON CONFLICT DO NOTHING` on uq_price_card_date_source for the
+    whole batch (compiled once, executed over all rows), so existing (card_id, date,
+    source) points are left untouched; the batch's source names are translated to ids by
+    one `source_ids` call. Rows of an archived year go to (and are deduplicated against)
+    that year's archive instead of the main table. On PostgreSQL the batch is COPYed into
+    a staging table and merged with one set-based INSERT ... SELECT instead. The batch's
+    cards are then refreshed in card_latest, in the same transaction. Returns
+    the number of rows actually inserted.
+    """
+    if not rows:
+        return 0
+    conn = session.connection()
+    if conn.dialect.name == "postgresql":
+        inserted = _copy_merge_prices(conn, rows)
+    else:
+        ids = source_ids(conn, {r["source"] for r in rows})
+        archives = attached_archives(conn)
+        parts: dict[str | None, list[Mapping[str, Any]]] = {}
+        for r in rows:
+            row = {**r, "source": ids[r["source"]]}
+            parts.setdefault(archives.get(r["date"].year), []).append(row)
+        inserted = 0
+        for schema, part in parts.items():
+            stmt = _insert(conn, price_table(schema)).on_conflict_do_nothing(
+                index_elements=["card_id", "date", "source"]
+            )
+            inserted += conn.execute(stmt, part).rowcount
+    if inserted:
+        refresh_card_latest(session, {r["card_id"] for r in rows})
+    return inserted
+
+
+def copy_rows(conn: Connection, table: str, columns: Sequence[str], rows: Iterable[Any]) -> None:
+    """Stream tuples into a PostgreSQL table with `COPY ... FROM STDIN` (psycopg 3).
+
+    Drivers without a COPY API get a plain executemany INSERT instead.
+    """
+    cursor: Any = conn.connection.cursor()
+    names = ", ".join(columns)
+    try:
+        if hasattr(cursor, "copy"):
+            with cursor.copy(f"COPY {table} ({names}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            marks = ", ".join(["%s"] * len(columns))
+            cursor.executemany(f"INSERT INTO {table} ({names}) VALUES ({marks})", list(rows))
+    finally:
+        cursor.close()
+
+
+def _copy_merge_prices(conn: Connection, rows: Sequence[Mapping[str, Any]]) -> int:
+    table = PricePoint.__tablename__
+    conn.execute(
+        text(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {_PG_STAGE} "
+            "(card_id integer, date date, source text, price double precision)"
+        )
+    )
+    columns = ("card_id", "date", "source", "price")
+    copy_rows(conn, _PG_STAGE, columns, (tuple(r[c] for c in columns) for r in rows))
+    sources = Source.__tablename__
+    conn.execute(
+        text(
+            f"INSERT INTO {sources} (name) SELECT DISTINCT source FROM {_PG_STAGE} "
+            "ON CONFLICT (name) DO NOTHING"
+        )
+    )
+    # Duplicates within the batch are skipped too: DO NOTHING sees the earlier row.
+    inserted = conn.execute(
+        text(
+            f"INSERT INTO {table} (card_id, date, source, price) "
+            f"SELECT st.card_id, st.date - DATE '1970-01-01', s.id, st.price "
+            f"FROM {_PG_STAGE} st JOIN {sources} s ON s.name = st.source "
+            "ON CONFLICT (card_id, date, source) DO NOTHING"
+        )
+    ).rowcount
+    conn.execute(text(f"TRUNCATE {_PG_STAGE}"))
+    return inserted
+
+
+# card_latest from the price rows `{recent}` selects (card_id, date, price, source): per
+# card, the last point (on a date with several sources, the one whose name sorts first),
+# then, via `{earlier}`, the point before it from that same source, so return_1d never
+# compares two sources. Upserted, so rows only get replaced.
+_CARD_LATEST_SQL = """
+WITH recent AS ({recent}),
+ranked AS (
+    SELECT r.card_id, r.date, r.price, r.source,
+        ROW_NUMBER() OVER (PARTITION BY r.card_id ORDER BY r.date DESC, s.name) AS rn
+    FROM recent r JOIN {sources} s ON s.id = r.source
+),
+picked AS (
+    SELECT card_id, date, price, source FROM ranked WHERE rn = 1
+),
+earlier AS ({earlier}),
+prev AS (
+    SELECT card_id, date, price,
+        ROW_NUMBER() OVER (PARTITION BY card_id ORDER BY date DESC) AS rn
+    FROM earlier
+)
+INSERT INTO {latest} (card_id, date, price, source, prev_date, prev_price, return_1d)
+SELECT pk.card_id, pk.date, pk.price, pk.source, pv.date, pv.price,
+    CASE WHEN pv.price > 0 THEN pk.price / pv.price - 1 END
+FROM picked pk LEFT JOIN prev pv ON pv.card_id = pk.card_id AND pv.rn = 1
+WHERE true
+ON CONFLICT (card_id) DO UPDATE SET
+    date = excluded.date, price = excluded.price, source = excluded.source,
+    prev_date = excluded.prev_date, prev_price = excluded.prev_price,
+    return_1d = excluded.return_1d
+"""
+
+# Per picked point, the last earlier point of its source in one partition: an index seek
+# backwards from the picked date.
+_EARLIER_PRICES_SQL = """
+    SELECT p.card_id, p.date, p.price
+    FROM picked pk JOIN {prices} p
+        ON p.card_id = pk.card_id AND p.source = pk.source AND p.date = (
+            SELECT q.date FROM {prices} q
+            WHERE q.card_id = pk.card_id AND q.source = pk.source AND q.date < pk.date
+            ORDER BY q.date DESC LIMIT 1
+        )
+"""
+
+# The rows that can hold a card's last point once rows are only ever added: for cards
+# with a card_latest row (:ids), those from its date on (an index range per card); for
+# the rest (:new_ids), all of them.
+_RECENT_PRICES_SQL = """
+    SELECT p.card_id, p.date, p.price, p.source
+    FROM {latest} cl JOIN {prices} p ON p.card_id = cl.card_id AND p.date >= cl.date
+    WHERE cl.card_id IN :ids
+    UNION ALL
+    SELECT p.card_id, p.date, p.price, p.source
+    FROM {prices} p
+    WHERE p.card_id IN :new_ids
+"""
+
+
+def _card_latest_sql(recent: str, tables: Sequence[Table]) -> str:
+    """The card_latest upsert over `recent` run against each price partition in `tables`."""
+    latest = CardLatest.__tablename__
+    names = [qualified_name(t) for t in tables]
+
+    def union(part: str) -> str:
+        return "\n    UNION ALL\n".join(part.format(prices=n, latest=latest) for n in names)
+
+    return _CARD_LATEST_SQL.format(
+        recent=union(recent),
+        earlier=union(_EARLIER_PRICES_SQL),
+        sources=Source.__tablename__,
+        latest=latest,
+    )
+
+
+def _bump_data_version(conn: Connection) -> None:
+    conn.execute(text(f"UPDATE {DataVersion.__tablename__} SET generation = generation + 1"))
+
+
+def data_version(engine: Engine) -> tuple[str, int] | None:
+    """(token, generation) of the database: changes whenever prices are written."""
+    ensure_card_latest(engine)
+    with engine.connect() as conn:
+        row = conn.execute(
+            select(DataVersion.token, DataVersion.generation).where(DataVersion.id == 1)
+        ).first()
+    return None if row is None else (row[0], int(row[1]))
+
+
+def refresh_card_latest(session: Session, card_ids: Iterable[int]) -> None:
+    """Bring card_latest up to date for `card_ids` after their prices changed.
+
+    Also bumps the data version (`data_version`). Doesn't commit: call it in the
+    transaction that wrote the prices. For cards already in card_latest only the points
+    from the stored date on are read, plus one index seek for the previous point of the
+    picked source, so the cost follows the new rows, not the length of the history.
+    Archive partitions are read too (an index probe per card each): a card's latest
+    points may have been archived.
+    """
+    stored = select(CardLatest.card_id).where(
+        col(CardLatest.card_id).in_(bindparam("ids", expanding=True))
+    )
+    conn = session.connection()
+    tables = price_tables(conn)
+    stmt = text(_card_latest_sql(_RECENT_PRICES_SQL, tables)).bindparams(
+        bindparam("ids", expanding=True), bindparam("new_ids", expanding=True)
+    )
+    for part in _batched(sorted(set(card_ids)), _SQLITE_MAX_VARIABLES // len(tables)):
+        ids = set(conn.execute(stored, {"ids": list(part)}).scalars())
+        conn.execute(stmt, {"ids": sorted(ids), "new_ids": [c for c in part if c not in ids]})
+    _bump_data_version(conn)
+
+
+def ensure_card_latest(engine: Engine) -> None:
+    """Check the database before the first read through `engine`.
+
+    A database with every table is only inspected: reads never write to it, so it may be
+    read-only or shared. A new one, one from before card_latest or one still in the text
+    layout (converted once, see `init_db`) is set up by `init_db`.
+    """
+    if engine in _latest_ready:
+        return
+    if not set(SQLModel.metadata.tables) <= set(inspect(engine).get_table_names()):
+        init_db(engine)
+    _latest_ready.add(engine)
+
+
+def rebuild_card_latest(engine: Engine | None = None) -> int:
+    """Regenerate card_latest from the full price history (all partitions); returns its
+    row count."""
+    engine = engine or get_engine()
+    CardLatest.__table__.create(engine, checkfirst=True)  # type: ignore[attr-defined]
+    DataVersion.__table__.create(engine, checkfirst=True)  # type: ignore[attr-defined]
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {CardLatest.__tablename__}"))
+        recent = "SELECT card_id, date, price, source FROM {prices}"
+        conn.execute(text(_card_latest_sql(recent, price_tables(conn))))
+        _bump_data_version(conn)
+        return int(
+            conn.execute(text(f"SELECT COUNT(*) FROM {CardLatest.__tablename__}")).scalar_one()
+        )
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from sqlmodel import Session
+
+from ..db import CardKey, insert_cards_bulk, iter_card_ids
+
+# ASCII unit separator: joins a key's parts into one str, about half the memory of a tuple.
+_SEP = "\x1f"
+
+
+class CardInterner:
+    """(name, set_code, number) -> card id for one ingest session.
+
+    Every existing key is loaded once, up front; the map then only grows with the cards the
+    session creates, so it can be shared by all files of an `ingest dir` run. New keys of a
+    batch are inserted together and their ids come back from the same statement, inside
+    the caller's transaction (nothing is committed here).
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self._ids: dict[str, int] = {
+            _SEP.join(key): card_id for key, card_id in iter_card_ids(session)
+        }
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: CardKey) -> bool:
+        return _SEP.join(key) in self._ids
+
+    def intern(
+        self, keys: Sequence[CardKey], rarities: Sequence[str | None]
+    ) -> tuple[list[int], int]:
+        """Return (card id of each key, number of cards created).
+
+        The first occurrence of a new key decides its rarity, as in row-by-row mode.
+        """
+        ids = self._ids
+        joined = [_SEP.join(key) for key in keys]
+        new: dict[CardKey, str | None] = {}
+        for j, key, rarity in zip(joined, keys, rarities, strict=True):
+            if j not in ids and key not in new:
+                new[key] = rarity
+        if new:
+            created = insert_cards_bulk(self.session, new)
+            conflicting = [key for key in new if key not in created]
+            if conflicting:
+                raise ValueError(
+                    f"cards {conflicting[:3]} clash with existing cards that have the same "
+                    "set_code and number but a different name"
+                )
+            ids.update((_SEP.join(key), card_id) for key, card_id in created.items())
+        return [ids[j] for j in joined], len(new)
+
+
+__all__ = ["CardInterner"]
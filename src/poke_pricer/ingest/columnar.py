@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+import bz2
+import csv
+import gzip
+import io
+import lzma
+from collections.abc import Callable, Iterator
+from itertools import chain, islice
+from pathlib import Path
+from typing import IO, Any, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from pydantic import ValidationError
+
+from .schema import PriceRow
+
+# PriceRow fields, in schema order; other CSV columns are never read.
+KNOWN_COLS: tuple[str, ...] = tuple(PriceRow.model_fields)
+
+# Bytes parsed per Arrow block; blocks are re-cut into fixed-size row blocks. Arrow's
+# streaming reader reads up to 32 blocks ahead in the background, so this bounds the
+# buffered input at ~2 MiB (1 MiB blocks buffered ~32 MiB of a large file).
+_READ_BLOCK_BYTES = 1 << 16
+_EXACT_BLOCK_ROWS = 10_000
+# Rows per record batch read from Parquet (one row group at a time) and Arrow IPC files.
+_TABLE_BATCH_ROWS = 65_536
+
+# File name suffix -> input format. Compressed CSVs are decompressed as they are read.
+_SUFFIX_FORMATS = {
+    ".csv": "csv",
+    ".csv.gz": "csv.gz",
+    ".csv.bz2": "csv.bz2",
+    ".csv.xz": "csv.xz",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+_TEXT_OPENERS: dict[str, Callable[..., IO[str]]] = {
+    "csv.gz": gzip.open,
+    "csv.bz2": bz2.open,
+    "csv.xz": lzma.open,
+}
+
+# Prices cast by Arrow when their block also holds values it can't parse.
+_DECIMAL = r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$"
+
+_DAYS_BEFORE_MONTH = np.array([0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334])
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+class RowBlock(NamedTuple):
+    """Raw CSV rows, column-wise.
+
+    `table` holds every PriceRow column as nullable strings: null where a short row has
+    no value (as with csv.DictReader) and throughout the columns listed in `absent`,
+    which the header lacks. `lines` are the rows' record numbers: the header is line 1
+    and blank lines are not counted.
+    """
+
+    lines: npt.NDArray[np.int64]
+    table: pa.Table
+    absent: frozenset[str]
+
+
+class BlockVerdict(NamedTuple):
+    """Validation result for a RowBlock; `days`/`prices` are meaningful where `valid`."""
+
+    valid: npt.NDArray[np.bool_]
+    days: npt.NDArray[np.int64]  # date.toordinal()
+    prices: npt.NDArray[np.float64]
+    errors: dict[int, str]  # row index -> rejection reason
+
+
+def input_format(path: Path) -> str | None:
+    """ "csv", "csv.gz", "csv.bz2", "csv.xz", "parquet" or "arrow" (by file name), else None."""
+    for suffix, fmt in _SUFFIX_FORMATS.items():
+        if path.name.endswith(suffix) and len(path.name) > len(suffix):
+            return fmt
+    return None
+
+
+def _csv_format(path: Path) -> str:
+    fmt = input_format(path)
+    return fmt if fmt is not None and fmt.startswith("csv") else "csv"
+
+
+def open_csv_text(path: Path) -> IO[str]:
+    """Open a (possibly compressed) CSV for csv-module reading."""
+    opener = _TEXT_OPENERS.get(_csv_format(path))
+    if opener is None:
+        return path.open("r", newline="")
+    return opener(path, "rt", newline="")
+
+
+def _open_csv_binary(path: Path) -> pa.NativeFile:
+    fmt = _csv_format(path)
+    if fmt == "csv":
+        return pa.OSFile(str(path))
+    if fmt == "csv.xz":
+        return pa.PythonFile(lzma.open(path, "rb"), mode="r")  # no xz codec in Arrow
+    return pa.input_stream(str(path), compression={"csv.gz": "gzip", "csv.bz2": "bz2"}[fmt])
+
+
+def _open_ipc(source: pa.NativeFile) -> Any:
+    """Arrow IPC reader for the file format (also Feather v2), else the stream format."""
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def read_header(path: Path) -> list[str]:
+    """Column names as csv.DictReader sees them (empty for an empty file).
+
+    For Parquet and Arrow files, the schema's field names.
+    """
+    fmt = input_format(path)
+    if fmt == "parquet":
+        names: list[str] = pq.read_schema(path).names
+        return names
+    if fmt == "arrow":
+        with pa.memory_map(str(path)) as source:
+            names = _open_ipc(source).schema.names
+            return names
+    with open_csv_text(path) as f:
+        return next(csv.reader(f), [])
+
+
+def _table_from_rows(rows: list[dict[str, Any]]) -> pa.Table:
+    return pa.table(
+        [pa.array([r.get(c) for r in rows], type=pa.string()) for c in KNOWN_COLS],
+        names=list(KNOWN_COLS),
+    )
+
+
+def _with_absent(table: pa.Table, absent: frozenset[str]) -> pa.Table:
+    """Add all-null columns for `absent` and put the columns in KNOWN_COLS order."""
+    nulls = pa.nulls(table.num_rows, type=pa.string())
+    return pa.table(
+        [nulls if c in absent else table.column(c) for c in KNOWN_COLS], names=list(KNOWN_COLS)
+    )
+
+
+def _iter_exact(
+    path: Path, header: list[str], absent: frozenset[str], start: int | None, first_line: int
+) -> Iterator[RowBlock]:
+    """csv.DictReader-based reader for headers Arrow can't map 1:1 (e.g. duplicates)."""
+    with open_csv_text(path) as f:
+        if start is None:
+            reader = csv.DictReader(f)
+        else:
+            f.seek(start)
+            reader = csv.DictReader(f, fieldnames=header)
+        line = first_line - 1
+        while rows := list(islice(reader, _EXACT_BLOCK_ROWS)):
+            lines = np.arange(line + 1, line + 1 + len(rows), dtype=np.int64)
+            line += len(rows)
+            yield RowBlock(lines, _table_from_rows(rows), absent)
+
+
+def _iter_arrow(
+    path: Path, header: list[str], absent: frozenset[str], start: int | None, first_line: int
+) -> Iterator[RowBlock]:
+    """Stream Arrow record batches with record numbers attached.
+
+    Rows with the wrong number of fields are set aside by Arrow; they are re-parsed with
+    the csv module (padded or truncated like csv.DictReader) and merged back in order.
+    """
+    present = [c for c in KNOWN_COLS if c not in absent]
+    irregular: dict[int, str] = {}
+    # Arrow numbers the header as row 1, or the first row read when resuming mid-file.
+    shift = 0 if start is None else first_line - 1
+
+    def on_invalid(row: Any) -> str:
+        if row.number is None:
+            return "error"
+        irregular[row.number + shift] = row.text
+        return "skip"
+
+    read_options = pa_csv.ReadOptions(
+        use_threads=False,
+        block_size=_READ_BLOCK_BYTES,
+        column_names=None if start is None else header,
+    )
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True, invalid_row_handler=on_invalid)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={c: pa.string() for c in present},
+        include_columns=present,
+        strings_can_be_null=False,
+        quoted_strings_can_be_null=False,
+    )
+
+    def with_irregular(lines: npt.NDArray[np.int64], table: pa.Table, upto: int | None) -> RowBlock:
+        table = _with_absent(table, absent)
+        taken = sorted(n for n in irregular if upto is None or n < upto)
+        if taken:
+            rows = []
+            for n in taken:
+                values = next(csv.reader(io.StringIO(irregular.pop(n), newline="")), [])
+                padded = values + [None] * (len(header) - len(values))
+                rows.append(dict(zip(header, padded, strict=False)))
+            lines = np.concatenate([lines, np.array(taken, dtype=np.int64)])
+            table = pa.concat_tables([table, _table_from_rows(rows)])
+            order = np.argsort(lines, kind="stable")
+            lines, table = lines[order], table.take(order)
+        return RowBlock(lines, table, absent)
+
+    with _open_csv_binary(path) as source:
+        if start is not None:
+            source.seek(start)
+        reader = pa_csv.open_csv(source, read_options, parse_options, convert_options)
+        next_line = first_line
+        for batch in reader:
+            n = batch.num_rows
+            # Regular rows take the next record numbers not claimed by irregular rows.
+            lines = np.arange(next_line, next_line + n + len(irregular), dtype=np.int64)
+            if irregular:
+                lines = lines[~np.isin(lines, list(irregular))]
+            lines = lines[:n]
+            if n:
+                next_line = int(lines[-1]) + 1
+            yield with_irregular(lines, pa.Table.from_batches([batch]), next_line)
+        yield with_irregular(np.empty(0, dtype=np.int64), reader.schema.empty_table(), None)
+
+
+def _concat(blocks: list[RowBlock]) -> RowBlock:
+    return RowBlock(
+        np.concatenate([b.lines for b in blocks]),
+        pa.concat_tables([b.table for b in blocks]),
+        blocks[0].absent,
+    )
+
+
+def _rechunk(blocks: Iterator[RowBlock], size: int) -> Iterator[RowBlock]:
+    pending: list[RowBlock] = []
+    count = 0
+    for block in blocks:
+        pending.append(block)
+        count += len(block.lines)
+        while count >= size:
+            merged = _concat(pending)
+            yield RowBlock(merged.lines[:size], merged.table.slice(0, size), merged.absent)
+            pending = [RowBlock(merged.lines[size:], merged.table.slice(size), merged.absent)]
+            count -= size
+    if count:
+        yield _concat(pending)
+
+
+def _iter_table_batches(path: Path, fmt: str, columns: list[str]) -> Iterator[pa.RecordBatch]:
+    if fmt == "parquet":
+        # Decoded one row group at a time; only the PriceRow columns are read.
+        pf = pq.ParquetFile(path)
+        yield from pf.iter_batches(_TABLE_BATCH_ROWS, columns=columns, use_threads=False)
+        return
+    with pa.memory_map(str(path)) as source:
+        reader = _open_ipc(source)
+        if isinstance(reader, pa.ipc.RecordBatchFileReader):
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).select(columns)
+        else:
+            for batch in reader:
+                yield batch.select(columns)
+
+
+def _iter_table(path: Path, fmt: str, header: list[str], first_line: int) -> Iterator[RowBlock]:
+    """Stream a Parquet/Arrow file with its PriceRow columns cast to text.
+
+    Typed values are read in their string form (dates as YYYY-MM-DD, numbers as their
+    shortest round-trip repr), so a table validates like the CSV it would export to.
+    """
+    absent = frozenset(c for c in KNOWN_COLS if c not in header)
+    present = [c for c in KNOWN_COLS if c not in absent]
+    line = first_line
+    for batch in _iter_table_batches(path, fmt, present):
+        columns = []
+        for c, column in zip(present, batch.columns, strict=True):
+            try:
+                columns.append(pc.cast(column, pa.string()))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                msg = f"{path}: column {c!r} ({column.type}) can't be read as text"
+                raise ValueError(msg) from e
+        table = _with_absent(pa.table(columns, names=present), absent)
+        lines = np.arange(line, line + batch.num_rows, dtype=np.int64)
+        line += batch.num_rows
+        yield RowBlock(lines, table, absent)
+
+
+def iter_blocks(
+    path: Path, size: int, *, start: int | None = None, first_line: int = 2
+) -> Iterator[RowBlock]:
+    """Stream any supported input (see `input_format`) as RowBlocks of `size` rows.
+
+    CSVs go through `iter_csv_blocks`. Parquet and Arrow rows are numbered as if they had
+    a header line, so the first row is `first_line`. Only a plain CSV can be resumed at a
+    byte offset (`start`).
+    """
+    fmt = input_format(path) or "csv"
+    if fmt.startswith("csv"):
+        yield from iter_csv_blocks(path, size, start=start, first_line=first_line)
+        return
+    if start is not None:
+        raise ValueError(f"{path}: only plain CSV files can be read from a byte offset")
+    yield from _rechunk(_iter_table(path, fmt, read_header(path), first_line), size)
+
+
+def iter_csv_blocks(
+    path: Path, size: int, *, start: int | None = None, first_line: int = 2
+) -> Iterator[RowBlock]:
+    """Stream a CSV file as RowBlocks of `size` rows (the last may be shorter).
+
+    Rows come out exactly as csv.DictReader would produce them, in file order. `start`
+    resumes reading at a byte offset on a row boundary past the header (the header is
+    still taken from the top of the file), numbering rows from `first_line`. `.gz`,
+    `.bz2` and `.xz` files are decompressed as they stream; they can't be resumed.
+    """
+    if start is not None and _csv_format(path) != "csv":
+        raise ValueError(f"{path}: only plain CSV files can be read from a byte offset")
+    header = read_header(path)
+    absent = frozenset(c for c in KNOWN_COLS if c not in header)
+    if len(set(header)) != len(header) or absent == frozenset(KNOWN_COLS):
+        # DictReader keeps the last of duplicate columns; Arrow would not.
+        yield from _rechunk(_iter_exact(path, header, absent, start, first_line), size)
+        return
+    try:
+        blocks = _iter_arrow(path, header, absent, start, first_line)
+        first = next(blocks)
+    except pa.ArrowException:
+        # Shapes Arrow refuses to open (e.g. an empty file); DictReader decides.
+        yield from _rechunk(_iter_exact(path, header, absent, start, first_line), size)
+        return
+    yield from _rechunk(chain([first], blocks), size)
+
+
+def _error_reason(err: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in err.errors())
+
+
+def _bits(buf: pa.Buffer, offset: int, n: int) -> npt.NDArray[np.bool_]:
+    """Unpack an Arrow bitmap (validity or boolean values) into a numpy mask."""
+    unpacked = np.unpackbits(np.frombuffer(buf, dtype=np.uint8), bitorder="little")
+    return unpacked[offset : offset + n].view(np.bool_)
+
+
+def _is_valid(arr: pa.Array) -> npt.NDArray[np.bool_]:
+    if arr.null_count == 0:
+        return np.ones(len(arr), dtype=bool)
+    return _bits(arr.buffers()[0], arr.offset, len(arr))
+
+
+def _utf8_buffers(
+    col: pa.ChunkedArray,
+) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.int32], npt.NDArray[np.uint8]]:
+    """(is_valid, offsets, data bytes) of a string column, without copying the strings."""
+    arr = col.combine_chunks()
+    n = len(arr)
+    _, offsets_buf, data_buf = arr.buffers()
+    offsets = np.frombuffer(offsets_buf, dtype=np.int32, count=n + 1, offset=arr.offset * 4)
+    data = (
+        np.frombuffer(data_buf, dtype=np.uint8) if data_buf is not None else np.empty(0, np.uint8)
+    )
+    return _is_valid(arr), offsets, data
+
+
+def _non_empty(col: pa.ChunkedArray) -> npt.NDArray[np.bool_]:
+    valid, offsets, _ = _utf8_buffers(col)
+    return valid & (np.diff(offsets) > 0)
+
+
+def _parse_iso_dates(
+    col: pa.ChunkedArray,
+) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.int64]]:
+    """Find valid YYYY-MM-DD strings (ASCII digits) and convert them to proleptic ordinals."""
+    valid, offsets, data = _utf8_buffers(col)
+    n = len(valid)
+    ok = valid & (np.diff(offsets) == 10)
+    ordinals = np.zeros(n, dtype=np.int64)
+    idx = np.flatnonzero(ok)
+    if len(idx) == n and n and offsets[-1] - offsets[0] == 10 * n:
+        chars = data[offsets[0] : offsets[-1]].reshape(n, 10)  # all 10 bytes: no gather
+    else:
+        chars = data[offsets[idx, None] + np.arange(10)]
+    # One contiguous row per character position; uint8 wrap-around makes non-digits > 9.
+    digits = np.ascontiguousarray(chars.T) - np.uint8(ord("0"))
+    shape_ok = (chars[:, 4] == ord("-")) & (chars[:, 7] == ord("-"))
+    for pos in (0, 1, 2, 3, 5, 6, 8, 9):
+        shape_ok &= digits[pos] <= 9
+    dg = digits.astype(np.int32)
+    y = ((dg[0] * 10 + dg[1]) * 10 + dg[2]) * 10 + dg[3]
+    m = dg[5] * 10 + dg[6]
+    d = dg[8] * 10 + dg[9]
+    leap = (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+    month_ok = (m >= 1) & (m <= 12)
+    mi = np.where(month_ok, m, 1)
+    dim = _DAYS_IN_MONTH[mi] + ((mi == 2) & leap)
+    ok[idx] = shape_ok & (y >= 1) & month_ok & (d >= 1) & (d <= dim)
+    py = y - 1
+    ordinals[idx] = py * 365 + py // 4 - py // 100 + py // 400
+    ordinals[idx] += _DAYS_BEFORE_MONTH[mi] + ((mi > 2) & leap) + d
+    return ok, ordinals
+
+
+def _parse_prices(
+    col: pa.ChunkedArray,
+) -> tuple[npt.NDArray[np.bool_], npt.NDArray[np.float64]]:
+    """Parse prices with Arrow's float cast, which accepts a subset of what PriceRow does."""
+    col = col.combine_chunks()
+    try:
+        parsed = pc.cast(col, pa.float64())
+        ok = _is_valid(parsed)
+    except pa.ArrowInvalid:
+        # Some value doesn't parse: cast only plain decimals and leave the rest to PriceRow.
+        matches = pc.fill_null(pc.match_substring_regex(col, _DECIMAL), False)
+        ok = _bits(matches.buffers()[1], matches.offset, len(matches)).copy()
+        parsed = pc.cast(pc.if_else(matches, col, "0"), pa.float64())
+    prices = np.array(pc.fill_null(parsed, 0.0).to_numpy(), dtype=np.float64)
+    return ok, prices
+
+
+def validate_block(block: RowBlock) -> BlockVerdict:
+    """Validate a block column-wise with PriceRow semantics.
+
+    The vectorized fast path accepts non-empty names/set codes/numbers, YYYY-MM-DD dates
+    and prices Arrow can cast to float. Every other row is checked by PriceRow itself,
+    which stays the reference for both the verdict and the reason.
+    """
+    table = block.table
+    fast = _non_empty(table.column("name")) & _non_empty(table.column("set_code"))
+    fast &= _non_empty(table.column("number"))
+
+    date_ok, days = _parse_iso_dates(table.column("date"))
+    fast &= date_ok
+
+    price_ok, prices = _parse_prices(table.column("price"))
+    fast &= price_ok
+
+    valid = fast.copy()
+    errors: dict[int, str] = {}
+    slow = np.flatnonzero(~fast)
+    if len(slow):
+        for i, row in zip(slow.tolist(), table.take(slow).to_pylist(), strict=True):
+            for c in block.absent:
+                del row[c]
+            try:
+                pr = PriceRow.model_validate(row)
+            except ValidationError as e:
+                errors[i] = _error_reason(e)
+                continue
+            valid[i] = True
+            days[i] = pr.date.toordinal()
+            prices[i] = pr.price
+    return BlockVerdict(valid, days, prices, errors)
+
+
+__all__ = [
+    "KNOWN_COLS",
+    "RowBlock",
+    "BlockVerdict",
+    "input_format",
+    "open_csv_text",
+    "read_header",
+    "iter_blocks",
+    "iter_csv_blocks",
+    "validate_block",
+]
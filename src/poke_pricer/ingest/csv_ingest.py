@@ -1,74 +1,229 @@
 from __future__ import annotations
 
+import contextlib
 import csv
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date
 from pathlib import Path
+from typing import Any, NamedTuple
 
+import numpy as np
 from pydantic import ValidationError
+from sqlmodel import Session
 
 from ..db import (
+    CardKey,
     find_card,
     get_session,
     init_db,
     insert_price_if_absent,
+    insert_prices_bulk,
     upsert_card,
 )
+from .cards import CardInterner
+from .columnar import (
+    RowBlock,
+    input_format,
+    iter_blocks,
+    open_csv_text,
+    read_header,
+    validate_block,
+)
+from .manifest import FilePlan, load_manifest, plan_file, record_file
 from .schema import PriceRow
 
 REQUIRED_COLS: set[str] = {"name", "set_code", "number", "date", "price"}
 
+# Rows validated, resolved and written per transaction in bulk mode.
+DEFAULT_BATCH_SIZE = 5000
+
+# Rows per block for the row-by-row path over Parquet/Arrow input.
+_ROW_BLOCK_ROWS = 10_000
+
+# Rows per block when only validating: no transaction to bound, so amortize per-block work.
+_VALIDATE_BLOCK_ROWS = 65_536
+
+# (cards_created, prices_inserted, prices_skipped)
+IngestCounts = tuple[int, int, int]
+
+
+class _Batch(NamedTuple):
+    """Validated rows of one batch, column-wise so it pickles cheaply across processes."""
+
+    keys: list[CardKey]
+    rarities: list[str | None]
+    days: list[int]  # date.toordinal()
+    sources: list[str]
+    prices: list[float]
+    invalid: int
+
+
+class FileResult(NamedTuple):
+    """Outcome of one file in `ingest_dir_per_file`."""
+
+    path: Path
+    counts: IngestCounts
+    status: str  # "ingested", "appended" or "unchanged" (see manifest.plan_file)
+
 
-def _has_required_header(path: Path) -> bool:
+def input_files(dir_path: Path) -> list[Path]:
+    """Files under dir_path (non-recursive) in a supported input format, sorted."""
+    return sorted(f for f in dir_path.iterdir() if input_format(f) is not None and f.is_file())
+
+
+def has_required_header(path: Path) -> bool:
+    """Whether `path` (CSV, compressed CSV, Parquet or Arrow) has the required columns."""
     try:
-        with path.open("r", newline="") as f:
-            reader = csv.DictReader(f)
-            cols = set(reader.fieldnames or [])
-            return REQUIRED_COLS.issubset(cols)
+        return REQUIRED_COLS.issubset(read_header(path))
     except Exception:
         return False
 
 
-def _read_rows(path: Path) -> list[dict[str, str]]:
-    with path.open("r", newline="") as f:
+def _require_columns(cols: Iterable[str]) -> None:
+    have = set(cols)
+    missing = REQUIRED_COLS - have
+    if missing:
+        raise ValueError(f"CSV missing required columns: {sorted(missing)} (have: {sorted(have)})")
+
+
+def _iter_rows(path: Path, start: int | None = None) -> Iterator[dict[str, str]]:
+    """Stream raw rows; the header is checked before the first row is yielded.
+
+    `start` resumes a plain CSV at a byte offset on a row boundary past the header.
+    Parquet/Arrow rows are the PriceRow columns the file has, as text (see `iter_blocks`).
+    """
+    fmt = input_format(path) or "csv"
+    if not fmt.startswith("csv"):
+        _require_columns(read_header(path))
+        for block in iter_blocks(path, _ROW_BLOCK_ROWS, start=start):
+            for row in block.table.to_pylist():
+                for c in block.absent:
+                    del row[c]
+                yield row
+        return
+    with open_csv_text(path) as f:
         reader = csv.DictReader(f)
-        cols = set(reader.fieldnames or [])
-        missing = REQUIRED_COLS - cols
-        if missing:
-            raise ValueError(
-                f"CSV missing required columns: {sorted(missing)} (have: {sorted(cols)})"
-            )
-        return [dict(row) for row in reader]
+        _require_columns(reader.fieldnames or [])
+        if start is not None:
+            f.seek(start)
+        yield from reader
+
+
+def _card_key(name: str, set_code: str, number: str) -> CardKey:
+    return (name.strip(), set_code.strip(), number.strip())
+
+
+def _row_source(source: str | None, default_source: str) -> str:
+    return (source or default_source).strip() or default_source
 
 
-def validate_csv(path: Path) -> tuple[int, int]:
-    """Return (valid_count, invalid_count) for a CSV file against PriceRow schema."""
+def _validate_block(block: RowBlock, default_source: str) -> _Batch:
+    """Validate one block of raw rows (see `validate_block`) and keep the valid ones."""
+    verdict = validate_block(block)
+    idx = np.flatnonzero(verdict.valid)
+    rows = block.table.take(idx)
+
+    def col(name: str) -> list[Any]:
+        values: list[Any] = rows.column(name).to_pylist()
+        return values
+
+    return _Batch(
+        keys=list(map(_card_key, col("name"), col("set_code"), col("number"))),
+        rarities=col("rarity"),
+        days=verdict.days[idx].tolist(),
+        sources=[_row_source(s, default_source) for s in col("source")],
+        prices=verdict.prices[idx].tolist(),
+        invalid=len(block.lines) - len(idx),
+    )
+
+
+def _iter_validated(
+    path: Path, default_source: str, batch_size: int, start: int | None = None
+) -> Iterator[_Batch]:
+    """Lazily read and validate `path` (from byte offset `start`) in fixed-size batches."""
+    _require_columns(read_header(path))
+    for block in iter_blocks(path, batch_size, start=start):
+        yield _validate_block(block, default_source)
+
+
+def _parse_file(
+    path: Path, default_source: str, batch_size: int, start: int | None = None
+) -> list[_Batch]:
+    """Read and validate a file without touching the DB (process-pool task)."""
+    return list(_iter_validated(path, default_source, batch_size, start))
+
+
+def validate_csv(path: Path, rejects: Path | None = None) -> tuple[int, int]:
+    """
+    Return (valid_count, invalid_count) for a CSV file against PriceRow schema.
+    Compressed CSVs and Parquet/Arrow files are accepted too (see `columnar.iter_blocks`).
+
+    Rows are validated column-wise in blocks (see `columnar.validate_block`). With
+    `rejects`, every invalid row is written there as `line,reason`; the header is line 1.
+    """
     valid = 0
     invalid = 0
-    with path.open("r", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                PriceRow.model_validate(dict(row))
-                valid += 1
-            except ValidationError:
-                invalid += 1
+    with contextlib.ExitStack() as stack:
+        out = None
+        if rejects is not None:
+            out = csv.writer(stack.enter_context(rejects.open("w", newline="")))
+            out.writerow(["line", "reason"])
+        for block in iter_blocks(path, _VALIDATE_BLOCK_ROWS):
+            verdict = validate_block(block)
+            n_valid = int(verdict.valid.sum())
+            valid += n_valid
+            invalid += len(block.lines) - n_valid
+            if out is not None:
+                out.writerows((int(block.lines[i]), reason) for i, reason in verdict.errors.items())
     return (valid, invalid)
 
 
-def ingest_csv(path: Path, default_source: str = "csv") -> tuple[int, int, int]:
-    """
-    Ingest one CSV file (idempotent on (card_id, date, source)).
-    Returns (cards_created, prices_inserted, prices_skipped).
+class BatchWriter:
+    """The single DB writer: owns the session and the card-key map.
+
+    Each batch interns its card keys (new cards are inserted together, ids returned by the
+    insert) and writes its prices with one INSERT ... ON CONFLICT DO NOTHING, then commits:
+    one transaction per batch however many cards it creates.
     """
-    # Ensure tables exist before writing.
-    init_db()
 
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.cards = CardInterner(session)
+
+    def write(self, batches: Iterable[_Batch]) -> IngestCounts:
+        created_cards = 0
+        inserted = 0
+        skipped = 0
+        for batch in batches:
+            card_ids, created = self.cards.intern(batch.keys, batch.rarities)
+            created_cards += created
+            prices: list[dict[str, Any]] = [
+                {
+                    "card_id": card_id,
+                    "date": date.fromordinal(day),
+                    "source": source,
+                    "price": price,
+                }
+                for card_id, day, source, price in zip(
+                    card_ids, batch.days, batch.sources, batch.prices, strict=True
+                )
+            ]
+            i = insert_prices_bulk(self.session, prices)
+            self.session.commit()
+            inserted += i
+            skipped += batch.invalid + len(prices) - i
+        return (created_cards, inserted, skipped)
+
+
+def _ingest_rows_one_by_one(rows: Iterable[dict[str, str]], default_source: str) -> IngestCounts:
     created_cards = 0
     inserted = 0
     skipped = 0
-    card_cache: dict[tuple[str, str, str], int] = {}
+    card_cache: dict[CardKey, int] = {}
 
     with get_session() as session:
-        rows = _read_rows(path)
         for raw in rows:
             try:
                 pr = PriceRow.model_validate(raw)
@@ -77,12 +232,7 @@ def ingest_csv(path: Path, default_source: str = "csv") -> tuple[int, int, int]:
                 session.rollback()
                 continue
 
-            name = pr.name.strip()
-            set_code = pr.set_code.strip()
-            number = pr.number.strip()
-            source = (pr.source or default_source).strip() or default_source
-
-            key = (name, set_code, number)
+            name, set_code, number = key = _card_key(pr.name, pr.set_code, pr.number)
             if key in card_cache:
                 card_id = card_cache[key]
             else:
@@ -108,7 +258,7 @@ def ingest_csv(path: Path, default_source: str = "csv") -> tuple[int, int, int]:
                 session,
                 card_id=card_id,
                 dt=pr.date,
-                source=source,
+                source=_row_source(pr.source, default_source),
                 price=float(pr.price),
             ):
                 inserted += 1
@@ -118,26 +268,178 @@ def ingest_csv(path: Path, default_source: str = "csv") -> tuple[int, int, int]:
     return (created_cards, inserted, skipped)
 
 
-def ingest_dir(dir_path: Path, default_source: str = "csv") -> tuple[int, int, int]:
+def ingest_csv(
+    path: Path,
+    default_source: str = "csv",
+    *,
+    bulk: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> IngestCounts:
     """
-    Ingest all *.csv files under dir_path (non-recursive) that have the required header.
-    Skips CSVs that don't match the ingestion schema (e.g., equity/signals exports).
-    Returns accumulated (cards_created, prices_inserted, prices_skipped).
+    Ingest one CSV file (idempotent on (card_id, date, source)).
+    Returns (cards_created, prices_inserted, prices_skipped).
+
+    `.csv.gz`, `.csv.bz2` and `.csv.xz` files are decompressed while streaming; Parquet
+    (`.parquet`) and Arrow IPC/Feather (`.arrow`, `.feather`, `.ipc`) files are read batch
+    by batch. All of them share the validation and write path below.
+
+    The file is streamed: rows are read and validated lazily and written in batches of
+    `batch_size`, so memory stays bounded by the batch size rather than the file size.
+    In bulk mode (default) each batch resolves its card ids with one query and writes its
+    prices with one INSERT ... ON CONFLICT DO NOTHING, in a single transaction.
+    `bulk=False` keeps the original row-by-row path (one transaction per price point).
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be >= 1 (got {batch_size})")
+
+    # Ensure tables exist before writing.
+    init_db()
+
+    if not bulk:
+        return _ingest_rows_one_by_one(_iter_rows(path), default_source)
+    with get_session() as session:
+        return ingest_stream(path, BatchWriter(session), default_source, batch_size=batch_size)
+
+
+def ingest_stream(
+    path: Path,
+    writer: BatchWriter,
+    default_source: str = "csv",
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start: int | None = None,
+) -> IngestCounts:
+    """Stream `path` (from byte offset `start`, see `manifest.plan_file`) through
+    `writer` in batches of `batch_size`; returns its counts as `ingest_csv` does.
+
+    The tables must exist (`init_db`). Each batch is committed by the writer, so a
+    caller keeping one writer across files (e.g. `watch.FolderWatcher`) rolls back its
+    session and starts a new writer after a failure.
+    """
+    return writer.write(_iter_validated(path, default_source, batch_size, start))
+
+
+def _iter_parsed_parallel(
+    plans: Sequence[FilePlan], default_source: str, batch_size: int, workers: int
+) -> Iterator[tuple[FilePlan, list[_Batch]]]:
+    """Parse/validate files in a process pool and yield them in input order.
+
+    At most 2 * workers files are in flight, which bounds the parsed rows held in memory.
+    """
+    todo = iter(plans)
+    pending: deque[tuple[FilePlan, Future[list[_Batch]]]] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def submit_next() -> None:
+            p = next(todo, None)
+            if p is not None:
+                fut = pool.submit(_parse_file, p.path, default_source, batch_size, p.start)
+                pending.append((p, fut))
+
+        for _ in range(2 * workers):
+            submit_next()
+        while pending:
+            f, fut = pending.popleft()
+            submit_next()
+            yield (f, fut.result())
+
+
+def ingest_dir_per_file(
+    dir_path: Path,
+    default_source: str = "csv",
+    *,
+    bulk: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    force: bool = False,
+) -> list[FileResult]:
+    """
+    Ingest all price files under dir_path (non-recursive) that have the required header:
+    CSVs, compressed CSVs and Parquet/Arrow files (see `ingest_csv`), in any mix.
+    Skips files that don't match the ingestion schema (e.g., equity/signals exports).
+    Returns one FileResult per file, in file order.
+
+    Each file is recorded in the ingest manifest (size, mtime, content hash, row counts).
+    On later runs, files whose size and mtime are unchanged are skipped without being read,
+    and plain CSVs that only grew by appending are read from the last ingested byte (any
+    other changed file is read again in full). `force` re-reads every file in full.
+
+    With workers > 1, files are parsed and validated in a process pool while a single
+    writer (this process, one session) applies their batches in sorted file order, so
+    the outcome is identical to the serial run.
     """
-    total_c = 0
-    total_i = 0
-    total_s = 0
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1 (got {workers})")
+    if workers > 1 and not bulk:
+        raise ValueError("parallel ingest (workers > 1) requires bulk mode")
 
-    for csv_file in sorted(dir_path.glob("*.csv")):
-        if not _has_required_header(csv_file):
-            # Silently skip non-price CSVs; they are not ingestion inputs.
-            continue
-        c, i, s = ingest_csv(csv_file, default_source=default_source)
-        total_c += c
-        total_i += i
-        total_s += s
+    # Silently skip non-price files; they are not ingestion inputs.
+    files = [f for f in input_files(dir_path) if has_required_header(f)]
 
-    return (total_c, total_i, total_s)
+    init_db()
+    counts: dict[Path, IngestCounts] = {}
+    with get_session() as session:
+        manifest = load_manifest(session, files)
+        plans = [plan_file(f, manifest.get(f), force=force) for f in files]
+        todo = [p for p in plans if p.status != "unchanged"]
+
+        def done(plan: FilePlan, file_counts: IngestCounts) -> None:
+            counts[plan.path] = file_counts
+            _, inserted, skipped = file_counts
+            record_file(session, plan, manifest.get(plan.path), inserted, skipped)
+
+        if not bulk:
+            for p in todo:
+                done(p, _ingest_rows_one_by_one(_iter_rows(p.path, p.start), default_source))
+        elif workers == 1:
+            writer = BatchWriter(session)
+            for p in todo:
+                done(
+                    p,
+                    ingest_stream(
+                        p.path, writer, default_source, batch_size=batch_size, start=p.start
+                    ),
+                )
+        else:
+            writer = BatchWriter(session)
+            for p, parsed in _iter_parsed_parallel(todo, default_source, batch_size, workers):
+                done(p, writer.write(parsed))
+
+        for p in plans:
+            entry = manifest.get(p.path)
+            if p.status == "unchanged" and entry is not None and entry.mtime_ns != p.mtime_ns:
+                record_file(session, p, entry, 0, 0)  # touched only: remember the new mtime
+    return [FileResult(p.path, counts.get(p.path, (0, 0, 0)), p.status) for p in plans]
+
+
+def ingest_dir(
+    dir_path: Path,
+    default_source: str = "csv",
+    *,
+    bulk: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    force: bool = False,
+) -> IngestCounts:
+    """
+    Ingest all price CSVs under dir_path (see `ingest_dir_per_file`).
+    Returns accumulated (cards_created, prices_inserted, prices_skipped).
+    """
+    per_file = ingest_dir_per_file(
+        dir_path, default_source, bulk=bulk, batch_size=batch_size, workers=workers, force=force
+    )
+    totals = [sum(r.counts[k] for r in per_file) for k in range(3)]
+    return (totals[0], totals[1], totals[2])
 
 
-__all__ = ["validate_csv", "ingest_csv", "ingest_dir"]
+__all__ = [
+    "BatchWriter",
+    "FileResult",
+    "has_required_header",
+    "ingest_csv",
+    "ingest_dir",
+    "ingest_dir_per_file",
+    "ingest_stream",
+    "input_files",
+    "validate_csv",
+]
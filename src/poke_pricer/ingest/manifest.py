@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from sqlmodel import Session, col, select
+
+from ..models import IngestedFile
+from .columnar import input_format
+
+_HASH_CHUNK = 1 << 20
+
+
+class FilePlan(NamedTuple):
+    """What `ingest dir` should do with one file, given its manifest entry."""
+
+    path: Path
+    status: str  # "unchanged" (skip), "appended" (read from `start`) or "ingested" (read all)
+    start: int | None  # byte offset of the first unread row; None reads the whole file
+    first_line: int  # record number of the first row read (the header is line 1)
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+def _manifest_key(path: Path) -> str:
+    return str(path.resolve())
+
+
+def _hash_file(path: Path, size: int, split: int | None) -> tuple[str, str | None, bool]:
+    """sha256 of the first `size` bytes, read once.
+
+    Also returns the sha256 of the first `split` bytes and whether they end a line.
+    """
+    total = hashlib.sha256()
+    prefix: str | None = None
+    ends_line = False
+    pos = 0
+    with path.open("rb") as f:
+        while pos < size:
+            chunk = f.read(min(_HASH_CHUNK, size - pos))
+            if not chunk:
+                break
+            if split is not None and pos < split <= pos + len(chunk):
+                head = chunk[: split - pos]
+                total.update(head)
+                prefix = total.hexdigest()
+                ends_line = head.endswith(b"\n")
+                total.update(chunk[split - pos :])
+            else:
+                total.update(chunk)
+            pos += len(chunk)
+    return total.hexdigest(), prefix, ends_line
+
+
+def load_manifest(session: Session, paths: Sequence[Path]) -> dict[Path, IngestedFile]:
+    """Manifest entries for `paths` (missing ones are absent), in one query."""
+    keys = {_manifest_key(p): p for p in paths}
+    entries = session.exec(select(IngestedFile).where(col(IngestedFile.path).in_(list(keys))))
+    return {keys[e.path]: e for e in entries}
+
+
+def plan_file(path: Path, entry: IngestedFile | None, *, force: bool = False) -> FilePlan:
+    """
+    Decide how to (re)ingest `path`:
+    - same size and mtime as recorded: unchanged, without reading the file;
+    - a plain CSV whose recorded bytes are an unchanged prefix ending on a line break:
+      appended, so only the new bytes are read (compressed and Parquet/Arrow files have no
+      appendable byte layout);
+    - otherwise (new, rewritten or `force`): ingest the whole file.
+    Content is hashed only when size/mtime differ.
+    """
+    st = path.stat()
+    size, mtime_ns = st.st_size, st.st_mtime_ns
+    if entry is not None and not force and (size, mtime_ns) == (entry.size, entry.mtime_ns):
+        return FilePlan(path, "unchanged", None, 2, size, mtime_ns, entry.sha256)
+
+    split = None
+    if entry is not None and 0 < entry.size < size and input_format(path) == "csv":
+        split = entry.size
+    digest, prefix, ends_line = _hash_file(path, size, split)
+    if entry is not None and not force:
+        if size == entry.size and digest == entry.sha256:
+            # Touched but not modified.
+            return FilePlan(path, "unchanged", None, 2, size, mtime_ns, digest)
+        if prefix == entry.sha256 and ends_line:
+            return FilePlan(path, "appended", entry.size, entry.rows + 2, size, mtime_ns, digest)
+    return FilePlan(path, "ingested", None, 2, size, mtime_ns, digest)
+
+
+def record_file(
+    session: Session, plan: FilePlan, entry: IngestedFile | None, inserted: int, skipped: int
+) -> None:
+    """Upsert the manifest entry for a planned file once its rows are written; commits."""
+    if entry is None:
+        entry = IngestedFile(
+            path=_manifest_key(plan.path),
+            size=0,
+            mtime_ns=0,
+            sha256="",
+            rows=0,
+            prices_inserted=0,
+            prices_skipped=0,
+            ingested_at=datetime.now(UTC),
+        )
+    if plan.status == "ingested":
+        entry.rows = entry.prices_inserted = entry.prices_skipped = 0
+    if plan.status != "unchanged":
+        # Every row read is either inserted or skipped (invalid or already present).
+        entry.rows += inserted + skipped
+        entry.prices_inserted += inserted
+        entry.prices_skipped += skipped
+        entry.ingested_at = datetime.now(UTC)
+    entry.size = plan.size
+    entry.mtime_ns = plan.mtime_ns
+    entry.sha256 = plan.sha256
+    session.add(entry)
+    session.commit()
+
+
+__all__ = ["FilePlan", "load_manifest", "plan_file", "record_file"]
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import NamedTuple
+
+from sqlalchemy.engine import Engine
+
+from ..db import get_engine, get_session, init_db
+from .csv_ingest import (
+    DEFAULT_BATCH_SIZE,
+    BatchWriter,
+    IngestCounts,
+    has_required_header,
+    ingest_stream,
+    input_files,
+)
+from .manifest import load_manifest, plan_file, record_file
+
+log = logging.getLogger(__name__)
+
+
+class WatchResult(NamedTuple):
+    """Outcome of one file picked up by a poll."""
+
+    path: Path  # where the file was found
+    counts: IngestCounts
+    status: str  # "ingested", "appended", "unchanged" (see manifest.plan_file) or "failed"
+    lag: float  # seconds from the file's last write to its last commit
+    archived: Path | None  # where the file was moved, if archiving
+    error: str | None = None  # why it failed, or why archiving failed (its prices stand)
+
+
+@dataclass
+class WatchStats:
+    """Running counters of a FolderWatcher."""
+
+    polls: int = 0
+    files: int = 0  # ingested or appended
+    failed: int = 0
+    rows: int = 0  # data rows read, valid or not
+    cards_created: int = 0
+    prices_inserted: int = 0
+    prices_skipped: int = 0
+    busy_seconds: float = 0.0  # reading, validating and writing; not sleeping
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.busy_seconds if self.busy_seconds else 0.0
+
+
+def _archive_path(archive_dir: Path, name: str) -> Path:
+    dest = archive_dir / name
+    n = 1
+    while dest.exists():
+        dest = archive_dir / f"{n}_{name}"
+        n += 1
+    return dest
+
+
+class FolderWatcher:
+    """Poll a folder and ingest new or grown price files as they appear.
+
+    One engine, session and card-key map live for the watcher's lifetime, so a poll costs
+    a directory listing plus the work for the files that changed. Files go through the
+    ingest manifest like `ingest dir` (appended plain CSVs resume where they stopped) and
+    are picked up once untouched for `settle` seconds, so half-written files are left
+    alone. With `archive_dir`, each processed file is moved there.
+    """
+
+    def __init__(
+        self,
+        dir_path: Path,
+        *,
+        archive_dir: Path | None = None,
+        default_source: str = "csv",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        settle: float = 1.0,
+        engine: Engine | None = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1 (got {batch_size})")
+        self.dir_path = dir_path
+        self.archive_dir = archive_dir
+        self.default_source = default_source
+        self.batch_size = batch_size
+        self.settle = settle
+        self.stats = WatchStats()
+        if archive_dir is not None:
+            archive_dir.mkdir(parents=True, exist_ok=True)
+        self.engine = engine or get_engine()
+        init_db(self.engine)
+        self.session = get_session(self.engine)
+        self.writer = BatchWriter(self.session)
+        # (size, mtime_ns) of files not to look at again until they change: files already
+        # processed, files without the price columns and files that failed to ingest.
+        self._seen: dict[Path, tuple[int, int]] = {}
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> FolderWatcher:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _ready_files(self) -> list[Path]:
+        cutoff = time.time_ns() - int(self.settle * 1e9)
+        ready = []
+        for f in input_files(self.dir_path):
+            try:
+                st = f.stat()
+            except FileNotFoundError:
+                continue  # moved away since the listing
+            sig = (st.st_size, st.st_mtime_ns)
+            if st.st_mtime_ns > cutoff or self._seen.get(f) == sig:
+                continue
+            if not has_required_header(f):
+                self._seen[f] = sig
+                continue
+            ready.append(f)
+        return ready
+
+    def _archive(self, path: Path) -> Path | None:
+        if self.archive_dir is None:
+            return None
+        # The manifest entry stays under the original path: a file arriving later under
+        # the same name is compared against it, and ingest is idempotent either way.
+        return Path(shutil.move(path, _archive_path(self.archive_dir, path.name)))
+
+    def poll(self) -> list[WatchResult]:
+        """Ingest every ready file once, in name order; returns what was done to each."""
+        self.stats.polls += 1
+        files = self._ready_files()
+        if not files:
+            return []
+        results: list[WatchResult] = []
+        manifest = load_manifest(self.session, files)
+        for f in files:
+            started = time.perf_counter()
+            entry = manifest.get(f)
+            plan = plan_file(f, entry)
+            counts: IngestCounts = (0, 0, 0)
+            try:
+                if plan.status != "unchanged":
+                    counts = ingest_stream(
+                        f,
+                        self.writer,
+                        self.default_source,
+                        batch_size=self.batch_size,
+                        start=plan.start,
+                    )
+                    record_file(self.session, plan, entry, counts[1], counts[2])
+                elif entry is not None and entry.mtime_ns != plan.mtime_ns:
+                    record_file(self.session, plan, entry, 0, 0)  # touched only
+            except Exception as e:
+                # Keep watching; the file is retried once it changes.
+                log.warning("ingest of %s failed: %s", f, e)
+                self.session.rollback()
+                self.writer = BatchWriter(self.session)  # drop ids of rolled-back cards
+                self._seen[f] = (plan.size, plan.mtime_ns)
+                self.stats.failed += 1
+                self.stats.busy_seconds += time.perf_counter() - started
+                results.append(WatchResult(f, (0, 0, 0), "failed", 0.0, None, str(e)))
+                continue
+            lag = max(0.0, time.time() - plan.mtime_ns / 1e9)
+            archived, error = None, None
+            try:
+                archived = self._archive(f)
+            except OSError as e:
+                # The prices are committed: keep the counts, leave the file where it is.
+                log.warning("archiving %s failed: %s", f, e)
+                error = str(e)
+            if archived is None:
+                self._seen[f] = (plan.size, plan.mtime_ns)
+            s = self.stats
+            s.busy_seconds += time.perf_counter() - started
+            if plan.status != "unchanged":
+                created, inserted, skipped = counts
+                s.files += 1
+                s.rows += inserted + skipped
+                s.cards_created += created
+                s.prices_inserted += inserted
+                s.prices_skipped += skipped
+                s.last_lag = lag
+                s.max_lag = max(s.max_lag, lag)
+            results.append(WatchResult(f, counts, plan.status, lag, archived, error))
+        return results
+
+    def run(
+        self,
+        interval: float = 1.0,
+        *,
+        max_polls: int | None = None,
+        on_poll: Callable[[list[WatchResult]], None] | None = None,
+    ) -> WatchStats:
+        """Poll every `interval` seconds, forever or for `max_polls` polls.
+
+        `on_poll` receives each poll's results (empty if nothing was ready).
+        """
+        while max_polls is None or self.stats.polls < max_polls:
+            started = time.monotonic()
+            results = self.poll()
+            if on_poll is not None:
+                on_poll(results)
+            if max_polls is not None and self.stats.polls >= max_polls:
+                break
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        return self.stats
+
+
+__all__ = ["FolderWatcher", "WatchResult", "WatchStats"]
@@ -1,11 +1,41 @@
 from __future__ import annotations
 
-from datetime import date
+import datetime as dt
+from datetime import date, datetime
 from typing import Any, ClassVar
 
-from sqlalchemy import Index, UniqueConstraint
+from sqlalchemy import BigInteger, Index, Integer, SmallInteger, TypeDecorator, UniqueConstraint
+from sqlalchemy.engine import Dialect
 from sqlmodel import Field, SQLModel
 
+# Day numbers count days since 1970-01-01 (the same epoch as Arrow's date32).
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def day_number(d: date) -> int:
+    return d.toordinal() - _EPOCH_ORDINAL
+
+
+def from_day_number(n: int) -> date:
+    return date.fromordinal(n + _EPOCH_ORDINAL)
+
+
+class DayNumber(TypeDecorator[date]):
+    """A date stored as an integer day number (4 bytes or less instead of 10 of text)."""
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value: date | str | None, dialect: Dialect) -> int | None:
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = date.fromisoformat(value)
+        return day_number(value)
+
+    def process_result_value(self, value: int | None, dialect: Dialect) -> date | None:
+        return None if value is None else from_day_number(value)
+
 
 class Card(SQLModel, table=True):  # type: ignore[call-arg,misc]
     id: int | None = Field(default=None, primary_key=True)
@@ -20,14 +50,112 @@ class Card(SQLModel, table=True):  # type: ignore[call-arg,misc]
     )
 
 
+class Source(SQLModel, table=True):  # type: ignore[call-arg,misc]
+    """Price sources: each name is stored once, prices refer to it by a small id."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    name: str
+
+    __table_args__: ClassVar[tuple[Any, ...]] = (UniqueConstraint("name", name="uq_source_name"),)
+
+
 class PricePoint(SQLModel, table=True):  # type: ignore[call-arg,misc]
+    """One price observation. `date` is stored as a day number (it reads and binds as a
+    plain date) and `source` as the id of its `source` row (`db.source_ids`)."""
+
     id: int | None = Field(default=None, primary_key=True)
     card_id: int = Field(foreign_key="card.id")
-    date: date
-    source: str
+    date: dt.date = Field(sa_type=DayNumber)
+    source: int = Field(sa_type=SmallInteger, foreign_key="source.id")
     price: float
 
     __table_args__: ClassVar[tuple[Any, ...]] = (
         UniqueConstraint("card_id", "date", "source", name="uq_price_card_date_source"),
         Index("ix_price_date", "date"),
     )
+
+
+class CardLatest(SQLModel, table=True):  # type: ignore[call-arg,misc]
+    """Latest price per card, kept current by every price write (`db.refresh_card_latest`).
+
+    `date`/`price`/`source` are the card's most recent point (on a date with several
+    sources, the one whose name sorts first); `prev_*` the previous point from that same
+    source, and `return_1d` the change between the two (NULL without one). `source` is a
+    `source` id, as in pricepoint.
+    """
+
+    __tablename__ = "card_latest"
+
+    card_id: int = Field(foreign_key="card.id", primary_key=True)
+    date: dt.date = Field(sa_type=DayNumber)
+    price: float
+    source: int = Field(sa_type=SmallInteger, foreign_key="source.id")
+    prev_date: dt.date | None = Field(default=None, sa_type=DayNumber)
+    prev_price: float | None = None
+    return_1d: float | None = None
+
+    __table_args__: ClassVar[tuple[Any, ...]] = (Index("ix_card_latest_date", "date"),)
+
+
+class IngestedFile(SQLModel, table=True):  # type: ignore[call-arg,misc]
+    """One row per CSV consumed by `ingest dir`: what was read, so reruns can skip it."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    path: str  # resolved absolute path
+    size: int = Field(sa_type=BigInteger)  # bytes ingested
+    mtime_ns: int = Field(sa_type=BigInteger)
+    sha256: str  # of the first `size` bytes
+    rows: int  # data rows read (valid or not), across appends
+    prices_inserted: int
+    prices_skipped: int
+    ingested_at: datetime
+
+    __table_args__: ClassVar[tuple[Any, ...]] = (
+        UniqueConstraint("path", name="uq_ingestedfile_path"),
+    )
+
+
+class DataVersion(SQLModel, table=True):  # type: ignore[call-arg,misc]
+    """A single row: a token naming this database and a generation bumped by every price
+    write (with card_latest, `db.refresh_card_latest`), so a reader can cheaply tell
+    whether prices it loaded earlier are still current."""
+
+    __tablename__ = "data_version"
+
+    id: int = Field(default=1, primary_key=True)
+    token: str  # random, set when the row is created: a recreated file gets a new one
+    generation: int = Field(default=0, sa_type=BigInteger)
+
+
+class SignalValue(SQLModel, table=True):  # type: ignore[call-arg,misc]
+    """`compute_signals` per card, source, observed date and window, as materialized by
+    `services.signal_values`: the source's price for the card that day, its return since
+    the source's previous observation and the window's SMA and momentum (NULL where
+    undefined). `source` is a `source` id, as in pricepoint. `price_total` is the running
+    sum of the (card, source) prices through the date, from which an incremental run
+    continues the SMAs without reading older prices.
+    """
+
+    __tablename__ = "signal_values"
+
+    card_id: int = Field(foreign_key="card.id", primary_key=True)
+    source: int = Field(sa_type=SmallInteger, foreign_key="source.id", primary_key=True)
+    date: dt.date = Field(sa_type=DayNumber, primary_key=True)
+    window: int = Field(primary_key=True)  # days
+    price: float
+    ret: float | None = None
+    sma: float | None = None
+    mom: float | None = None
+    price_total: float
+
+
+class SignalState(SQLModel, table=True):  # type: ignore[call-arg,misc]
+    """A single row: the windows signal_values holds and the price watermarks it was last
+    brought up to date with, so the next incremental run reads only newer prices."""
+
+    __tablename__ = "signal_state"
+
+    id: int = Field(default=1, primary_key=True)
+    windows: str  # comma-separated, ascending
+    watermarks: str  # JSON: highest price id read, per partition ("main" or schema)
+    rows: int = Field(sa_type=BigInteger)  # price rows across partitions at that point
@@ -4,17 +4,16 @@ from pathlib import Path
 
 import pandas as pd
 
-from ..analytics.data_access import load_prices_df
+from ..analytics.data_access import latest_price_date, load_latest_df
+from ..db import CardKey
 
 KEYS = ["name", "set_code", "number"]
 
 
-def _latest_by_keys(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
-    """Return the latest row per key-group based on the 'date' column."""
-    if df.empty:
-        return df.copy()
-    work = df.sort_values("date").drop_duplicates(keys, keep="last")
-    return work.reset_index(drop=True)
+def _card_keys(df: pd.DataFrame) -> list[CardKey]:
+    """The (name, set_code, number) rows of `df` that can name a card."""
+    rows = df[KEYS].itertuples(index=False, name=None)
+    return [r for r in rows if all(isinstance(v, str) for v in r)]
 
 
 def watchlist_latest_prices(watchlist_csv: Path) -> pd.DataFrame:
@@ -29,11 +28,10 @@ def watchlist_latest_prices(watchlist_csv: Path) -> pd.DataFrame:
         if col not in wl.columns:
             raise ValueError(f"watchlist missing column: {col}")
 
-    prices = load_prices_df()
-    if prices.empty:
+    latest = load_latest_df(keys=_card_keys(wl))
+    if latest.empty and latest_price_date() is None:
         return pd.DataFrame(columns=["card_id", *KEYS, "source", "price", "date"])
 
-    latest = _latest_by_keys(prices, KEYS)
     out = wl.merge(latest, on=KEYS, how="left")
     cols = ["card_id", *KEYS, "source", "price", "date"]
     for c in cols:
@@ -59,8 +57,8 @@ def portfolio_valuation(holdings_csv: Path) -> pd.DataFrame:
     hold["qty"] = pd.to_numeric(hold["qty"], errors="coerce").fillna(0.0)
     hold["cost_per_unit"] = pd.to_numeric(hold["cost_per_unit"], errors="coerce").fillna(0.0)
 
-    prices = load_prices_df()
-    if prices.empty:
+    latest = load_latest_df(keys=_card_keys(hold))
+    if latest.empty and latest_price_date() is None:
         return pd.DataFrame(
             columns=[
                 *KEYS,
@@ -74,7 +72,6 @@ def portfolio_valuation(holdings_csv: Path) -> pd.DataFrame:
             ]
         )
 
-    latest = _latest_by_keys(prices, KEYS)
     joined = hold.merge(latest, on=KEYS, how="left")
 
     joined["price"] = pd.to_numeric(joined.get("price"), errors="coerce")
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 from typing import Final
 
+import numpy as np
 import pandas as pd
 
+from ..analytics.panel import PricePanel, returns, rolling, shift
+
 C_ID: Final[str] = "card_id"
 DATE: Final[str] = "date"
 PRICE: Final[str] = "price"
@@ -17,74 +20,63 @@ def _to_ts(s: str | None) -> pd.Timestamp | None:
 
 
 def scan_anomalies_df(
-    df: pd.DataFrame,
+    df: pd.DataFrame | PricePanel,
     *,
     ret_threshold: float = 0.10,
     lookback: int = 30,
     on_date: str | None = None,
 ) -> pd.DataFrame:
     """
-    Detects anomalies for the selected day:
-      - |1d return| >= ret_threshold
-      - new high / new low versus prior `lookback` days
+    Detects anomalies for the selected day, per card and source:
+      - |1d return| >= ret_threshold (against the source's previous price)
+      - new high / new low versus the source's prices over the prior `lookback` days
+    `df` may also be the `PricePanel` of the price frame.
     Returns columns: card_id, name, set_code, number, source, price, return_1d, flag, date
     """
-    required = {C_ID, "name", "set_code", "number", "source", PRICE, DATE}
-    if df.empty or not required.issubset(df.columns):
-        return pd.DataFrame(
-            columns=[
-                "card_id",
-                "name",
-                "set_code",
-                "number",
-                "source",
-                "price",
-                "return_1d",
-                "flag",
-                "date",
-            ]
-        )
-
-    work = df.copy()
-    work[DATE] = pd.to_datetime(work[DATE])
-    work = work.sort_values([C_ID, DATE], kind="stable")
-
-    # 1‑day return
-    work[RET] = work.groupby(C_ID)[PRICE].pct_change()
-
-    # rolling extremes (shift(1) so "today" doesn’t compare to itself)
-    roll_max = (
-        work.groupby(C_ID)[PRICE]
-        .transform(lambda s: s.rolling(lookback, min_periods=1).max())
-        .shift(1)
+    empty = pd.DataFrame(
+        columns=[
+            "card_id",
+            "name",
+            "set_code",
+            "number",
+            "source",
+            "price",
+            "return_1d",
+            "flag",
+            "date",
+        ]
     )
-    roll_min = (
-        work.groupby(C_ID)[PRICE]
-        .transform(lambda s: s.rolling(lookback, min_periods=1).min())
-        .shift(1)
-    )
-    work["new_high"] = work[PRICE] > roll_max
-    work["new_low"] = work[PRICE] < roll_min
+    required = {C_ID, "name", "set_code", "number", "source", PRICE, DATE}
+    if isinstance(df, PricePanel):
+        panel = df
+    elif df.empty or not required.issubset(df.columns):
+        return empty
+    else:
+        panel = PricePanel.from_frame(df)
 
     # pick the day (default latest)
-    day = _to_ts(on_date) or work[DATE].max()
-    today = work[work[DATE] == day].copy()
+    day = panel.day_index(_to_ts(on_date) or panel.dates[-1]) if len(panel.dates) else None
+    if day is None:
+        return empty
+
+    def on_day(layer: np.ndarray) -> dict[str, np.ndarray]:
+        price = layer[:, -1]
+        # extremes of the prior days (shift(1) so "today" doesn’t compare to itself)
+        recent = layer[:, -(lookback + 1) :]
+        prior_max = shift(rolling(recent, lookback, "max"), 1)[:, -1]
+        prior_min = shift(rolling(recent, lookback, "min"), 1)[:, -1]
+        return {
+            PRICE: price,
+            RET: returns(layer)[:, -1],
+            "new_high": price > prior_max,
+            "new_low": price < prior_min,
+        }
+
+    today = panel.source_frame(day, on_day)
     today = today.dropna(subset=[RET])  # need prior day to compute return
 
     if today.empty:
-        return pd.DataFrame(
-            columns=[
-                "card_id",
-                "name",
-                "set_code",
-                "number",
-                "source",
-                "price",
-                "return_1d",
-                "flag",
-                "date",
-            ]
-        )
+        return empty
 
     spike = today[RET].abs() >= ret_threshold
     flags = []
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from ..analytics.data_access import load_prices_df
+from ..analytics.data_access import latest_price_date, load_prices_df
 from ..analytics.movers import compute_top_movers
 from ..catalog.stats import catalog_summary_df
 
@@ -12,7 +12,8 @@ def write_daily_reports(out_dir: Path, k: int = 5, on_date: str | None = None) -
     Produce a small daily bundle of CSV files into out_dir:
       - catalog_summary.csv
       - top_movers.csv
-      - latest_prices.csv (if data available)
+      - latest_prices.csv (if data available): one row per card and source priced on
+        the most recent date of all, ordered by card_id
     Returns the list of written paths.
     """
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -30,21 +31,11 @@ def write_daily_reports(out_dir: Path, k: int = 5, on_date: str | None = None) -
 
     written: list[Path] = [summary_path, movers_path]
 
-    # 3) Latest prices snapshot
-    if not prices_df.empty and "date" in prices_df.columns:
-        latest_date = prices_df["date"].max()
-        latest = prices_df.loc[
-            prices_df["date"] == latest_date,
-            [
-                "card_id",
-                "name",
-                "set_code",
-                "number",
-                "source",
-                "price",
-                "date",
-            ],
-        ].copy()
+    # 3) Latest prices snapshot: every (card, source) price on the most recent date
+    day = latest_price_date()
+    if day is not None:
+        latest = load_prices_df(day, day)
+        latest = latest[["card_id", "name", "set_code", "number", "source", "price", "date"]]
         latest_path = out_dir / "latest_prices.csv"
         latest.to_csv(latest_path, index=False)
         written.append(latest_path)
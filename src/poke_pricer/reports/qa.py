@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from pathlib import Path
 
 import pandas as pd
 
-from ..analytics.data_access import load_prices_df
+from ..analytics.data_access import iter_prices
 from ..catalog.stats import catalog_summary_df
 
 
@@ -20,7 +21,7 @@ def _duplicates_df(df: pd.DataFrame) -> pd.DataFrame:
         cols = ["card_id", "name", "set_code", "number", "source", "date", "count"]
         return pd.DataFrame(columns=cols)
 
-    counts = dup.groupby(key).size().reset_index(name="count")
+    counts = dup.groupby(key, observed=True).size().reset_index(name="count")
     meta_cols = ["card_id", "name", "set_code", "number", "source", "date"]
     meta = dup.loc[:, meta_cols].drop_duplicates(subset=key).copy()
     merged = counts.merge(meta, on=key, how="left")
@@ -28,8 +29,22 @@ def _duplicates_df(df: pd.DataFrame) -> pd.DataFrame:
     return merged.loc[:, out_cols]
 
 
-def _stale_cards_df(df: pd.DataFrame, days: int) -> pd.DataFrame:
-    """Cards with no prices within the last N days of the dataset."""
+def _last_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Each card's most recent price row."""
+    return df.sort_values(["card_id", "date"], kind="stable").drop_duplicates(
+        "card_id", keep="last"
+    )
+
+
+def _stale_cards_df(df: pd.DataFrame | Iterable[pd.DataFrame], days: int) -> pd.DataFrame:
+    """Cards with no prices within the last N days of the dataset.
+
+    `df` may also be chunks of prices (`iter_prices`); only each chunk's latest row
+    per card is kept while reading them.
+    """
+    if not isinstance(df, pd.DataFrame):
+        lasts = [_last_rows(chunk) for chunk in df if not chunk.empty]
+        df = pd.concat(lasts, ignore_index=True) if lasts else pd.DataFrame()
     if df.empty or not {"card_id", "date"}.issubset(df.columns):
         cols = ["card_id", "name", "set_code", "number", "last_date", "age_days"]
         return pd.DataFrame(columns=cols)
@@ -56,10 +71,17 @@ def write_qa_bundle(out_dir: Path, stale_days: int = 30) -> list[Path]:
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
 
-    prices = load_prices_df()
+    # One pass over the prices, a chunk of whole cards at a time: duplicates are found
+    # within a card, and only the latest row per card is kept for staleness.
+    dup_parts: list[pd.DataFrame] = []
+    last_parts: list[pd.DataFrame] = []
+    for chunk in iter_prices():
+        dup_parts.append(_duplicates_df(chunk))
+        last_parts.append(_last_rows(chunk))
+    found = [d for d in dup_parts if not d.empty]
+    dups = pd.concat(found, ignore_index=True) if found else _duplicates_df(pd.DataFrame())
+    stale = _stale_cards_df(last_parts, days=stale_days)
     summary = catalog_summary_df()
-    dups = _duplicates_df(prices)
-    stale = _stale_cards_df(prices, days=stale_days)
 
     p_summary = out / "qa_summary.csv"
     p_dups = out / "qa_duplicates.csv"
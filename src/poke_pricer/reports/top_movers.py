@@ -2,8 +2,12 @@ from __future__ import annotations
 
 from typing import Final
 
+import numpy as np
 import pandas as pd
 
+from ..analytics.panel import PricePanel
+from ..analytics.signals import signal_arrays
+
 _COLUMNS: Final[list[str]] = [
     "window_days",
     "rank",
@@ -18,45 +22,48 @@ _COLUMNS: Final[list[str]] = [
 
 
 def compute_top_movers(
-    df: pd.DataFrame,
+    df: pd.DataFrame | PricePanel,
     window_days: int = 14,
     top_k: int = 10,
 ) -> pd.DataFrame:
     """
     Given a DataFrame with columns:
       card_id,name,set_code,number,date,source,price
-    compute per-card returns over `window_days`, pick the latest row per card,
-    and return the top `top_k` by return.
+    (or its `PricePanel`), compute each card's return over `window_days` calendar days
+    up to its latest price: on that date, the source whose name sorts first, against
+    that source's last price observed `window_days` days before. Return the top `top_k`
+    by return.
 
     Returns a DataFrame with columns in _COLUMNS.
     """
-    if df.empty:
+    panel = PricePanel.of(df)
+    card, source, day, price = panel.source_observations()
+    if not len(card):
         return pd.DataFrame(columns=_COLUMNS)
 
-    # Ensure datetime
-    if not pd.api.types.is_datetime64_any_dtype(df["date"]):
-        df = df.assign(date=pd.to_datetime(df["date"]))
-
-    # Stable sort then rolling % change
-    df = df.sort_values(["card_id", "date"], kind="stable").copy()
-    df["ret_window"] = df.groupby("card_id")["price"].pct_change(periods=window_days)
-
-    # Latest row per card, drop cards without the lookback
-    last_idx = df.groupby("card_id")["date"].idxmax()
-    latest = (
-        df.loc[last_idx]
-        .dropna(subset=["ret_window"])
-        .sort_values("ret_window", ascending=False, kind="stable")
+    # Returns per (card, source) series, then each card's latest price; drop cards
+    # without the lookback
+    series = card * max(len(panel.sources), 1) + source
+    signals, _ = signal_arrays(series, day, price, [window_days])
+    order = np.lexsort((source, -day, card))
+    last = order[np.r_[True, card[order][1:] != card[order][:-1]]]
+    latest = pd.DataFrame(
+        {
+            "card_id": panel.card_ids[card[last]],
+            **{c: panel.cards[c].to_numpy()[card[last]] for c in ("name", "set_code", "number")},
+            "last_date": panel.dates[day[last]],
+            "last_price": price[last],
+            "ret_window": signals[f"mom_{window_days}"][last],
+        }
+    )
+    latest = latest.dropna(subset=["ret_window"]).sort_values(
+        "ret_window", ascending=False, kind="stable"
     )
 
     if top_k > 0:
         latest = latest.head(top_k)
 
-    out = latest[["card_id", "name", "set_code", "number", "date", "price", "ret_window"]].rename(
-        columns={"date": "last_date", "price": "last_price"}
-    )
-
-    out = out.reset_index(drop=True)
+    out = latest.reset_index(drop=True)
     out.insert(0, "rank", range(1, len(out) + 1))
     out.insert(0, "window_days", window_days)
 
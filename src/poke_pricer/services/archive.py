@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from ..db import (
+    MAX_ARCHIVES,
+    archive_files,
+    archive_path,
+    attached_archives,
+    dispose_engines,
+    get_engine,
+    init_db,
+    price_table,
+)
+from ..models import day_number
+from .optimize import covering_indexes, create_covering_indexes
+
+_COLUMNS = "id, card_id, date, source, price"
+
+
+class ArchivedYear(NamedTuple):
+    year: int
+    path: Path  # the year's archive file
+    rows: int  # price rows moved out of the main database
+
+
+def archive_prices(before: int, engine: Engine | None = None) -> list[ArchivedYear]:
+    """Move price rows dated before 1 January `before` out of the main database into one
+    archive file per year (created and attached as needed).
+
+    Each year is one transaction: its rows are copied into the archive, skipping any
+    already there, then deleted from the main table, so an interrupted run can simply be
+    repeated. Row ids, card_latest and every read through the partition router are
+    unaffected; later ingests for an archived year are written to its archive. Each
+    archive gets the covering indexes `db optimize` gave the main table.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name != "sqlite":
+        raise ValueError(f"db archive supports SQLite only (got {engine.dialect.name})")
+    init_db(engine)
+    db_path = Path(str(engine.url.database))
+    main = price_table()
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT CAST(strftime('%Y', date * 86400, 'unixepoch') AS INTEGER), COUNT(*) "
+                f"FROM main.{main.name} WHERE date < :cutoff GROUP BY 1"
+            ),
+            {"cutoff": day_number(date(before, 1, 1))},
+        )
+        years = {int(year): int(n) for year, n in rows}
+    existing = archive_files(db_path)
+    if len(existing.keys() | years.keys()) > MAX_ARCHIVES:
+        raise ValueError(
+            f"SQLite attaches at most {MAX_ARCHIVES} archives; "
+            f"{len(existing)} exist and {sorted(years)} would be archived"
+        )
+
+    archived: list[ArchivedYear] = []
+    with engine.connect() as conn:
+        attached = attached_archives(conn)
+        indexes = covering_indexes(conn)
+        for year, n in sorted(years.items()):
+            path = archive_path(db_path, year)
+            schema = attached.get(year)
+            if schema is None:
+                schema = f"archive_{year}"
+                conn.exec_driver_sql(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+            price_table(schema).create(conn, checkfirst=True)
+            conn.commit()
+            span = {"lo": day_number(date(year, 1, 1)), "hi": day_number(date(year, 12, 31))}
+            conn.execute(
+                text(
+                    f"INSERT INTO {schema}.{main.name} ({_COLUMNS}) "
+                    f"SELECT {_COLUMNS} FROM main.{main.name} WHERE date BETWEEN :lo AND :hi "
+                    "ON CONFLICT DO NOTHING"
+                ),
+                span,
+            )
+            conn.execute(text(f"DELETE FROM main.{main.name} WHERE date BETWEEN :lo AND :hi"), span)
+            create_covering_indexes(conn, schema, indexes)  # built once the rows are in
+            conn.commit()
+            archived.append(ArchivedYear(year, path, n))
+    # Pooled connections attach the archives that existed when they were opened.
+    dispose_engines(db_path)
+    return archived
+
+
+__all__ = ["ArchivedYear", "archive_prices"]
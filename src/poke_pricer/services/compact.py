@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from ..db import get_engine, init_db, is_text_layout
+from ..models import PricePoint
+
+# Reads every price row from the table b-tree (NOT INDEXED: no index can stand in).
+_SCAN_SQL = (
+    f"SELECT COUNT(*), MAX(date), MAX(source), SUM(price) FROM {PricePoint.__tablename__} "
+    "NOT INDEXED"
+)
+
+
+class CompactResult(NamedTuple):
+    converted: bool  # False: the database was already in the compact layout
+    rows: int  # price rows
+    size_before: int  # database file bytes
+    size_after: int
+    scan_before: float  # seconds for a full scan of the price table (best of 3)
+    scan_after: float
+
+
+def _file_size(engine: Engine) -> int:
+    """Bytes on disk after checkpointing the WAL into the main file."""
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    path = Path(str(engine.url.database))
+    return sum(p.stat().st_size for p in (path, Path(f"{path}-wal")) if p.exists())
+
+
+def _full_scan(engine: Engine, runs: int = 3) -> tuple[int, float]:
+    """(rows, best time of `runs` scans): the first run also pays for reading the file in."""
+    best = float("inf")
+    with engine.connect() as conn:
+        for _ in range(runs):
+            started = time.perf_counter()
+            rows = int(conn.execute(text(_SCAN_SQL)).one()[0])
+            best = min(best, time.perf_counter() - started)
+    return rows, best
+
+
+def compact_db(engine: Engine | None = None) -> CompactResult:
+    """Convert a text-layout database to compact storage in place, then VACUUM it.
+
+    Compact storage keeps price dates as integer day numbers and sources as ids of the
+    `source` table. Any command converts an old database the first time it opens it
+    (`db.init_db`); this converts it explicitly and measures file size and a full price
+    scan around it. Already compact: only the VACUUM runs.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name != "sqlite":
+        raise ValueError(f"db compact supports SQLite only (got {engine.dialect.name})")
+    tables = set(inspect(engine).get_table_names())
+    converted = is_text_layout(tables)
+    if PricePoint.__tablename__ not in tables:
+        init_db(engine)  # a new database: nothing to convert, but something to scan
+    size_before = _file_size(engine)
+    _, scan_before = _full_scan(engine)
+    init_db(engine)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    size_after = _file_size(engine)
+    rows, scan_after = _full_scan(engine)
+    return CompactResult(converted, rows, size_before, size_after, scan_before, scan_after)
+
+
+__all__ = ["CompactResult", "compact_db"]
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import lzma
+from collections.abc import Iterable, Iterator
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+
+from ..db import (
+    copy_rows,
+    get_engine,
+    get_session,
+    init_db,
+    rebuild_card_latest,
+    source_ids,
+)
+from ..ingest.columnar import input_format
+from ..models import Card, PricePoint
+
+# Cards simulated (and written) per chunk; fixed so a seed always yields the same market.
+_CHUNK_CARDS = 1000
+
+_SET_SIZE = 150
+# Share of sets already released when the history starts; the rest appear mid-history.
+_INITIAL_SETS = 0.6
+
+# (rarity, typical price, weight)
+_RARITIES = (
+    ("Common", 0.25, 0.40),
+    ("Uncommon", 0.5, 0.25),
+    ("Rare", 2.0, 0.15),
+    ("Holo Rare", 8.0, 0.10),
+    ("Ultra Rare", 30.0, 0.07),
+    ("Secret Rare", 90.0, 0.03),
+)
+_SPECIES = (
+    "Bulbasaur Charmander Squirtle Pikachu Eevee Jigglypuff Meowth Psyduck Growlithe "
+    "Machop Geodude Gastly Onix Cubone Lapras Snorlax Dratini Mewtwo Mew Chikorita "
+    "Cyndaquil Totodile Togepi Umbreon Espeon Scizor Lugia Ho-Oh Treecko Torchic Mudkip "
+    "Gardevoir Rayquaza Lucario Garchomp Zoroark Greninja Sylveon Rowlet Mimikyu"
+).split()
+_VARIANTS = ("", "", "", " ex", " V", " VMAX", " GX", " Holo")
+_SOURCES = ("tcgplayer", "ebay", "cardmarket", "pricecharting", "trollandtoad")
+
+_DAILY_DRIFT = (0.0001, 0.0006)  # per-card drift ~ N(mean, sd), log-price per day
+_DAILY_VOL = (0.005, 0.03)  # per-card volatility ~ U(low, high)
+_JUMP_PROB = 0.004  # per card-day
+_JUMP_SD = 0.15
+_RELEASE_HYPE = (0.0, 0.5)  # log premium of a new set's cards, decaying over ~30 days
+_SOURCE_COVERAGE = 0.75  # chance a secondary source quotes a card at all
+_OBSERVED = 0.9  # chance a quoting source has a price on a given day
+_OUTAGE = 0.01  # chance a source has no prices at all on a given day
+
+_PRICE_COLUMNS = ("card_id", "date", "source", "price")
+_TEXT_COMPRESSION = {"csv.gz": "gzip", "csv.bz2": "bz2"}
+_EPOCH = date(1970, 1, 1).toordinal()  # date32 counts days from here
+
+
+class MarketChunk(NamedTuple):
+    """Generated cards and their full price history, for `_CHUNK_CARDS` cards at a time.
+
+    `cards` has id, name, set_code, number, rarity; `prices` has card_id, date, source and
+    price, ordered by (card_id, date, source).
+    """
+
+    cards: pa.Table
+    prices: pa.Table
+
+
+def _source_names(n: int) -> list[str]:
+    names = list(_SOURCES[:n]) + [f"source{i + 1}" for i in range(len(_SOURCES), n)]
+    return sorted(names)
+
+
+def generate_market(
+    cards: int, days: int, sources: int = 3, seed: int = 42, *, end: date | None = None
+) -> Iterator[MarketChunk]:
+    """Simulate a card market; the same arguments always produce the same data.
+
+    Cards come in sets of ~150, most already released when the history (ending `end`,
+    default today) starts and the rest released along the way. Each card's log price is
+    a random walk with per-card drift and volatility, occasional jumps and a fading
+    premium after release. Each source quotes its own offset from that price, covers a
+    subset of the cards (the card's primary source always quotes it) and misses days,
+    both randomly and in source-wide outages.
+    """
+    if cards < 1 or days < 1 or sources < 1:
+        raise ValueError(f"cards, days and sources must be >= 1 (got {cards}, {days}, {sources})")
+    end = end or date.today()
+    start = end - timedelta(days=days - 1)
+    rng = np.random.default_rng(seed)
+
+    n_sets = -(-cards // _SET_SIZE)
+    set_of = np.arange(cards) // _SET_SIZE
+    set_sizes = np.bincount(set_of, minlength=n_sets)
+    initial = max(1, round(n_sets * _INITIAL_SETS))
+    release = np.zeros(n_sets, dtype=np.int64)
+    release[initial:] = np.sort(rng.integers(1, max(days, 2), n_sets - initial))
+    card_release = release[set_of]
+    hype = np.where(card_release > 0, rng.uniform(*_RELEASE_HYPE, cards), 0.0)
+
+    rarity = rng.choice(len(_RARITIES), cards, p=[w for *_, w in _RARITIES])
+    typical = np.array([p for _, p, _ in _RARITIES])[rarity]
+    log_p0 = np.log(typical) + rng.normal(0.0, 0.6, cards)
+    drift = rng.normal(*_DAILY_DRIFT, cards)
+    vol = rng.uniform(*_DAILY_VOL, cards)
+    species = rng.integers(0, len(_SPECIES), cards)
+    variant = rng.integers(0, len(_VARIANTS), cards)
+    primary = rng.integers(0, sources, cards)
+
+    source_names = _source_names(sources)
+    source_bias = rng.normal(0.0, 0.05, sources)
+    outage = rng.random((days, sources)) < _OUTAGE
+    first_day = start.toordinal()
+
+    for chunk_no, lo in enumerate(range(0, cards, _CHUNK_CARDS)):
+        hi = min(lo + _CHUNK_CARDS, cards)
+        n = hi - lo
+        crng = np.random.default_rng([seed, chunk_no])
+
+        steps = drift[lo:hi, None] + vol[lo:hi, None] * crng.standard_normal((n, days))
+        jumps = crng.random((n, days)) < _JUMP_PROB
+        steps[jumps] += crng.normal(0.0, _JUMP_SD, int(jumps.sum()))
+        age = np.arange(days) - card_release[lo:hi, None]
+        steps[age <= 0] = 0.0  # the walk starts on release day
+        log_p = log_p0[lo:hi, None] + np.cumsum(steps, axis=1)
+        log_p += hype[lo:hi, None] * np.exp(-np.maximum(age, 0) / 30.0)
+
+        covered = crng.random((n, sources)) < _SOURCE_COVERAGE
+        covered[np.arange(n), primary[lo:hi]] = True
+        quoted = crng.random((n, days, sources)) < _OBSERVED
+        quoted &= covered[:, None, :] & ~outage[None, :, :] & (age >= 0)[:, :, None]
+        offset = source_bias[None, :] + crng.normal(0.0, 0.03, (n, sources))
+
+        c, d, s = np.nonzero(quoted)  # (card, day, source) order
+        noise = crng.normal(0.0, 0.01, len(c))
+        price = np.maximum(np.round(np.exp(log_p[c, d] + offset[c, s] + noise), 2), 0.01)
+
+        ids = np.arange(lo + 1, hi + 1, dtype=np.int64)
+        sets = set_of[lo:hi]
+        numbers = np.arange(lo, hi) - sets * _SET_SIZE + 1
+        card_table = pa.table(
+            {
+                "id": ids,
+                "name": [
+                    _SPECIES[sp] + _VARIANTS[v]
+                    for sp, v in zip(species[lo:hi], variant[lo:hi], strict=True)
+                ],
+                "set_code": [f"GEN{k + 1:03d}" for k in sets],
+                "number": [f"{k}/{set_sizes[sk]}" for k, sk in zip(numbers, sets, strict=True)],
+                "rarity": [_RARITIES[r][0] for r in rarity[lo:hi]],
+            }
+        )
+        price_table = pa.table(
+            {
+                "card_id": ids[c],
+                "date": pa.array((d + first_day - _EPOCH).astype(np.int32), type=pa.date32()),
+                "source": pa.DictionaryArray.from_arrays(
+                    pa.array(s.astype(np.int32)), pa.array(source_names)
+                ),
+                "price": price,
+            }
+        )
+        yield MarketChunk(card_table, price_table)
+
+
+def write_market_db(chunks: Iterable[MarketChunk], engine: Engine | None = None) -> tuple[int, int]:
+    """Load a generated market into an empty database; returns (num_cards, num_prices).
+
+    Built for speed over durability: one transaction per chunk with synchronous=OFF, and
+    the secondary price indexes are dropped during the load and rebuilt at the end (rows
+    arrive in unique-key order, so the remaining index only ever appends). On PostgreSQL
+    prices are streamed in with COPY. card_latest is derived once, after the load.
+    """
+    engine = engine or get_engine()
+    init_db(engine)
+    with get_session(engine) as session:
+        if session.exec(select(Card.id).limit(1)).first() is not None:
+            raise ValueError("the database already has cards; generate into an empty one")
+
+    indexes = list(PricePoint.__table__.indexes)  # type: ignore[attr-defined]
+    sql = (
+        f"INSERT INTO {PricePoint.__tablename__} ({', '.join(_PRICE_COLUMNS)}) VALUES (?, ?, ?, ?)"
+    )
+    num_cards = num_prices = 0
+    sqlite = engine.dialect.name == "sqlite"
+    with engine.connect() as conn:
+        try:
+            if sqlite:
+                conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            for index in indexes:
+                index.drop(conn)
+            conn.commit()
+            for chunk in chunks:
+                conn.execute(insert(Card), chunk.cards.to_pylist())
+                p = chunk.prices
+                if p.num_rows:
+                    # Dates are already day numbers; sources map through their few names.
+                    source = p.column("source").combine_chunks()
+                    ids = source_ids(conn, source.dictionary.to_pylist())
+                    id_of = np.array([ids[n] for n in source.dictionary.to_pylist()])
+                    rows = zip(
+                        p.column("card_id").to_numpy().tolist(),
+                        p.column("date").cast(pa.int32()).to_numpy().tolist(),
+                        id_of[source.indices.to_numpy()].tolist(),
+                        p.column("price").to_numpy().tolist(),
+                        strict=True,
+                    )
+                    if sqlite:
+                        # sqlite3 consumes any iterable of rows: no list of tuples is built.
+                        cursor: Any = conn.connection.cursor()
+                        cursor.executemany(sql, rows)
+                    else:
+                        copy_rows(conn, str(PricePoint.__tablename__), _PRICE_COLUMNS, rows)
+                conn.commit()
+                num_cards += chunk.cards.num_rows
+                num_prices += p.num_rows
+            for index in indexes:
+                index.create(conn)
+            if not sqlite:
+                # Card ids were given explicitly: move the id sequence past them.
+                conn.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{Card.__tablename__}', 'id'), "
+                        f"(SELECT MAX(id) FROM {Card.__tablename__}))"
+                    )
+                )
+            conn.commit()
+        finally:
+            if sqlite:
+                # synchronous=OFF must not leak into the shared pool: discard this connection.
+                conn.invalidate()
+    rebuild_card_latest(engine)
+    return (num_cards, num_prices)
+
+
+def _ingest_table(chunk: MarketChunk) -> pa.Table:
+    """The chunk's prices with the ingest CSV columns."""
+    prices = chunk.prices
+    cards = chunk.cards
+    idx = pc.subtract(prices.column("card_id"), cards.column("id")[0])
+    return pa.table(
+        {
+            "name": cards.column("name").take(idx),
+            "set_code": cards.column("set_code").take(idx),
+            "number": cards.column("number").take(idx),
+            "date": prices.column("date"),
+            "price": prices.column("price"),
+            "source": prices.column("source").cast(pa.string()),
+            "rarity": cards.column("rarity").take(idx),
+        }
+    )
+
+
+def write_market_file(chunks: Iterable[MarketChunk], path: Path) -> tuple[int, int]:
+    """Write a generated market as one ingestable file; returns (num_cards, num_prices).
+
+    The format follows the file name, as for ingest (`columnar.input_format`): CSV
+    (optionally .gz/.bz2/.xz), Parquet (a row group per chunk) or Arrow IPC.
+    """
+    fmt = input_format(path)
+    if fmt is None:
+        raise ValueError(f"unsupported output file type: {path.name}")
+    num_cards = num_prices = 0
+    writer: Any = None
+    sink: Any = None
+    try:
+        for chunk in chunks:
+            table = _ingest_table(chunk)
+            if writer is None:
+                if fmt == "parquet":
+                    writer = pq.ParquetWriter(path, table.schema)
+                elif fmt == "arrow":
+                    writer = pa.ipc.new_file(str(path), table.schema)
+                else:
+                    if fmt == "csv.xz":
+                        sink = pa.PythonFile(lzma.open(path, "wb"), mode="w")
+                    else:
+                        sink = pa.output_stream(str(path), compression=_TEXT_COMPRESSION.get(fmt))
+                    writer = pa_csv.CSVWriter(sink, table.schema)
+            writer.write_table(table)
+            num_cards += chunk.cards.num_rows
+            num_prices += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+    return (num_cards, num_prices)
+
+
+__all__ = ["MarketChunk", "generate_market", "write_market_db", "write_market_file"]
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from ..db import attached_archives, get_engine, init_db
+from ..models import PricePoint
+
+_TABLE = PricePoint.__tablename__
+
+# Covering indexes for the read paths: every column the query needs is in the index, so
+# SQLite answers from the index b-tree alone, already in the requested order. Each
+# partition (the main database and every archive) gets its own.
+COVERING_INDEXES: dict[str, str] = {
+    # latest price per card, one card's history by date
+    "ix_price_card_date_cover": "(card_id, date DESC, price, source)",
+    # all prices on one date
+    "ix_price_date_card_cover": "(date, card_id, price)",
+}
+
+# The canonical queries (bound to an existing card and the latest date when explained).
+CANONICAL_QUERIES: dict[str, str] = {
+    "latest price per card": (
+        f"SELECT card_id, MAX(date) AS date, price, source FROM {_TABLE} GROUP BY card_id"
+    ),
+    "latest price of one card": (
+        f"SELECT date, price, source FROM {_TABLE} WHERE card_id = :card_id "
+        "ORDER BY date DESC LIMIT 1"
+    ),
+    "history of one card": (
+        f"SELECT date, price, source FROM {_TABLE} WHERE card_id = :card_id ORDER BY date"
+    ),
+    "prices on one date": f"SELECT card_id, price FROM {_TABLE} WHERE date = :date",
+}
+
+
+class OptimizeResult(NamedTuple):
+    created: list[str]  # index names that did not exist before ("schema.name" in archives)
+    before: dict[str, list[str]]  # query label -> EXPLAIN QUERY PLAN lines
+    after: dict[str, list[str]]
+
+
+def _params(conn: Connection) -> dict[str, Any]:
+    card_id, day = conn.execute(text(f"SELECT MIN(card_id), MAX(date) FROM {_TABLE}")).one()
+    return {"card_id": card_id or 1, "date": day or 0}  # dates are stored as day numbers
+
+
+def explain_queries(conn: Connection) -> dict[str, list[str]]:
+    """EXPLAIN QUERY PLAN of each canonical query, as indented lines."""
+    params = _params(conn)
+    plans: dict[str, list[str]] = {}
+    for label, sql in CANONICAL_QUERIES.items():
+        bound = {k: v for k, v in params.items() if f":{k}" in sql}
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), bound).all()
+        depth: dict[int, int] = {0: -1}
+        lines: list[str] = []
+        for node, parent, _, detail in rows:
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node] + str(detail))
+        plans[label] = lines
+    return plans
+
+
+def _existing_indexes(conn: Connection, schema: str = "main") -> set[str]:
+    rows = conn.execute(
+        text(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'index' AND tbl_name = :t"),
+        {"t": _TABLE},
+    )
+    return {name for (name,) in rows}
+
+
+def covering_indexes(conn: Connection, schema: str = "main") -> list[str]:
+    """The `COVERING_INDEXES` present on the price table of `schema` (the main database
+    or an attached archive)."""
+    existing = _existing_indexes(conn, schema)
+    return [name for name in COVERING_INDEXES if name in existing]
+
+
+def create_covering_indexes(
+    conn: Connection, schema: str = "main", names: Iterable[str] | None = None
+) -> list[str]:
+    """Create the covering indexes `names` (default: all of them) on the price table of
+    `schema` where missing; returns the names created."""
+    existing = _existing_indexes(conn, schema)
+    wanted = list(COVERING_INDEXES if names is None else names)
+    for name in wanted:
+        conn.execute(
+            text(f"CREATE INDEX IF NOT EXISTS {schema}.{name} ON {_TABLE} {COVERING_INDEXES[name]}")
+        )
+    return [name for name in wanted if name not in existing]
+
+
+def optimize_db(engine: Engine | None = None) -> OptimizeResult:
+    """Create the covering price indexes (if missing) on the main price table and on every
+    attached archive partition, and refresh planner statistics.
+
+    Idempotent and safe on a populated database: indexes are added with
+    `CREATE INDEX IF NOT EXISTS` in one transaction, existing ones are left alone, and
+    `ANALYZE` only rewrites the sqlite_stat tables. `db archive` gives new partitions the
+    covering indexes the main table has.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name != "sqlite":
+        raise ValueError(f"db optimize supports SQLite only (got {engine.dialect.name})")
+    init_db(engine)
+    with engine.begin() as conn:
+        before = explain_queries(conn)
+        created = create_covering_indexes(conn)
+        for schema in attached_archives(conn).values():
+            created += [f"{schema}.{name}" for name in create_covering_indexes(conn, schema)]
+        conn.execute(text("ANALYZE"))
+        after = explain_queries(conn)
+    return OptimizeResult(created, before, after)
+
+
+__all__ = [
+    "COVERING_INDEXES",
+    "CANONICAL_QUERIES",
+    "OptimizeResult",
+    "covering_indexes",
+    "create_covering_indexes",
+    "explain_queries",
+    "optimize_db",
+]
@@ -5,7 +5,7 @@ from random import Random
 
 from sqlmodel import Session, select
 
-from ..db import get_engine, init_db
+from ..db import get_engine, init_db, refresh_card_latest, source_ids
 from ..models import Card, PricePoint
 
 
@@ -42,6 +42,7 @@ def seed_demo(seed: int = 42) -> tuple[int, int]:
             assert c.id is not None
             seeded_cards.append(c)
 
+        demo = source_ids(session.connection(), ["demo"])["demo"]
         start = date.today() - timedelta(days=29)
         price_count = 0
         for c in seeded_cards:
@@ -53,11 +54,13 @@ def seed_demo(seed: int = 42) -> tuple[int, int]:
                 p = PricePoint(
                     card_id=c.id,
                     date=start + timedelta(days=i),
-                    source="demo",
+                    source=demo,
                     price=round(base * factor, 2),
                 )
                 session.add(p)
                 price_count += 1
 
+        session.flush()
+        refresh_card_latest(session, [c.id for c in seeded_cards if c.id is not None])
         session.commit()
         return (len(seeded_cards), price_count)
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Sequence
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, delete, insert, text
+from sqlalchemy import select as sa_select
+from sqlalchemy.engine import Connection
+from sqlmodel import col, select
+
+from ..analytics.data_access import (
+    PriceChanges,
+    iter_prices,
+    load_prices_df,
+    price_watermarks,
+    prices_since,
+)
+from ..analytics.panel import PricePanel
+from ..analytics.signals import DEFAULT_WINDOWS, signal_arrays
+from ..db import ID_BATCH, copy_rows, ensure_card_latest, get_engine, source_ids
+from ..models import Card, SignalState, SignalValue, Source, from_day_number
+
+_TABLE = SignalValue.__tablename__
+# Stored per (card, source, date, window), in this order; "window" is an SQL keyword.
+_COLUMNS = ("card_id", "source", "date", '"window"', "price", "ret", "sma", "mom", "price_total")
+_PRICE_FIELDS = ["card_id", "date", "source", "price"]
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+# Per card in :ids and source: the series' first stored date, and the date, price and
+# running total of its last stored row on or before :cutoff (NULL without one). Both are
+# index seeks.
+_OPENINGS_SQL = f"""
+SELECT c.id, src.id,
+       (SELECT MIN(f.date) FROM {_TABLE} f WHERE f.card_id = c.id AND f.source = src.id),
+       s.date, s.price, s.price_total
+FROM {Card.__tablename__} c CROSS JOIN {Source.__tablename__} src
+LEFT JOIN {_TABLE} s
+    ON s.card_id = c.id AND s.source = src.id AND s."window" = :window AND s.date = (
+        SELECT MAX(a.date) FROM {_TABLE} a
+        WHERE a.card_id = c.id AND a.source = src.id AND a.date <= :cutoff
+    )
+WHERE c.id IN :ids
+"""
+_OPENINGS = text(_OPENINGS_SQL).bindparams(bindparam("ids", expanding=True))
+_DELETE = text(f"DELETE FROM {_TABLE} WHERE card_id IN :ids AND date >= :start").bindparams(
+    bindparam("ids", expanding=True)
+)
+
+
+class SignalRun(NamedTuple):
+    full: bool  # rebuilt from every price (else: from the prices written since the last run)
+    windows: tuple[int, ...]
+    cards: int  # cards whose signals were written
+    rows: int  # signal_values rows written
+
+
+class _State(NamedTuple):
+    windows: tuple[int, ...]
+    watermarks: dict[str, int]
+    rows: int
+
+
+def _windows(windows: Iterable[int]) -> tuple[int, ...]:
+    out = tuple(sorted({int(w) for w in windows}))
+    if not out or out[0] < 1:
+        raise ValueError(f"windows must be at least 1 day (got {list(out)})")
+    return out
+
+
+def _read_state(conn: Connection) -> _State | None:
+    row = conn.execute(
+        select(SignalState.windows, SignalState.watermarks, SignalState.rows).where(
+            SignalState.id == 1
+        )
+    ).first()
+    if row is None:
+        return None
+    windows = tuple(int(w) for w in row[0].split(","))
+    return _State(windows, {k: int(v) for k, v in json.loads(row[1]).items()}, int(row[2]))
+
+
+def _save_state(conn: Connection, windows: tuple[int, ...], marks: PriceChanges) -> None:
+    conn.execute(delete(SignalState))
+    conn.execute(
+        insert(SignalState).values(
+            id=1,
+            windows=",".join(map(str, windows)),
+            watermarks=json.dumps(marks.watermarks),
+            rows=marks.total,
+        )
+    )
+
+
+def _observations(
+    conn: Connection, df: pd.DataFrame
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Card ids, source ids, day numbers and prices of a price frame's (card, source,
+    day) cells, grouped by card then source and in day order within each."""
+    panel = PricePanel.from_frame(df)
+    card, source, day, price = panel.source_observations()
+    ids = source_ids(conn, panel.sources)
+    source_id = np.array([ids[name] for name in panel.sources], dtype=np.int64)
+    start = panel.dates[:1].astype("datetime64[D]")
+    offset = int((start[0] - _EPOCH).astype(np.int64)) if len(start) else 0
+    return panel.card_ids[card].astype(np.int64), source_id[source], day + offset, price
+
+
+def _series(card_ids: np.ndarray, sources: np.ndarray) -> np.ndarray:
+    """Positions of the (card, source) series of rows grouped by card then source."""
+    new = (card_ids[1:] != card_ids[:-1]) | (sources[1:] != sources[:-1])
+    return np.r_[0, np.cumsum(new)] if len(card_ids) else card_ids
+
+
+def _stored(
+    card_ids: np.ndarray,
+    sources: np.ndarray,
+    days: np.ndarray,
+    price: np.ndarray,
+    signals: dict[str, np.ndarray],
+    total: np.ndarray,
+    windows: Sequence[int],
+) -> list[np.ndarray]:
+    """The `_COLUMNS` of observations and their signals: a row per window, in key order."""
+    k = len(windows)
+
+    def per_window(name: str) -> np.ndarray:
+        return np.column_stack([signals[f"{name}_{w}"] for w in windows]).ravel()
+
+    return [
+        np.repeat(card_ids, k),
+        np.repeat(sources, k),
+        np.repeat(days, k),
+        np.tile(np.asarray(windows), len(card_ids)),
+        np.repeat(price, k),
+        np.repeat(signals["ret"], k),
+        per_window("sma"),
+        per_window("mom"),
+        np.repeat(total, k),
+    ]
+
+
+def _nullable(values: np.ndarray) -> list[Any]:
+    """Python numbers, NaN as None (NULL)."""
+    out = values.astype(object)
+    if values.dtype.kind == "f":
+        out[np.isnan(values)] = None
+    numbers: list[Any] = out.tolist()
+    return numbers
+
+
+def _write(conn: Connection, columns: list[np.ndarray]) -> int:
+    """Insert signal_values rows; returns how many."""
+    n = len(columns[0])
+    if not n:
+        return 0
+    rows = zip(*(_nullable(c) for c in columns), strict=True)
+    if conn.dialect.name == "sqlite":
+        marks = ", ".join(["?"] * len(_COLUMNS))
+        sql = f"INSERT INTO {_TABLE} ({', '.join(_COLUMNS)}) VALUES ({marks})"
+        cursor: Any = conn.connection.cursor()
+        cursor.executemany(sql, rows)
+    else:
+        copy_rows(conn, _TABLE, _COLUMNS, rows)
+    return n
+
+
+def _rebuild(conn: Connection, windows: tuple[int, ...]) -> tuple[int, int]:
+    """Replace signal_values with the signals of every price; (cards, rows) written."""
+    conn.execute(text(f"DELETE FROM {_TABLE}"))
+    cards = rows = 0
+    # A chunk of whole cards at a time, as `signals compute` does.
+    for chunk in iter_prices(columns=_PRICE_FIELDS, dtypes="default"):
+        card_ids, sources, days, price = _observations(conn, chunk)
+        signals, total = signal_arrays(_series(card_ids, sources), days, price, windows)
+        rows += _write(conn, _stored(card_ids, sources, days, price, signals, total, windows))
+        cards += len(np.unique(card_ids))
+    return cards, rows
+
+
+def _continue(conn: Connection, ids: list[int], start: int, windows: tuple[int, ...]) -> int:
+    """Rewrite the signals of cards `ids` from day number `start` on; returns the rows
+    written.
+
+    Only the prices of the last max(windows) days before `start` and since are read,
+    plus the stored row on or before the first of those days of each of the cards'
+    (card, source) series (if any): it opens the series' running totals and stands in
+    for its earlier prices, so the rows come out as a full rebuild writes them.
+    """
+    cutoff = start - windows[-1]
+    first: dict[tuple[int, int], int] = {}
+    # card id, source id, day, price, running total
+    opening: list[tuple[int, int, int, float, float]] = []
+    for i in range(0, len(ids), ID_BATCH):
+        params = {"ids": ids[i : i + ID_BATCH], "window": windows[0], "cutoff": cutoff}
+        for card_id, source_id, first_day, day, price, total in conn.execute(_OPENINGS, params):
+            if first_day is not None:
+                first[card_id, source_id] = first_day
+            if day is not None:
+                opening.append((card_id, source_id, day, price, total))
+    df = load_prices_df(
+        from_day_number(cutoff + 1), card_ids=ids, columns=_PRICE_FIELDS, dtypes="default"
+    )
+    card_ids, sources, days, price = _observations(conn, df)
+    opened = np.array(opening, dtype=np.float64).reshape(-1, 5)
+    card_ids = np.r_[opened[:, 0].astype(np.int64), card_ids]
+    sources = np.r_[opened[:, 1].astype(np.int64), sources]
+    days = np.r_[opened[:, 2].astype(np.int64), days]
+    totals = np.r_[opened[:, 4], price]  # read at each series' first row: an opening total
+    price = np.r_[opened[:, 3], price]
+    order = np.lexsort((days, sources, card_ids))  # openings precede the series' prices
+    card_ids, sources = card_ids[order], sources[order]
+    days, price, totals = days[order], price[order], totals[order]
+    pos = _series(card_ids, sources)
+    heads = np.flatnonzero(np.r_[True, pos[1:] != pos[:-1]]) if len(pos) else pos
+    stored_first = np.array(
+        [first.get((int(card_ids[h]), int(sources[h])), start) for h in heads], dtype=np.int64
+    )
+    signals, total = signal_arrays(
+        pos,
+        days,
+        price,
+        windows,
+        first_day=np.minimum(stored_first[pos], days),  # read at each series' first row
+        opening_total=totals,
+    )
+    keep = days >= start
+    for i in range(0, len(ids), ID_BATCH):
+        conn.execute(_DELETE, {"ids": ids[i : i + ID_BATCH], "start": start})
+    columns = _stored(
+        card_ids[keep],
+        sources[keep],
+        days[keep],
+        price[keep],
+        {name: values[keep] for name, values in signals.items()},
+        total[keep],
+        windows,
+    )
+    return _write(conn, columns)
+
+
+def _update(conn: Connection, changes: PriceChanges, windows: tuple[int, ...]) -> tuple[int, int]:
+    """Rewrite the signals of the cards with new prices, each from its earliest new
+    date on; (cards, rows) written."""
+    card, day = changes.rows["card_id"], changes.rows["date"]
+    if not len(card):
+        return 0, 0
+    starts = np.flatnonzero(np.r_[True, card[1:] != card[:-1]])
+    touched, since = card[starts], np.minimum.reduceat(day, starts)
+    rows = 0
+    for start in np.unique(since):  # one pass per earliest new date (a nightly run: one)
+        rows += _continue(conn, touched[since == start].tolist(), int(start), windows)
+    return len(touched), rows
+
+
+def materialize_signals(windows: Iterable[int] | None = None, *, full: bool = False) -> SignalRun:
+    """Bring the signal_values table (`models.SignalValue`) up to date with the prices:
+    `compute_signals` for every card, source, observed date and window, stored.
+
+    Incrementally by default: only the cards with prices written since the last run are
+    touched, each from the earliest date among its new prices on, and only their prices
+    from max(windows) days before that are read (`_continue`). The table is rebuilt from
+    every price with `full`, on the first run, when `windows` (default: the stored ones,
+    else 7, 14 and 30 days) differ from the stored ones, and when prices may have moved
+    or gone since (`prices_since`, e.g. after `db archive`). Either way the table ends up
+    with exactly the same rows. One transaction.
+    """
+    engine = get_engine()
+    ensure_card_latest(engine)  # creates the tables
+    with engine.begin() as conn:
+        state = _read_state(conn)
+        if windows is None:
+            windows = DEFAULT_WINDOWS if state is None else state.windows
+        wanted = _windows(windows)
+        changes = None
+        if not full and state is not None and state.windows == wanted:
+            changes = prices_since(conn, state.watermarks, state.rows, ["card_id", "date"])
+        if changes is None:
+            marks = price_watermarks(conn)  # before reading: later rows are picked up next run
+            cards, rows = _rebuild(conn, wanted)
+        else:
+            marks = changes
+            cards, rows = _update(conn, changes, wanted)
+        _save_state(conn, wanted, marks)
+    return SignalRun(changes is None, wanted, cards, rows)
+
+
+def load_signal_values(card_ids: Iterable[int] | None = None) -> pd.DataFrame:
+    """signal_values as a frame: card_id, date (datetime64), source (its name), window,
+    price, ret, sma, mom, in (card_id, date, source, window) order, as `compute_signals`
+    orders its rows; optionally only the cards in `card_ids`."""
+    engine = get_engine()
+    ensure_card_latest(engine)
+    names = ["card_id", "date", "source", "window", "price", "ret", "sma", "mom"]
+    table = SignalValue.__table__  # type: ignore[attr-defined]
+    fields = [col(Source.name) if name == "source" else table.c[name] for name in names]
+    stmt = (
+        sa_select(*fields)
+        .join(Source, onclause=(table.c.source == Source.id))
+        .order_by(*fields[:4])
+    )
+    if card_ids is not None:
+        stmt = stmt.where(col(SignalValue.card_id).in_(list(card_ids)))
+    with engine.connect() as conn:
+        rows = conn.execute(stmt).all()
+    df = pd.DataFrame(rows, columns=names)
+    df["date"] = pd.to_datetime(df["date"])
+    for c in ("price", "ret", "sma", "mom"):
+        df[c] = df[c].astype(np.float64)
+    return df
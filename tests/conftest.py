@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from sqlmodel import SQLModel
+
+from poke_pricer.db import dispose_engines, get_engine
+
+# A throwaway PostgreSQL database for the backend-parametrized tests; every table in it
+# is dropped before and after each test. Unset: those tests run on SQLite only.
+POSTGRES_DSN_ENV = "POKEPRICER_TEST_POSTGRES_DSN"
+
+
+@pytest.fixture(autouse=True)
+def _sqlite_by_default(
+    monkeypatch: pytest.MonkeyPatch, tmp_path_factory: pytest.TempPathFactory
+) -> None:
+    """Keep a developer's POKEPRICER_POSTGRES_DSN (env or .env) away from the suite, and
+    price snapshots out of the working tree's data directory."""
+    monkeypatch.setenv("POKEPRICER_POSTGRES_DSN", "")
+    monkeypatch.setenv("POKEPRICER_DATA_DIR", str(tmp_path_factory.mktemp("data")))
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def backend(
+    request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[str]:
+    """Point `get_engine()` at an empty database of each backend."""
+    if request.param == "sqlite":
+        monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+        yield "sqlite"
+        return
+    dsn = os.environ.get(POSTGRES_DSN_ENV)
+    if not dsn:
+        pytest.skip(f"set {POSTGRES_DSN_ENV} to run against PostgreSQL")
+    monkeypatch.setenv("POKEPRICER_POSTGRES_DSN", dsn)
+    engine = get_engine()
+    SQLModel.metadata.drop_all(engine)
+    yield "postgres"
+    SQLModel.metadata.drop_all(engine)
+    dispose_engines()
@@ -16,6 +16,13 @@ def test_card_search_smoke() -> None:
     assert any("pik" in item["name"].lower() for item in data)
 
 
+def test_card_search_takes_a_regex() -> None:
+    r = client.get("/v1/cards/search", params={"q": "^PIKA|toise$"})
+    assert r.status_code == 200
+    names = {item["name"] for item in r.json()}
+    assert {"Pikachu", "Blastoise"} <= names and "Charizard" not in names
+
+
 def test_card_by_id_404() -> None:
     r = client.get("/v1/cards/999999")
     assert r.status_code == 404
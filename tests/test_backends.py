@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import csv
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from poke_pricer.analytics.data_access import load_prices_df
+from poke_pricer.api.app import app
+from poke_pricer.catalog.stats import catalog_summary_df
+from poke_pricer.db import get_engine
+from poke_pricer.ingest.csv_ingest import ingest_csv, ingest_dir_per_file
+from poke_pricer.io.csv_io import export_prices_csv
+from poke_pricer.services.market import generate_market, write_market_db, write_market_file
+from poke_pricer.services.signal_values import load_signal_values, materialize_signals
+
+END = date(2025, 1, 31)
+
+
+def _write(path: Path, rows: list[list[str]]) -> Path:
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "set_code", "number", "date", "price", "source"])
+        w.writerows(rows)
+    return path
+
+
+def test_ingest_merges_and_reads_back(backend: str, tmp_path: Path) -> None:
+    assert get_engine().dialect.name == ("postgresql" if backend == "postgres" else "sqlite")
+    market = tmp_path / "market.csv"
+    _, n_prices = write_market_file(generate_market(80, 15, 2, end=END), market)
+    assert ingest_csv(market, batch_size=500) == (80, n_prices, 0)
+    assert ingest_csv(market, batch_size=500) == (0, 0, n_prices)
+
+    # Duplicates inside one batch and points already stored are both skipped.
+    extra = _write(
+        tmp_path / "extra.csv",
+        [
+            ["Newcard", "NEW", "1/1", "2025-01-31", "5.00", "tcgplayer"],
+            ["Newcard", "NEW", "1/1", "2025-01-31", "6.00", "tcgplayer"],
+            ["Newcard", "NEW", "1/1", "2025-01-30", "4.50", "tcgplayer"],
+        ],
+    )
+    assert ingest_csv(extra) == (1, 2, 1)
+
+    df = load_prices_df()
+    assert len(df) == n_prices + 2
+    assert df["card_id"].is_monotonic_increasing
+    new = df[df["set_code"] == "NEW"]
+    assert new["price"].tolist() == [4.5, 5.0]
+
+    summary = catalog_summary_df().iloc[0]
+    assert summary["total_cards"] == 81 and summary["max_date"] == "2025-01-31"
+    assert export_prices_csv(tmp_path / "out.csv") == n_prices + 2
+
+    card_id = int(new["card_id"].iloc[0])
+    r = TestClient(app).get(f"/v1/cards/{card_id}/prices")
+    assert r.status_code == 200
+    assert [p["price"] for p in r.json()] == [5.0, 4.5]  # most recent first
+
+
+def test_generated_db_accepts_new_cards(backend: str, tmp_path: Path) -> None:
+    assert write_market_db(generate_market(30, 5, 2, end=END))[0] == 30
+    extra = _write(tmp_path / "a.csv", [["Newcard", "NEW", "1/1", "2025-01-31", "5.00", "x"]])
+    results = ingest_dir_per_file(tmp_path)
+    assert [(r.path.name, r.counts, r.status) for r in results] == [
+        ("a.csv", (1, 1, 0), "ingested")
+    ]
+    df = load_prices_df()
+    assert df.loc[df["set_code"] == "NEW", "card_id"].tolist() == [31]
+    assert ingest_dir_per_file(tmp_path)[0].status == "unchanged"
+    assert extra.exists()
+
+
+def test_signal_values_incremental_matches_full(backend: str, tmp_path: Path) -> None:
+    write_market_db(generate_market(30, 45, 2, end=END))
+    assert materialize_signals([3, 10]).full
+    extra = _write(
+        tmp_path / "b.csv",
+        [
+            ["Newcard", "NEW", "1/1", "2025-02-01", "5.00", "x"],
+            ["Newcard", "NEW", "1/1", "2025-02-03", "6.00", "x"],
+        ],
+    )
+    ingest_dir_per_file(extra.parent)
+    run = materialize_signals()
+    assert not run.full and (run.cards, run.rows) == (1, 4)
+    incremental = load_signal_values()
+    assert materialize_signals(full=True).full
+    pd.testing.assert_frame_equal(load_signal_values(), incremental, check_exact=True)
+    new = incremental[(incremental["source"] == "x") & (incremental["price"] == 6.0)]
+    assert new["sma"].fillna(0).tolist() == [5.5, 0.0]  # 3 days spanned, not 10
+    assert new["mom"].isna().all()  # nothing observed 3 days before
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from poke_pricer.bench import BenchResult, compare, load_results, run_benchmarks
+from poke_pricer.cli import app
+
+CASES = "load_prices_df,compute_signals,api.card_detail,ingest_csv"
+
+
+def test_run_and_compare(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "untouched.db"))
+    results = run_benchmarks(["tiny"], tmp_path / "data", repeat=1, only=CASES.split(","))
+    assert [r.name for r in results] == CASES.split(",")
+    assert all(r.seconds > 0 and r.peak_mb > 0 for r in results)
+    assert not (tmp_path / "untouched.db").exists()  # the code under test used the bench DB
+
+    base = [r._replace(seconds=r.seconds / 2) for r in results]
+    regressed = [c for c in compare(results, base, time_threshold=0.25) if c.regressed]
+    assert {c.name for c in regressed} <= set(CASES.split(","))
+    assert all(c.metric == "seconds" and c.ratio > 1.9 for c in regressed)
+    assert not any(c.regressed for c in compare(results, results))
+
+    with pytest.raises(ValueError, match="unknown case"):
+        run_benchmarks(["tiny"], tmp_path / "data", only=["nope"])
+
+
+def test_compare_ignores_timer_noise() -> None:
+    base = [BenchResult("tiny", "fast", 0.001, 0.001, 3, 1.0)]
+    now = [BenchResult("tiny", "fast", 0.003, 0.003, 3, 1.5)]
+    (t, m) = compare(now, base, time_threshold=0.25, memory_threshold=0.25)
+    assert (t.metric, t.regressed) == ("seconds", False)  # 3x, but only 2 ms slower
+    assert (m.metric, m.regressed) == ("peak_mb", True)
+
+
+def test_cli_bench_gates_on_baseline(tmp_path: Path) -> None:
+    runner = CliRunner()
+    out = tmp_path / "bench.json"
+    args = ["bench", "--scale", "tiny", "--only", "compute_signals", "--repeat", "1"]
+    args += ["--data-dir", str(tmp_path / "data"), "--out", str(out)]
+    res = runner.invoke(app, args)
+    assert res.exit_code == 0, res.stdout
+    (result,) = load_results(out)
+    assert result.name == "compute_signals"
+
+    payload = json.loads(out.read_text())
+    payload["results"][0]["seconds"] = result.seconds / 100
+    payload["results"][0]["peak_mb"] = result.peak_mb / 100
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(payload))
+    res = runner.invoke(app, [*args, "--baseline", str(baseline)])
+    assert res.exit_code == 1
+    assert "REGRESSION" in res.stdout
+
+    # Two real runs differ by timer noise only; generous thresholds keep this deterministic.
+    lenient = ["--time-threshold", "100", "--memory-threshold", "100"]
+    res = runner.invoke(app, [*args, "--baseline", str(out), *lenient])
+    assert res.exit_code == 0, res.stdout
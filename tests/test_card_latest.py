@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import csv
+import random
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from typer.testing import CliRunner
+
+from poke_pricer.analytics.data_access import load_latest_df, load_prices_df
+from poke_pricer.cli import app
+from poke_pricer.db import dispose_engines, get_engine, rebuild_card_latest
+from poke_pricer.ingest.csv_ingest import ingest_csv
+from poke_pricer.services.market import generate_market, write_market_file
+
+END = date(2025, 1, 31)
+
+
+def _card_latest() -> list[tuple[Any, ...]]:
+    with get_engine().connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT card_id, date, price, source, prev_date, prev_price, return_1d "
+                "FROM card_latest ORDER BY card_id"
+            )
+        )
+        return [tuple(r) for r in rows]
+
+
+def _shuffled_market(tmp_path: Path) -> Path:
+    """A generated market with rows in random order, so batches backfill and overlap."""
+    src = tmp_path / "market.csv"
+    write_market_file(generate_market(40, 20, 3, seed=5, end=END), src)
+    with src.open(newline="") as f:
+        header, *rows = list(csv.reader(f))
+    random.Random(1).shuffle(rows)
+    out = tmp_path / "shuffled.csv"
+    with out.open("w", newline="") as f:
+        csv.writer(f).writerows([header, *rows])
+    return out
+
+
+def _expected_from_history() -> pd.DataFrame:
+    """Per card: the last date, the source sorting first on it, and that source's date
+    before."""
+    df = load_prices_df().sort_values(["card_id", "date", "source"])
+    last = df.groupby("card_id")["date"].transform("max")
+    picked = df[df["date"] == last].groupby("card_id").first()
+    same = df.merge(picked["source"].reset_index(), on=["card_id", "source"])
+    earlier = same[same["date"] < same["card_id"].map(picked["date"])]
+    return pd.DataFrame(
+        {
+            "date": picked["date"],
+            "source": picked["source"],
+            "prev_date": earlier.groupby("card_id")["date"].max().reindex(picked.index),
+        }
+    )
+
+
+def test_ingest_keeps_card_latest_current(backend: str, tmp_path: Path) -> None:
+    path = _shuffled_market(tmp_path)
+    ingest_csv(path, batch_size=97)
+    incremental = _card_latest()
+    ingest_csv(path, batch_size=97)  # nothing new: unchanged
+    assert _card_latest() == incremental
+
+    assert rebuild_card_latest() == 40
+    assert _card_latest() == incremental
+
+    latest = load_latest_df().set_index("card_id")
+    expected = _expected_from_history()
+    pd.testing.assert_series_equal(latest["date"], expected["date"], check_names=False)
+    pd.testing.assert_series_equal(latest["source"], expected["source"], check_names=False)
+    pd.testing.assert_series_equal(latest["prev_date"], expected["prev_date"], check_names=False)
+    has_prev = latest["prev_price"].notna()
+    returns = latest["price"][has_prev] / latest["prev_price"][has_prev] - 1
+    pd.testing.assert_series_equal(latest["return_1d"][has_prev], returns, check_names=False)
+
+
+def test_row_by_row_path_and_rules(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "t.db"))
+    rows = [
+        ["Eevee", "SVI", "81", "2025-01-02", "11.00", "b"],
+        ["Eevee", "SVI", "81", "2025-01-02", "10.00", "a"],  # same date: first source name
+        ["Eevee", "SVI", "81", "2024-12-30", "8.00", "a"],  # backfill before the only date
+        ["Eevee", "SVI", "81", "2025-01-01", "9.00", "b"],  # another source: not the prev
+        ["Mew", "PRO", "8", "2025-01-01", "40.00", "a"],
+    ]
+    path = tmp_path / "p.csv"
+    with path.open("w", newline="") as f:
+        csv.writer(f).writerows([["name", "set_code", "number", "date", "price", "source"], *rows])
+    assert ingest_csv(path, bulk=False) == (2, 5, 0)
+
+    latest = load_latest_df().set_index("name")
+    assert latest.loc["Eevee", "price"] == 10.0 and latest.loc["Eevee", "source"] == "a"
+    assert latest.loc["Eevee", "prev_date"] == pd.Timestamp("2024-12-30")
+    assert latest.loc["Eevee", "return_1d"] == pytest.approx(10.0 / 8.0 - 1)
+    assert pd.isna(latest.loc["Mew", "prev_price"])
+
+    assert load_latest_df(name_pattern="EEV")["name"].tolist() == ["Eevee"]
+    assert load_latest_df(name_pattern="^m|vee$")["name"].tolist() == ["Eevee", "Mew"]
+    assert load_latest_df(name_pattern="%")["name"].tolist() == []
+    assert load_latest_df(latest_date_only=True)["name"].tolist() == ["Eevee"]
+
+
+def test_existing_database_is_backfilled(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    db = tmp_path / "old.db"
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(db))
+    ingest_csv(_shuffled_market(tmp_path))
+    expected = _card_latest()
+    with get_engine().begin() as conn:
+        conn.execute(text("DROP TABLE card_latest"))  # as before the table existed
+    dispose_engines(db)
+
+    assert len(load_latest_df()) == 40
+    assert _card_latest() == expected
+
+    res = CliRunner().invoke(app, ["db", "rebuild-latest"])
+    assert res.exit_code == 0, res.stdout
+    assert "40 cards" in res.stdout
+    assert _card_latest() == expected
@@ -5,7 +5,8 @@ import pytest  # third-party
 from poke_pricer.config import Settings  # first-party
 
 
-def test_settings_defaults() -> None:
+def test_settings_defaults(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("POKEPRICER_DATA_DIR")  # set by conftest
     s = Settings()
     assert s.log_level in {"INFO", "DEBUG", "WARNING", "ERROR", "CRITICAL"}
     assert str(s.data_dir) == "data"
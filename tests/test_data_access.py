@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import csv
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from poke_pricer.analytics.backtest import backtest_momentum_topk
+from poke_pricer.analytics.data_access import (
+    PRICE_COLUMNS,
+    iter_prices,
+    load_price_window,
+    load_prices_df,
+    price_memory_report,
+)
+from poke_pricer.analytics.movers import compute_top_movers
+from poke_pricer.analytics.signals import compute_signals, iter_signals
+from poke_pricer.db import init_db
+from poke_pricer.ingest.csv_ingest import ingest_csv
+from poke_pricer.reports import top_movers
+from poke_pricer.reports.anomalies import scan_anomalies_df
+from poke_pricer.reports.qa import _duplicates_df, _stale_cards_df
+from poke_pricer.services.archive import archive_prices
+from poke_pricer.services.market import generate_market, write_market_file
+
+ROWS = [
+    # Out of (card, date) order, with same-day prices from two sources inserted
+    # "zeta" first, so row ids and source ids disagree on the tie order.
+    ["Pikachu", "BASE", "58", "2024-03-02", "11.50", "zeta"],
+    ["Pikachu", "BASE", "58", "2024-03-02", "11.00", "alpha"],
+    ["Charizard", "BASE", "4", "2024-03-01", "300.00", "alpha"],
+    ["Pikachu", "BASE", "58", "2023-12-31", "10.00", "alpha"],
+    ["Charizard", "BASE", "4", "2023-06-01", "250.25", "zeta"],
+    ["Pikachu", "BASE", "58", "2024-03-01", "10.75", "zeta"],
+]
+
+
+@pytest.fixture(autouse=True, params=["snapshot", "sql"])
+def _price_reads(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Every test reads through the price snapshot and straight from SQL."""
+    monkeypatch.setenv("POKEPRICER_PRICE_SNAPSHOT", str(request.param == "snapshot"))
+
+
+def _expected(db: Path) -> pd.DataFrame:
+    """The loader's contract, straight from SQL: (card_id, date) order, ties by row id."""
+    with sqlite3.connect(db) as conn:
+        df = pd.read_sql(
+            "SELECT p.card_id, c.name, c.set_code, c.number, "
+            "date(p.date * 86400, 'unixepoch') AS date, s.name AS source, p.price "
+            "FROM pricepoint p JOIN card c ON c.id = p.card_id JOIN source s ON s.id = p.source "
+            "ORDER BY p.card_id, p.date, p.id",
+            conn,
+            parse_dates=["date"],
+        )
+    df["date"] = df["date"].astype("datetime64[ns]")
+    return df
+
+
+def test_load_prices_df_matches_sql_order_and_types(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db = tmp_path / "t.db"
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(db))
+    init_db()
+    empty = load_prices_df()
+    assert empty.empty and list(empty.columns) == PRICE_COLUMNS
+
+    src = tmp_path / "prices.csv"
+    with src.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "set_code", "number", "date", "price", "source"])
+        w.writerows(ROWS)
+    ingest_csv(src)
+    expected = _expected(db)
+    df = load_prices_df()
+    pd.testing.assert_frame_equal(df, expected)
+    pika = df[df["name"] == "Pikachu"]
+    assert pika["source"].tolist() == ["alpha", "zeta", "zeta", "alpha"]
+
+    window = load_prices_df(start=date(2024, 3, 1), end=date(2024, 3, 1))
+    assert window["price"].tolist() == [10.75, 300.0]
+
+    # Archived years are merged back into (card_id, date) order.
+    archive_prices(2024)
+    pd.testing.assert_frame_equal(load_prices_df(), expected)
+    recent = load_prices_df(start=date(2024, 1, 1))
+    assert recent["date"].min() == pd.Timestamp("2024-03-01") and len(recent) == 4
+
+
+def test_load_prices_df_pushes_filters_down(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db = tmp_path / "t.db"
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(db))
+    src = tmp_path / "prices.csv"
+    with src.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "set_code", "number", "date", "price", "source"])
+        w.writerows(ROWS)
+    ingest_csv(src)
+    full = load_prices_df()
+    pika = full[full["name"] == "Pikachu"].reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(load_prices_df(card_ids=[int(pika["card_id"][0])]), pika)
+    pd.testing.assert_frame_equal(load_prices_df(keys=[("Pikachu", "BASE", "58")]), pika)
+    assert load_prices_df(keys=[("Pikachu", "BASE", "99")]).empty
+    assert load_prices_df(card_ids=[1], keys=[("Charizard", "BASE", "4")]).empty
+    zeta = load_prices_df(sources=["zeta"], columns=["price", "date"])
+    assert list(zeta.columns) == ["price", "date"]
+    assert zeta["price"].tolist() == [10.75, 11.5, 250.25]
+    assert load_prices_df(sources=["nope"]).empty
+    with pytest.raises(ValueError, match="Unknown price columns: rarity"):
+        load_prices_df(columns=["price", "rarity"])
+
+    # A day plus lookback: defaults to the latest price date.
+    window = load_price_window(None, 1, columns=["card_id", "date"])
+    assert window["date"].astype(str).tolist() == [
+        "2024-03-01",
+        "2024-03-02",
+        "2024-03-02",
+        "2024-03-01",
+    ]
+
+
+def test_iter_prices_yields_whole_cards_in_order(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "t.db"))
+    market = tmp_path / "market.csv"
+    write_market_file(generate_market(12, 400, 2, end=date(2025, 1, 31)), market)
+    ingest_csv(market)
+    archive_prices(2025)  # chunks span the main table and the archives
+    full = load_prices_df()
+
+    chunks = list(iter_prices(chunk_rows=500))
+    assert len(chunks) > 1 and all(len(c) <= 800 for c in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full)
+    ids = [set(c["card_id"]) for c in chunks]
+    assert all(a.isdisjoint(b) for a, b in zip(ids, ids[1:], strict=False))
+
+    per_card = list(iter_prices(chunk_cards=5, chunk_rows=None, sources=["tcgplayer"]))
+    tcg = full[full["source"] == "tcgplayer"].reset_index(drop=True)
+    sizes = [c["card_id"].nunique() for c in per_card]
+    assert sizes[:-1] == [5] * (len(sizes) - 1) and sum(sizes) == tcg["card_id"].nunique()
+    pd.testing.assert_frame_equal(pd.concat(per_card, ignore_index=True), tcg)
+    window = list(iter_prices(date(2025, 1, 1), card_ids=[2, 3, 99], chunk_cards=1))
+    assert [c["card_id"].unique().tolist() for c in window] == [[2], [3]]
+    assert all((c["date"] >= "2025-01-01").all() for c in window)
+
+    # Per-card signals are the same computed chunk by chunk.
+    pd.testing.assert_frame_equal(
+        pd.concat(iter_signals(iter_prices(chunk_cards=3)), ignore_index=True),
+        compute_signals(full),
+    )
+    with pytest.raises(ValueError, match="chunk_rows must be at least 1"):
+        next(iter_prices(chunk_rows=0))
+
+
+def _plain(df: pd.DataFrame) -> pd.DataFrame:
+    """`df` with the default dtypes: object strings, int64 card ids."""
+    cats = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    df = df.astype({c: object for c in cats})
+    return df.astype({"card_id": "int64"}) if "card_id" in df.columns else df
+
+
+def test_compact_dtypes_feed_every_analytics_path(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "t.db"))
+    market = tmp_path / "market.csv"
+    write_market_file(generate_market(12, 120, 2, end=date(2025, 1, 31)), market)
+    ingest_csv(market)
+    full = load_prices_df()
+
+    compact = load_prices_df(dtypes="compact")
+    assert {c: str(t) for c, t in compact.dtypes.items()} == {
+        "card_id": "int32",
+        "name": "category",
+        "set_code": "category",
+        "number": "category",
+        "date": "datetime64[ns]",
+        "source": "category",
+        "price": "float64",
+    }
+    pd.testing.assert_frame_equal(_plain(compact), full)
+    assert list(compact["source"].cat.categories) == sorted(full["source"].unique())
+    chunks = [_plain(c) for c in iter_prices(chunk_cards=5, dtypes="compact")]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full)
+    f32 = load_prices_df(dtypes="compact_float32")
+    assert f32["price"].dtype == "float32"
+    pd.testing.assert_frame_equal(_plain(f32), full, check_dtype=False, rtol=1e-6)
+
+    # The setting applies wherever no dtypes are passed.
+    monkeypatch.setenv("POKEPRICER_PRICE_DTYPES", "compact")
+    assert load_price_window(None, 3)["name"].dtype == "category"
+    with pytest.raises(ValueError, match="Unknown price dtypes: tiny"):
+        load_prices_df(dtypes="tiny")  # type: ignore[arg-type]
+
+    same = pd.testing.assert_frame_equal
+    same(_plain(compute_signals(compact)), compute_signals(full))
+    same(backtest_momentum_topk(compact, top_k=2), backtest_momentum_topk(full, top_k=2))
+    same(_plain(compute_top_movers(compact, k=3)), compute_top_movers(full, k=3))
+    same(_plain(scan_anomalies_df(compact, lookback=7)), scan_anomalies_df(full, lookback=7))
+    same(_plain(top_movers.compute_top_movers(compact)), top_movers.compute_top_movers(full))
+    doubled = pd.concat([compact, compact.head(3)], ignore_index=True)
+    same(_plain(_duplicates_df(doubled)), _duplicates_df(pd.concat([full, full.head(3)])))
+    stale = _stale_cards_df(iter_prices(chunk_cards=4), 5)
+    same(_plain(stale), _stale_cards_df(full, 5))
+
+    report = price_memory_report()
+    assert list(report.columns) == ["default", "compact", "compact_float32"]
+    assert report.loc["price", "compact_float32"] * 2 == report.loc["price", "default"]
+    assert report.loc["total", "compact"] < report.loc["total", "default"] / 2
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import csv
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from typer.testing import CliRunner
+
+from poke_pricer.analytics.data_access import load_prices_df
+from poke_pricer.catalog.stats import catalog_summary_df
+from poke_pricer.cli import app
+from poke_pricer.db import get_engine, price_tables, rebuild_card_latest
+from poke_pricer.ingest.csv_ingest import ingest_csv
+from poke_pricer.io.csv_io import export_prices_csv
+from poke_pricer.services import archive
+from poke_pricer.services.market import generate_market, write_market_file
+
+END = date(2025, 1, 31)
+
+
+def _card_latest() -> list[tuple[Any, ...]]:
+    with get_engine().connect() as conn:
+        return [tuple(r) for r in conn.execute(text("SELECT * FROM card_latest ORDER BY card_id"))]
+
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(["card_id", "date", "source"]).reset_index(drop=True)
+
+
+def _write(path: Path, rows: list[list[str]]) -> Path:
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "set_code", "number", "date", "price", "source"])
+        w.writerows(rows)
+    return path
+
+
+def test_archive_moves_old_years_out_of_the_hot_table(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db = tmp_path / "hot.db"
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(db))
+    market = tmp_path / "market.csv"
+    _, n_prices = write_market_file(generate_market(30, 800, 2, end=END), market)
+    ingest_csv(market)
+    before = _sorted(load_prices_df())
+    latest = _card_latest()
+    summary = catalog_summary_df()
+
+    res = CliRunner().invoke(app, ["db", "archive", "--before", "2025"])
+    assert res.exit_code == 0, res.stdout
+    assert sorted(p.name for p in tmp_path.glob("hot.*.db")) == [
+        "hot.2022.db",
+        "hot.2023.db",
+        "hot.2024.db",
+    ]
+    with sqlite3.connect(db) as conn:  # the main file alone: only the hot year is left
+        (first,) = conn.execute("SELECT MIN(date) FROM pricepoint").fetchone()
+    assert first >= (date(2025, 1, 1) - date(1970, 1, 1)).days
+
+    # Reads go through every partition: nothing changes for callers.
+    pd.testing.assert_frame_equal(_sorted(load_prices_df()), before)
+    pd.testing.assert_frame_equal(catalog_summary_df(), summary)
+    assert _card_latest() == latest
+    assert rebuild_card_latest() == 30 and _card_latest() == latest
+    assert export_prices_csv(tmp_path / "out.csv") == n_prices
+
+    # A recent window is answered by the hot partition alone.
+    window = date(2025, 1, 1)
+    with get_engine().connect() as conn:
+        assert [t.schema for t in price_tables(conn, window)] == [None]
+        assert [t.schema for t in price_tables(conn, date(2024, 6, 1), date(2024, 7, 1))] == [
+            None,
+            "archive_2024",
+        ]
+    recent = load_prices_df(start=window)
+    pd.testing.assert_frame_equal(
+        _sorted(recent), before[before["date"] >= "2025-01-01"].reset_index(drop=True)
+    )
+
+    # Writes for an archived year go to its archive, deduplicated there.
+    assert ingest_csv(market) == (0, 0, n_prices)
+    oldie = [["Oldie", "OLD", "1", d, "2.00", "x"] for d in ("2023-05-01", "2023-05-03")]
+    assert ingest_csv(_write(tmp_path / "a.csv", oldie)) == (1, 2, 0)
+    late = [["Oldie", "OLD", "1", "2023-05-02", "3.00", "x"]]
+    assert ingest_csv(_write(tmp_path / "b.csv", late), bulk=False) == (0, 1, 0)
+    for path, n in ((tmp_path / "hot.2023.db", 3), (db, 0)):
+        with sqlite3.connect(path) as conn:
+            assert conn.execute(
+                "SELECT COUNT(*) FROM pricepoint WHERE card_id = 31"
+            ).fetchone() == (n,)
+    incremental = _card_latest()
+    oldie_row = next(r for r in incremental if r[0] == 31)
+    assert oldie_row[1] == (date(2023, 5, 3) - date(1970, 1, 1)).days
+    assert oldie_row[4] == (date(2023, 5, 2) - date(1970, 1, 1)).days
+    rebuild_card_latest()
+    assert _card_latest() == incremental
+
+    res = CliRunner().invoke(app, ["db", "archive", "--before", "2025"])
+    assert "No prices before 2025" in res.stdout
+
+
+def test_archive_respects_the_attach_limit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "hot.db"))
+    market = tmp_path / "market.csv"
+    write_market_file(generate_market(5, 800, 1, end=END), market)
+    ingest_csv(market)
+    monkeypatch.setattr(archive, "MAX_ARCHIVES", 2)
+    with pytest.raises(ValueError, match="at most 2 archives"):
+        archive.archive_prices(2025)
+    assert not list(tmp_path.glob("hot.*.db"))
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sqlalchemy import event, text
+from typer.testing import CliRunner
+
+from poke_pricer.analytics.data_access import load_latest_df, load_prices_df
+from poke_pricer.catalog.stats import catalog_summary_df
+from poke_pricer.cli import app
+from poke_pricer.db import dispose_engines, get_engine
+from poke_pricer.ingest.csv_ingest import ingest_csv
+from poke_pricer.services.compact import compact_db
+
+# The schema before compact storage: dates and sources as text in every row.
+_TEXT_LAYOUT = """
+CREATE TABLE card (
+    id INTEGER NOT NULL, name VARCHAR NOT NULL, set_code VARCHAR NOT NULL,
+    number VARCHAR NOT NULL, rarity VARCHAR, PRIMARY KEY (id),
+    CONSTRAINT uq_card_set_number UNIQUE (set_code, number)
+);
+CREATE TABLE pricepoint (
+    id INTEGER NOT NULL, card_id INTEGER NOT NULL, date DATE NOT NULL,
+    source VARCHAR NOT NULL, price FLOAT NOT NULL, PRIMARY KEY (id),
+    CONSTRAINT uq_price_card_date_source UNIQUE (card_id, date, source),
+    FOREIGN KEY(card_id) REFERENCES card (id)
+);
+CREATE INDEX ix_price_date ON pricepoint (date);
+CREATE INDEX ix_price_card_date_cover ON pricepoint (card_id, date DESC, price, source);
+"""
+
+
+def _text_layout_db(path: Path) -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript(_TEXT_LAYOUT)
+    conn.executemany(
+        "INSERT INTO card (id, name, set_code, number) VALUES (?, ?, ?, ?)",
+        [(c, f"Card {c}", "OLD", str(c)) for c in range(1, 21)],
+    )
+    conn.executemany(
+        "INSERT INTO pricepoint (card_id, date, source, price) VALUES (?, ?, ?, ?)",
+        [
+            (c, date(2024, 12, d).isoformat(), source, c + d / 100)
+            for c in range(1, 21)
+            for d in range(1, 32)
+            for source in ("tcgplayer", "ebay")
+            if (c + d) % 7 or source == "ebay"
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_compact_converts_text_layout_in_place(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db = tmp_path / "old.db"
+    _text_layout_db(db)
+    with sqlite3.connect(db) as conn:
+        expected = pd.read_sql(
+            "SELECT p.card_id, c.name, c.set_code, c.number, p.date, p.source, p.price "
+            "FROM pricepoint p JOIN card c ON c.id = p.card_id ORDER BY p.card_id, p.date, p.id",
+            conn,
+            parse_dates=["date"],
+        )
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(db))
+
+    result = compact_db()
+    assert result.converted and result.rows == len(expected)
+    assert result.size_after < result.size_before
+
+    # Same logical columns as before; stored as day numbers and source ids.
+    pd.testing.assert_frame_equal(load_prices_df(), expected)
+    with get_engine().connect() as conn:
+        sources = conn.execute(text("SELECT name FROM source ORDER BY id")).scalars().all()
+        types = conn.execute(text("SELECT typeof(date), typeof(source) FROM pricepoint")).first()
+    assert sources == ["ebay", "tcgplayer"]
+    assert types == ("integer", "integer")
+    summary = catalog_summary_df().iloc[0]
+    assert (summary["min_date"], summary["max_date"]) == ("2024-12-01", "2024-12-31")
+    assert summary["sources"] == "ebay,tcgplayer"
+    latest = load_latest_df()
+    assert len(latest) == 20 and (latest["date"] == pd.Timestamp("2024-12-31")).all()
+
+    res = CliRunner().invoke(app, ["db", "compact"])
+    assert res.exit_code == 0, res.stdout
+    assert "Already compact" in res.stdout and f"{len(expected)} price rows" in res.stdout
+
+
+def test_opening_a_text_layout_db_converts_it(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db = tmp_path / "old.db"
+    _text_layout_db(db)
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(db))
+    res = CliRunner().invoke(app, ["db", "init"])
+    assert res.exit_code == 0, res.stdout
+    df = load_prices_df()
+    assert df["source"].unique().tolist() == ["tcgplayer", "ebay"]
+    assert df["date"].min() == pd.Timestamp("2024-12-01")
+
+
+def test_first_read_converts_a_text_layout_db_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    db = tmp_path / "old.db"
+    _text_layout_db(db)
+    with sqlite3.connect(db) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM pricepoint").fetchone()[0]
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(db))
+    with caplog.at_level(logging.WARNING, logger="poke_pricer.db"):
+        latest = load_latest_df()
+    assert len(latest) == 20 and set(latest["source"]) <= {"tcgplayer", "ebay"}
+    assert [r.message.split(" ", 1)[0] for r in caplog.records] == ["converting", "converted"]
+    with sqlite3.connect(db) as conn:
+        types = conn.execute("SELECT typeof(date), typeof(source) FROM pricepoint").fetchone()
+    assert types == ("integer", "integer")
+
+    caplog.clear()
+    dispose_engines(db)  # a new process: nothing left to convert
+    with caplog.at_level(logging.WARNING, logger="poke_pricer.db"):
+        assert len(load_prices_df()) == rows
+    assert not caplog.records
+
+
+def test_reads_do_not_write(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    db = tmp_path / "t.db"
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(db))
+    csv_path = tmp_path / "p.csv"
+    csv_path.write_text("name,set_code,number,date,price,source\nEevee,SVI,81,2025-01-02,10.00,a\n")
+    ingest_csv(csv_path)
+    dispose_engines(db)  # a new process reading the database
+
+    statements: list[str] = []
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    assert len(load_prices_df()) == 1 and len(load_latest_df()) == 1
+    writes = ("INSERT", "UPDATE", "DELETE", "CREATE", "DROP", "ALTER")
+    assert not [sql for sql in statements if sql.lstrip().upper().startswith(writes)]
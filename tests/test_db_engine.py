@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from poke_pricer.api.app import app as api_app
+from poke_pricer.cli import app
+from poke_pricer.config import Settings
+from poke_pricer.db import dispose_engines, get_engine, pool_stats, read_pragmas
+
+
+def test_engine_is_shared_per_database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", "a.db")
+    engine = get_engine()
+    assert get_engine() is engine
+    assert get_engine(Settings(sqlite_path=tmp_path / "a.db")) is engine  # same resolved URL
+
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", "b.db")
+    other = get_engine()
+    assert other is not engine
+    monkeypatch.setenv("POKEPRICER_SQLITE_SYNCHRONOUS", "FULL")
+    assert get_engine() is not other  # a different connection profile
+
+    assert dispose_engines(tmp_path / "a.db") == 1
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", "a.db")
+    assert get_engine() is not engine
+
+
+def test_profile_is_applied_on_connect(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "p.db"))
+    assert read_pragmas() == {
+        "busy_timeout": "5000",
+        "journal_mode": "wal",
+        "synchronous": "1",  # NORMAL
+        "cache_size": "-64000",
+        "mmap_size": str(256 * 1024 * 1024),
+        "temp_store": "2",  # MEMORY
+    }
+
+    monkeypatch.setenv("POKEPRICER_SQLITE_JOURNAL_MODE", "DELETE")
+    monkeypatch.setenv("POKEPRICER_SQLITE_MMAP_SIZE", "0")
+    pragmas = read_pragmas()
+    assert pragmas["journal_mode"] == "delete"
+    assert pragmas["mmap_size"] == "0"
+
+    url = str(get_engine().url)
+    stats = [p for p in pool_stats() if p["url"] == url]
+    assert len(stats) == 2  # one engine per profile
+    assert all(p["checkedout"] == 0 and p["checkedin"] == 1 for p in stats)
+
+
+def test_db_info_cli_and_api(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "info.db"))
+    res = CliRunner().invoke(app, ["db", "info"])
+    assert res.exit_code == 0, res.stdout
+    assert "journal_mode = wal" in res.stdout
+    assert "checkedin=" in res.stdout
+
+    r = TestClient(api_app).get("/v1/meta/db")
+    assert r.status_code == 200
+    js = r.json()
+    assert js["url"].endswith("info.db")
+    assert js["pragmas"]["journal_mode"] == "wal"
+    assert any(p["url"] == js["url"] for p in js["pools"])
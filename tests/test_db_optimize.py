@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from typer.testing import CliRunner
+
+from poke_pricer.cli import app
+from poke_pricer.db import get_engine
+from poke_pricer.services.archive import archive_prices
+from poke_pricer.services.market import generate_market, write_market_db
+from poke_pricer.services.optimize import COVERING_INDEXES, covering_indexes, optimize_db
+
+
+def test_optimize_adds_covering_indexes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "opt.db"))
+    _, n_prices = write_market_db(generate_market(60, 20, 2, end=date(2025, 1, 31)))
+
+    result = optimize_db()
+    assert result.created == list(COVERING_INDEXES)
+    assert not any("COVERING" in line for lines in result.before.values() for line in lines)
+    for label, lines in result.after.items():
+        assert any("COVERING INDEX ix_price_" in line for line in lines), label
+
+    again = optimize_db()  # idempotent on a populated database
+    assert again.created == []
+    assert again.before == result.after
+    with get_engine().connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM pricepoint")).scalar() == n_prices
+        assert conn.execute(text("SELECT COUNT(*) FROM sqlite_stat1")).scalar()
+
+
+def test_optimize_indexes_every_partition(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    db = tmp_path / "opt.db"
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(db))
+    write_market_db(generate_market(20, 800, 1, end=date(2025, 1, 31)))
+    archive_prices(2024)  # 2022 and 2023, before any covering index
+
+    result = optimize_db()
+    assert result.created == [
+        *COVERING_INDEXES,
+        *(f"archive_{y}.{name}" for y in (2022, 2023) for name in COVERING_INDEXES),
+    ]
+    archive_prices(2025)  # 2024 is archived with the main table's indexes
+    assert optimize_db().created == []
+
+    for year in (2022, 2023, 2024):
+        with sqlite3.connect(tmp_path / f"opt.{year}.db") as conn:
+            rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            assert set(COVERING_INDEXES) <= {name for (name,) in rows}, year
+        with get_engine().connect() as conn:
+            assert covering_indexes(conn, f"archive_{year}") == list(COVERING_INDEXES)
+
+
+def test_cli_db_optimize(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "cli.db"))
+    runner = CliRunner()
+    res = runner.invoke(app, ["db", "optimize"])  # empty (even missing) database
+    assert res.exit_code == 0, res.stdout
+    assert "history of one card" in res.stdout
+    assert "ix_price_card_date_cover" in res.stdout
+    res = runner.invoke(app, ["db", "optimize"])
+    assert "none (already present)" in res.stdout
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from poke_pricer.analytics.data_access import load_prices_df
+from poke_pricer.analytics.frame_cache import FrameCache, frame_cache_stats
+from poke_pricer.catalog.stats import catalog_summary_df
+from poke_pricer.db import data_version, get_engine
+from poke_pricer.ingest.csv_ingest import ingest_csv
+
+
+def _frame(n: int) -> pd.DataFrame:
+    return pd.DataFrame({"card_id": range(n), "price": [float(i) for i in range(n)]})
+
+
+def test_lru_budget_versions_and_read_only_frames() -> None:
+    cache = FrameCache(budget=2 * 16 * 100)  # two 100-row frames
+    loads: list[str] = []
+
+    def get(key: str, version: int = 1, db: str = "a") -> pd.DataFrame:
+        def load() -> pd.DataFrame:
+            loads.append(key)
+            return _frame(100)
+
+        return cache.get(db, version, key, load)
+
+    get("x")
+    get("y")
+    get("x")  # hit; y is now the least recently used
+    get("z")  # over budget: evicts y
+    get("x")
+    get("y")
+    assert loads == ["x", "y", "z", "y"]
+    assert cache.stats()[:4] == (2, 4, 2, 2)
+
+    # A new data version drops that database's frames only.
+    get("q", db="b")
+    get("x", version=2)
+    assert loads[-2:] == ["q", "x"] and cache.stats().entries == 2
+    get("q", db="b")
+    assert loads[-1] == "x"
+
+    # Too big for the budget: served, never stored.
+    big = cache.get("a", 2, "big", lambda: _frame(1_000))
+    assert len(big) == 1_000 and cache.stats().entries == 2
+
+    # Each caller gets its own frame object over shared, read-only values.
+    df = get("x", version=2)
+    df["extra"] = 1
+    df = df.sort_values("price", ascending=False)
+    assert list(get("x", version=2).columns) == ["card_id", "price"]
+    assert not get("x", version=2)["price"].to_numpy().flags.writeable
+    assert get("x", version=2)["price"].iloc[0] == 0.0
+
+
+def test_price_frames_follow_the_data_version(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "t.db"))
+
+    def ingest(name: str, rows: list[list[str]]) -> None:
+        path = tmp_path / name
+        with path.open("w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["name", "set_code", "number", "date", "price", "source"])
+            w.writerows(rows)
+        ingest_csv(path)
+
+    ingest("a.csv", [["Pikachu", "BASE", "58", "2024-03-01", "10.00", "x"]])
+    version = data_version(get_engine())
+    before = frame_cache_stats()
+    first = load_prices_df()
+    assert load_prices_df()["price"].tolist() == [10.0]
+    assert load_prices_df(columns=["price"]).shape == (1, 1)  # another key: its own entry
+    after = frame_cache_stats()
+    assert (after.hits - before.hits, after.misses - before.misses) == (1, 2)
+    assert catalog_summary_df()["total_prices"].iloc[0] == 1
+
+    ingest("b.csv", [["Pikachu", "BASE", "58", "2024-03-02", "11.00", "x"]])
+    assert data_version(get_engine()) != version
+    assert load_prices_df()["price"].tolist() == [10.0, 11.0]
+    assert catalog_summary_df()["total_prices"].iloc[0] == 2
+    assert first["price"].tolist() == [10.0]  # frames handed out earlier are unaffected
+
+    monkeypatch.setenv("POKEPRICER_FRAME_CACHE_MB", "0")
+    misses = frame_cache_stats().misses
+    load_prices_df()
+    assert frame_cache_stats().misses == misses and frame_cache_stats().entries == 0
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+from typer.testing import CliRunner
+
+from poke_pricer.cli import app
+from poke_pricer.ingest.columnar import iter_csv_blocks, validate_block
+from poke_pricer.ingest.schema import PriceRow
+
+HEADER = "name,set_code,number,date,price,source,rarity"
+EDGE_ROWS = [
+    "Eevee,SVI,81/198,2025-01-01,12.50,manual,Common",
+    "Eevee,SVI,81/198,2024-02-29,+1.,,",
+    "Eevee,SVI,81/198,2025-02-29,1,,",  # not a calendar day
+    "Eevee,SVI,81/198,0000-01-01,1,,",
+    "Eevee,SVI,81/198,2025-1-1,1,,",
+    "Eevee,SVI,81/198,2025-01-01T00:00:00,1,,",  # PriceRow accepts midnight datetimes
+    "Eevee,SVI,81/198,2025-01-01, 4 ,,",
+    "Eevee,SVI,81/198,2025-01-01,1_000,,",
+    'Eevee,SVI,81/198,2025-01-01,"1,000",,',
+    "Eevee,SVI,81/198,2025-01-01,inf,,",
+    "Eevee,SVI,81/198,2025-01-01,,,",
+    ",SVI,81/198,2025-01-01,1,,",
+    " ,SVI,81/198,2025-01-01,1,,",
+    "",  # blank lines are not rows
+    "Eevee,SVI,81/198,2025-01-01",  # short row: missing values are None
+    "Eevee,SVI,81/198,2025-01-01,2.5,manual,Rare,extra",
+    '"Mew\nex",PRO,8,2025-01-01,40,,',
+    "Mew,PRO,8,2025-01-01,1e400,,",
+]
+
+
+def _per_row(path: Path) -> list[tuple[bool, int | None, float | None, str]]:
+    out: list[tuple[bool, int | None, float | None, str]] = []
+    with path.open("r", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                pr = PriceRow.model_validate(row)
+            except ValidationError as e:
+                out.append((False, None, None, str(e.errors()[0]["loc"][0])))
+                continue
+            out.append((True, pr.date.toordinal(), pr.price, ""))
+    return out
+
+
+def _columnar(path: Path, size: int) -> list[tuple[bool, int | None, float | None, str]]:
+    out: list[tuple[bool, int | None, float | None, str]] = []
+    for block in iter_csv_blocks(path, size):
+        verdict = validate_block(block)
+        for i in range(len(block.lines)):
+            if verdict.valid[i]:
+                out.append((True, int(verdict.days[i]), float(verdict.prices[i]), ""))
+            else:
+                out.append((False, None, None, verdict.errors[i].split(":")[0]))
+    return out
+
+
+@pytest.mark.parametrize("header", [HEADER, "extra," + HEADER, HEADER + ",name"])
+@pytest.mark.parametrize("size", [1, 4, 1000])
+def test_columnar_matches_price_row(tmp_path: Path, header: str, size: int) -> None:
+    path = tmp_path / "edge.csv"
+    rows = [("x," + r if r and header.startswith("extra") else r) for r in EDGE_ROWS]
+    path.write_text("\n".join([header, *rows]) + "\n")
+    assert _columnar(path, size) == _per_row(path)
+
+
+def test_validate_writes_rejects(tmp_path: Path) -> None:
+    path = tmp_path / "prices.csv"
+    path.write_text("\n".join([HEADER, *EDGE_ROWS[:4], "", *EDGE_ROWS[10:12]]))
+    rejects = tmp_path / "rejects.csv"
+
+    res = CliRunner().invoke(
+        app, ["ingest", "validate", "--file", str(path), "--rejects", str(rejects)]
+    )
+    assert res.exit_code == 0, res.stdout
+    assert "Valid: 2, Invalid: 4" in res.stdout
+
+    with rejects.open(newline="") as f:
+        got = [(r["line"], r["reason"].split(":")[0]) for r in csv.DictReader(f)]
+    assert got == [("4", "date"), ("5", "date"), ("6", "price"), ("7", "name")]
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import re
 from pathlib import Path
+from typing import Any
 
 import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from typer.testing import CliRunner
 
 from poke_pricer.cli import app
+from poke_pricer.ingest.csv_ingest import ingest_csv, ingest_dir_per_file
 
 
 def _runner() -> CliRunner:
@@ -61,3 +66,70 @@ def test_ingest_idempotent(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> N
     assert res.exit_code == 0, res.stdout
     lines2 = export_csv.read_text().strip().splitlines()
     assert len(lines2) == 3
+
+
+def test_bulk_matches_row_by_row(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    csv_path = tmp_path / "mixed.csv"
+    csv_path.write_text(
+        "\n".join(
+            [
+                "name,set_code,number,date,price,source,rarity",
+                "Eevee,SVI,81/198,2025-01-01,12.50,manual,Common",
+                "Eevee,SVI,81/198,2025-01-01,99.00,manual,Common",  # duplicate key
+                "Eevee,SVI,81/198,2025-01-02,12.75,,Common",  # default source
+                "Pikachu,BASE,58/102,2025-01-01,3.10,manual,",
+                "Pikachu,BASE,58/102,not-a-date,3.20,manual,",  # invalid
+                ",BASE,4/102,2025-01-01,300.0,manual,",  # invalid
+            ]
+        )
+    )
+
+    results = {}
+    for bulk in (True, False):
+        monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / f"bulk_{bulk}.db"))
+        first = ingest_csv(csv_path, default_source="csv", bulk=bulk, batch_size=2)
+        again = ingest_csv(csv_path, default_source="csv", bulk=bulk, batch_size=2)
+        results[bulk] = (first, again)
+
+    assert results[True] == results[False]
+    assert results[True] == ((2, 3, 3), (0, 0, 6))
+
+
+def test_new_cards_take_one_transaction_per_batch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    root = tmp_path / "in"
+    root.mkdir()
+    header = "name,set_code,number,date,price,source"
+    # A set release: 3000 new cards in one file, then a second file reusing some of them.
+    (root / "a.csv").write_text(
+        "\n".join([header, *(f"Card {i},NEW,{i},2025-01-01,1.0,x" for i in range(3000))])
+    )
+    (root / "b.csv").write_text(
+        "\n".join([header, *(f"Card {i},NEW,{i},2025-01-02,1.0,x" for i in range(0, 3000, 2))])
+    )
+
+    commits: list[int] = []
+    card_selects: list[str] = []
+
+    def on_commit(conn: Any) -> None:
+        commits.append(1)
+
+    def on_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if statement.lstrip().startswith("SELECT") and re.search(r"FROM card\b", statement):
+            card_selects.append(statement)
+
+    event.listen(Engine, "commit", on_commit)
+    event.listen(Engine, "before_cursor_execute", on_execute)
+    try:
+        per_file = ingest_dir_per_file(root, batch_size=5000)
+    finally:
+        event.remove(Engine, "commit", on_commit)
+        event.remove(Engine, "before_cursor_execute", on_execute)
+
+    assert [r.counts for r in per_file] == [(3000, 3000, 0), (0, 1500, 0)]
+    # Schema check, then one commit per batch and one manifest commit per file. The card map
+    # is loaded once and shared by both files; new card ids come back from the INSERT.
+    assert len(commits) == 1 + 2 + 2
+    assert len(card_selects) == 1
@@ -6,6 +6,8 @@ import pytest
 from typer.testing import CliRunner
 
 from poke_pricer.cli import app
+from poke_pricer.ingest.csv_ingest import ingest_dir_per_file
+from poke_pricer.io.csv_io import export_prices_csv
 
 
 def _runner() -> CliRunner:
@@ -55,3 +57,51 @@ def test_validate_and_dir_ingest(tmp_path: Path, monkeypatch: pytest.MonkeyPatch
     assert res.exit_code == 0, res.stdout
     lines = out_csv.read_text().strip().splitlines()
     assert len(lines) == 3
+
+
+def test_parallel_dir_ingest_matches_serial(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    root = tmp_path / "in"
+    root.mkdir()
+    header = "name,set_code,number,date,price,source"
+    # Overlapping cards and a conflicting (card, date, source) across files: the first
+    # file in sorted order must win, exactly as in the serial run.
+    (root / "a.csv").write_text(
+        "\n".join(
+            [
+                header,
+                "Eevee,SVI,81/198,2025-01-01,12.50,manual",
+                "Pikachu,BASE,58/102,2025-01-01,3.10,manual",
+            ]
+        )
+    )
+    (root / "b.csv").write_text(
+        "\n".join(
+            [
+                header,
+                "Pikachu,BASE,58/102,2025-01-01,9.99,manual",
+                "Mew,PRO,8,2025-01-01,40.00,manual",
+                "Mew,PRO,8,bad-date,40.00,manual",
+            ]
+        )
+    )
+    (root / "c.csv").write_text("\n".join([header, "Eevee,SVI,81/198,2025-01-02,13.00,"]))
+    (root / "signals.csv").write_text("card_id,date,sma_7\n1,2025-01-01,1.0\n")
+
+    runs = {}
+    for workers in (1, 3):
+        monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / f"w{workers}.db"))
+        per_file = ingest_dir_per_file(root, default_source="csv", batch_size=1, workers=workers)
+        export_prices_csv(tmp_path / f"w{workers}.csv")
+        runs[workers] = [(r.path.name, r.counts) for r in per_file]
+
+    assert runs[1] == runs[3]
+    assert runs[1] == [("a.csv", (2, 2, 0)), ("b.csv", (1, 1, 2)), ("c.csv", (0, 1, 0))]
+    assert (tmp_path / "w1.csv").read_text() == (tmp_path / "w3.csv").read_text()
+    assert "3.10" in (tmp_path / "w3.csv").read_text()
+
+    # Already ingested: --force re-reads the files instead of skipping them as unchanged.
+    res = _runner().invoke(app, ["ingest", "dir", "--path", str(root), "--workers", "2", "--force"])
+    assert res.exit_code == 0, res.stdout
+    assert "b.csv: cards_created=0, prices_inserted=0, skipped=3" in res.stdout
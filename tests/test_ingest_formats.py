@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pytest
+from sqlmodel import col, select
+
+from poke_pricer.db import get_session
+from poke_pricer.ingest.columnar import iter_blocks
+from poke_pricer.ingest.csv_ingest import (
+    has_required_header,
+    ingest_csv,
+    ingest_dir_per_file,
+    validate_csv,
+)
+from poke_pricer.models import PricePoint, Source
+
+CSV = (
+    "name,set_code,number,date,price,source,rarity\n"
+    "Eevee,SVI,81/198,2025-01-01,12.50,manual,Common\n"
+    "Eevee,SVI,81/198,2025-02-29,1,,\n"
+    "Eevee,SVI,81/198,2025-01-02\n"
+    '"Mew\nex",PRO,8,2025-01-01,40,,,extra\n'
+    "Mew,PRO,8,2025-01-02,,,\n"
+)
+
+
+def _compressed(tmp_path: Path, fmt: str) -> Path:
+    path = tmp_path / f"prices.{fmt}"
+    opener: Any = {"csv": open, "csv.gz": gzip.open, "csv.bz2": bz2.open, "csv.xz": lzma.open}[fmt]
+    with opener(path, "wt", newline="") as f:
+        f.write(CSV)
+    return path
+
+
+def _typed_table() -> pa.Table:
+    return pa.table(
+        {
+            "name": ["Eevee", "Eevee", "Mew", ""],
+            "set_code": ["SVI", "SVI", "PRO", "PRO"],
+            "number": pa.array([81, 81, 8, 8]),  # ints are read as their text form
+            "date": pa.array([date(2025, 1, 1), date(2025, 1, 2), None, date(2025, 1, 1)]),
+            "price": [12.5, 0.1, 40.0, 1.0],
+            "extra": [1, 2, 3, 4],
+        }
+    )
+
+
+def _rows(path: Path, size: int) -> list[tuple[int, dict[str, str | None]]]:
+    return [
+        (int(line), row)
+        for block in iter_blocks(path, size)
+        for line, row in zip(block.lines.tolist(), block.table.to_pylist(), strict=True)
+    ]
+
+
+@pytest.mark.parametrize("fmt", ["csv.gz", "csv.bz2", "csv.xz"])
+@pytest.mark.parametrize("size", [1, 1000])
+def test_compressed_csv_reads_like_plain(tmp_path: Path, fmt: str, size: int) -> None:
+    plain = _compressed(tmp_path, "csv")
+    assert _rows(_compressed(tmp_path, fmt), size) == _rows(plain, size)
+
+
+@pytest.mark.parametrize("fmt", ["csv.gz", "csv.bz2", "csv.xz"])
+def test_ingest_compressed_csv(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, fmt: str) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    path = _compressed(tmp_path, fmt)
+    assert validate_csv(path) == (2, 3)
+    assert ingest_csv(path) == (2, 2, 3)
+    assert ingest_csv(path, bulk=False) == (0, 0, 5)
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow", ".feather"])
+@pytest.mark.parametrize("bulk", [True, False])
+def test_ingest_table_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, suffix: str, bulk: bool
+) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    path = tmp_path / f"prices{suffix}"
+    if suffix == ".parquet":
+        pq.write_table(_typed_table(), path, row_group_size=3)
+    else:
+        feather.write_feather(_typed_table(), path, chunksize=3)
+
+    assert [line for line, _ in _rows(path, 2)] == [2, 3, 4, 5]
+    assert ingest_csv(path, bulk=bulk, batch_size=3) == (1, 2, 2)
+    with get_session() as session:
+        stmt = select(col(PricePoint.date), col(Source.name), col(PricePoint.price)).join(Source)
+        got = sorted(session.exec(stmt))
+    assert got == [(date(2025, 1, 1), "csv", 12.5), (date(2025, 1, 2), "csv", 0.1)]
+
+
+def test_unreadable_column_is_reported(tmp_path: Path) -> None:
+    path = tmp_path / "prices.parquet"
+    pq.write_table(_typed_table().set_column(0, "name", pa.array([[1]] * 4)), path)
+    with pytest.raises(ValueError, match="'name'"):
+        validate_csv(path)
+
+
+def test_mixed_folder(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    root = tmp_path / "in"
+    root.mkdir()
+    _compressed(root, "csv.gz").rename(root / "a.csv.gz")
+    pq.write_table(_typed_table(), root / "b.parquet")
+    feather.write_feather(_typed_table().drop_columns(["price"]), root / "c.feather")
+    (root / "d.csv").write_text("name,set_code,number,date,price\nPika,SVI,1,2025-01-01,2\n")
+    (root / "e.txt").write_text("name,set_code,number,date,price\n")
+    assert not has_required_header(root / "c.feather")
+    assert has_required_header(root / "a.csv.gz")
+
+    def run() -> list[tuple[str, tuple[int, int, int], str]]:
+        return [(r.path.name, r.counts, r.status) for r in ingest_dir_per_file(root)]
+
+    assert run() == [
+        ("a.csv.gz", (2, 2, 3), "ingested"),
+        ("b.parquet", (1, 2, 2), "ingested"),
+        ("d.csv", (1, 1, 0), "ingested"),
+    ]
+    assert [status for *_, status in run()] == ["unchanged"] * 3
+
+    # A compressed file that grew has no resumable byte offset: it is read in full.
+    with gzip.open(root / "a.csv.gz", "at") as f:
+        f.write("Pika,SVI,1,2025-01-02,3\n")
+    assert run()[0] == ("a.csv.gz", (0, 1, 5), "ingested")
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlmodel import select
+from typer.testing import CliRunner
+
+from poke_pricer.cli import app
+from poke_pricer.db import get_session
+from poke_pricer.ingest.csv_ingest import ingest_dir_per_file
+from poke_pricer.models import IngestedFile
+
+HEADER = "name,set_code,number,date,price,source\n"
+
+
+def _row(day: int, price: str = "1.00") -> str:
+    return f"Eevee,SVI,81/198,2025-01-{day:02d},{price},manual\n"
+
+
+def _run(root: Path, **kwargs: Any) -> list[tuple[str, tuple[int, int, int], str]]:
+    return [
+        (r.path.name, r.counts, r.status) for r in ingest_dir_per_file(root, batch_size=2, **kwargs)
+    ]
+
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_manifest_skips_unchanged_and_resumes_appends(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, bulk: bool
+) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    root = tmp_path / "in"
+    root.mkdir()
+    f = root / "daily.csv"
+    f.write_text(HEADER + _row(1) + _row(2) + "Eevee,SVI,81/198,bad,1.00,manual\n")
+
+    assert _run(root, bulk=bulk) == [("daily.csv", (1, 2, 1), "ingested")]
+    assert _run(root, bulk=bulk) == [("daily.csv", (0, 0, 0), "unchanged")]
+
+    # Appended rows only: nothing already ingested is read (or skipped) again.
+    with f.open("a") as fh:
+        fh.write(_row(3) + _row(4))
+    assert _run(root, bulk=bulk) == [("daily.csv", (0, 2, 0), "appended")]
+
+    # Touching the file costs one hash, not a reingest; the new mtime is remembered.
+    st = f.stat()
+    os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert _run(root, bulk=bulk) == [("daily.csv", (0, 0, 0), "unchanged")]
+
+    with get_session() as session:
+        entry = session.exec(select(IngestedFile)).one()
+    assert entry.path == str(f.resolve())
+    assert (entry.size, entry.mtime_ns) == (f.stat().st_size, f.stat().st_mtime_ns)
+    assert (entry.rows, entry.prices_inserted, entry.prices_skipped) == (5, 4, 1)
+
+    # A rewrite in place is read in full; so is everything with force=True.
+    f.write_text(HEADER + _row(1, "2.00") + _row(2) + _row(5))
+    assert _run(root, bulk=bulk) == [("daily.csv", (0, 1, 2), "ingested")]
+    assert _run(root, bulk=bulk, force=True) == [("daily.csv", (0, 0, 3), "ingested")]
+
+
+def test_append_without_trailing_newline_reingests(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    root = tmp_path / "in"
+    root.mkdir()
+    f = root / "daily.csv"
+    f.write_text(HEADER + _row(1).rstrip("\n"))
+    assert _run(root) == [("daily.csv", (1, 1, 0), "ingested")]
+
+    # The last row was unterminated, so resuming mid-row isn't safe: read it all again.
+    with f.open("a") as fh:
+        fh.write("\n" + _row(2))
+    assert _run(root) == [("daily.csv", (0, 1, 1), "ingested")]
+
+
+def test_cli_force_reprocesses(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    root = tmp_path / "in"
+    root.mkdir()
+    (root / "a.csv").write_text(HEADER + _row(1))
+
+    runner = CliRunner()
+    assert runner.invoke(app, ["ingest", "dir", "--path", str(root)]).exit_code == 0
+    res = runner.invoke(app, ["ingest", "dir", "--path", str(root)])
+    assert res.exit_code == 0, res.stdout
+    assert "a.csv: unchanged, skipped" in res.stdout
+    res = runner.invoke(app, ["ingest", "dir", "--path", str(root), "--force"])
+    assert res.exit_code == 0, res.stdout
+    assert "a.csv: cards_created=0, prices_inserted=0, skipped=1" in res.stdout
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import csv
+import os
+import subprocess
+import sys
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from poke_pricer.ingest.csv_ingest import ingest_csv
+
+# Ingest in a fresh interpreter so ru_maxrss reflects only this run.
+_INGEST_AND_REPORT_RSS = (
+    "import resource, sys\n"
+    "from pathlib import Path\n"
+    "from poke_pricer.ingest.csv_ingest import ingest_csv\n"
+    "res = ingest_csv(Path(sys.argv[1]), batch_size=int(sys.argv[2]))\n"
+    "print(*res, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+)
+
+SLOW = os.environ.get("POKEPRICER_SLOW_TESTS") == "1"
+
+
+def _write_synthetic(path: Path, rows: int, cards: int = 50) -> None:
+    start = date(2000, 1, 1)
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "set_code", "number", "date", "price", "source"])
+        for i in range(rows):
+            c = i % cards
+            day = start + timedelta(days=i // cards)
+            w.writerow([f"Card {c}", "MEM", str(c), day.isoformat(), "1.25", "mem"])
+
+
+def _ingest_peak_rss_kb(tmp_path: Path, rows: int) -> int:
+    csv_path = tmp_path / f"synthetic_{rows}.csv"
+    _write_synthetic(csv_path, rows)
+    env = {**os.environ, "POKEPRICER_SQLITE_PATH": str(tmp_path / f"synthetic_{rows}.db")}
+    proc = subprocess.run(
+        [sys.executable, "-c", _INGEST_AND_REPORT_RSS, str(csv_path), "1000"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    created, inserted, skipped, max_rss_kb = map(int, proc.stdout.split())
+    assert (created, inserted, skipped) == (50, rows, 0)
+    return max_rss_kb
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        100_000,
+        pytest.param(
+            3_000_000,
+            marks=pytest.mark.skipif(not SLOW, reason="set POKEPRICER_SLOW_TESTS=1"),
+        ),
+    ],
+)
+def test_streaming_ingest_memory_is_bounded(tmp_path: Path, rows: int) -> None:
+    pytest.importorskip("resource")  # ru_maxrss is POSIX-only
+    baseline = _ingest_peak_rss_kb(tmp_path, 10_000)
+    large = _ingest_peak_rss_kb(tmp_path, rows)
+    # Materializing rows would cost hundreds of bytes each; allow only fixed overhead.
+    assert large - baseline < 16 * 1024, (baseline, large)
+
+
+def _ingest_peak_traced(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, rows: int) -> int:
+    csv_path = tmp_path / f"traced_{rows}.csv"
+    _write_synthetic(csv_path, rows)
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / f"traced_{rows}.db"))
+    tracemalloc.start()
+    try:
+        assert ingest_csv(csv_path, batch_size=1000) == (50, rows, 0)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_streaming_ingest_peak_does_not_grow_with_rows(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _ingest_peak_traced(tmp_path, monkeypatch, 100)  # imports, engine and schema set-up
+    small = _ingest_peak_traced(tmp_path, monkeypatch, 2_000)
+    large = _ingest_peak_traced(tmp_path, monkeypatch, 16_000)
+    # Holding the rows would cost hundreds of bytes each; peak Python allocations stay
+    # at one batch's worth whatever the file size.
+    assert large - small < 64 * 14_000, (small, large)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from poke_pricer.analytics.data_access import load_prices_df
+from poke_pricer.cli import app
+from poke_pricer.ingest.watch import FolderWatcher
+
+HEADER = "name,set_code,number,date,price,source\n"
+
+
+def _row(day: int) -> str:
+    return f"Eevee,SVI,81/198,2025-01-{day:02d},1.00,manual\n"
+
+
+def _polled(watcher: FolderWatcher) -> list[tuple[str, tuple[int, int, int], str]]:
+    return [(r.path.name, r.counts, r.status) for r in watcher.poll()]
+
+
+def test_watch_ingests_and_archives(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    root = tmp_path / "in"
+    root.mkdir()
+    archive = tmp_path / "archive"
+    with FolderWatcher(root, archive_dir=archive, settle=0) as watcher:
+        assert _polled(watcher) == []
+
+        (root / "a.csv").write_text(HEADER + _row(1) + _row(2))
+        (root / "notes.csv").write_text("ticker,close\nX,1\n")  # not a price file
+        assert _polled(watcher) == [("a.csv", (1, 2, 0), "ingested")]
+
+        # Same name again: archived next to the first; the card map is still warm.
+        (root / "a.csv").write_text(HEADER + _row(2) + _row(3))
+        with gzip.open(root / "b.csv.gz", "wt") as f:
+            f.write(HEADER + _row(4))
+        assert _polled(watcher) == [
+            ("a.csv", (0, 1, 1), "ingested"),
+            ("b.csv.gz", (0, 1, 0), "ingested"),
+        ]
+        stats = watcher.stats
+
+    assert sorted(p.name for p in archive.iterdir()) == ["1_a.csv", "a.csv", "b.csv.gz"]
+    assert sorted(p.name for p in root.iterdir()) == ["notes.csv"]
+    assert (stats.polls, stats.files, stats.rows, stats.prices_inserted) == (3, 3, 5, 4)
+    assert stats.rows_per_second > 0 and stats.max_lag >= stats.last_lag >= 0
+
+
+def test_watch_resumes_grown_files_and_waits_for_writers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    root = tmp_path / "in"
+    root.mkdir()
+    f = root / "daily.csv"
+    f.write_text(HEADER + _row(1))
+
+    with FolderWatcher(root, settle=60) as watcher:
+        assert _polled(watcher) == []  # still being written, as far as we know
+        st = f.stat()
+        os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns - 120 * 10**9))
+        assert _polled(watcher) == [("daily.csv", (1, 1, 0), "ingested")]
+        assert _polled(watcher) == []  # nothing changed: not even planned
+
+        with f.open("a") as fh:
+            fh.write(_row(2))
+        st = f.stat()
+        os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns - 120 * 10**9))
+        assert _polled(watcher) == [("daily.csv", (0, 1, 0), "appended")]
+        assert watcher.stats.max_lag >= 120
+
+
+def test_watch_survives_bad_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    root = tmp_path / "in"
+    root.mkdir()
+    bad = root / "bad.csv.gz"
+    bad.write_bytes(gzip.compress((HEADER + _row(1)).encode())[:-12])  # truncated
+    (root / "good.csv").write_text(HEADER + _row(2))
+
+    with FolderWatcher(root, archive_dir=tmp_path / "archive", settle=0) as watcher:
+        results = watcher.poll()
+        assert [(r.path.name, r.status) for r in results] == [
+            ("bad.csv.gz", "failed"),
+            ("good.csv", "ingested"),
+        ]
+        assert results[0].error
+        assert _polled(watcher) == []  # not retried until it changes
+        with gzip.open(bad, "wt") as fh:
+            fh.write(HEADER + _row(1))
+        assert _polled(watcher) == [("bad.csv.gz", (0, 1, 0), "ingested")]
+        assert (watcher.stats.files, watcher.stats.failed) == (2, 1)
+
+
+def test_watch_keeps_counts_when_archiving_fails(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    root = tmp_path / "in"
+    root.mkdir()
+    (root / "a.csv").write_text(HEADER + _row(1) + _row(2))
+
+    def refuse(src: Path, dst: Path) -> Path:
+        raise PermissionError(f"cannot move {src}")
+
+    monkeypatch.setattr(shutil, "move", refuse)
+    with FolderWatcher(root, archive_dir=tmp_path / "archive", settle=0) as watcher:
+        [result] = watcher.poll()
+        assert (result.counts, result.status, result.archived) == ((1, 2, 0), "ingested", None)
+        assert result.error and "cannot move" in result.error
+        stats = watcher.stats
+        assert (stats.files, stats.failed, stats.prices_inserted) == (1, 0, 2)
+        assert _polled(watcher) == []  # left in place, not ingested again
+    assert len(load_prices_df()) == 2  # committed, not rolled back
+    assert (root / "a.csv").exists()
+
+
+def test_cli_watch_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    root = tmp_path / "in"
+    root.mkdir()
+    (root / "a.csv").write_text(HEADER + _row(1))
+    archive = tmp_path / "archive"
+
+    res = CliRunner().invoke(
+        app,
+        ["ingest", "watch", "--path", str(root), "--archive", str(archive)]
+        + ["--settle", "0", "--once"],
+    )
+    assert res.exit_code == 0, res.stdout
+    assert "a.csv: cards_created=1, prices_inserted=1, skipped=0" in res.stdout
+    assert "Watch stopped" in res.stdout and "files=1" in res.stdout
+    assert (archive / "a.csv").exists()
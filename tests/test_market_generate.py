@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlmodel import func, select
+from typer.testing import CliRunner
+
+from poke_pricer.cli import app
+from poke_pricer.db import get_session
+from poke_pricer.ingest.csv_ingest import ingest_csv
+from poke_pricer.models import Card, PricePoint
+from poke_pricer.services.market import generate_market, write_market_db, write_market_file
+
+END = date(2025, 1, 31)
+
+
+def _prices(cards: int, days: int, sources: int, seed: int) -> list[tuple[int, date, str, float]]:
+    out: list[tuple[int, date, str, float]] = []
+    for chunk in generate_market(cards, days, sources, seed, end=END):
+        p = chunk.prices
+        out += zip(
+            p.column("card_id").to_pylist(),
+            p.column("date").to_pylist(),
+            p.column("source").to_pylist(),
+            p.column("price").to_pylist(),
+            strict=True,
+        )
+    return out
+
+
+def test_market_is_seeded_and_shaped() -> None:
+    rows = _prices(1200, 120, 4, seed=7)
+    assert rows == _prices(1200, 120, 4, seed=7)
+    assert rows != _prices(1200, 120, 4, seed=8)
+
+    assert rows == sorted(rows)  # (card_id, date, source): the unique key's order
+    assert {r[2] for r in rows} == {"cardmarket", "ebay", "pricecharting", "tcgplayer"}
+    assert all(r[3] >= 0.01 for r in rows)
+    days = {r[1] for r in rows}
+    assert min(days) >= date(2024, 10, 4) and max(days) == END
+
+    first_day: dict[int, date] = {}
+    per_card: dict[int, int] = {}
+    for card_id, day, _, _ in rows:
+        first_day.setdefault(card_id, day)
+        per_card[card_id] = per_card.get(card_id, 0) + 1
+    assert len(first_day) == 1200
+    assert max(first_day.values()) > date(2024, 11, 1)  # sets released mid-history
+    assert max(per_card.values()) < 120 * 4  # gaps and partial source coverage
+
+
+def test_db_and_file_hold_the_same_market(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "gen.db"))
+    n_generated = len(_prices(300, 30, 2, 3))
+    assert write_market_db(generate_market(300, 30, 2, 3, end=END)) == (300, n_generated)
+    with pytest.raises(ValueError, match="already has cards"):
+        write_market_db(generate_market(10, 3, end=END))
+    with get_session() as session:
+        n_prices = session.exec(select(func.count()).select_from(PricePoint)).one()
+        generated = sorted((c.name, c.set_code, c.number) for c in session.exec(select(Card)))
+
+    out = tmp_path / "market.csv.gz"
+    assert write_market_file(generate_market(300, 30, 2, 3, end=END), out) == (300, n_prices)
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "ingested.db"))
+    assert ingest_csv(out) == (300, n_prices, 0)
+    with get_session() as session:
+        ingested = sorted((c.name, c.set_code, c.number) for c in session.exec(select(Card)))
+    assert ingested == generated
+
+
+def test_cli_demo_generate(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    runner = CliRunner()
+    args = ["demo", "generate", "--cards", "50", "--days", "10", "--end", "2025-01-31"]
+    res = runner.invoke(app, args)
+    assert res.exit_code == 0, res.stdout
+    assert "Generated 50 cards" in res.stdout
+
+    out = tmp_path / "m.parquet"
+    res = runner.invoke(app, [*args, "--sources", "2", "--out", str(out)])
+    assert res.exit_code == 0, res.stdout
+    assert out.exists()
+
+    res = runner.invoke(app, [*args, "--out", str(tmp_path / "m.txt")])
+    assert res.exit_code != 0
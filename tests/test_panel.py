@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from poke_pricer.analytics import signals as signals_module
+from poke_pricer.analytics.backtest import backtest_momentum_topk
+from poke_pricer.analytics.data_access import load_prices_df
+from poke_pricer.analytics.movers import compute_top_movers
+from poke_pricer.analytics.panel import PricePanel, ffill, rank, returns, rolling, shift
+from poke_pricer.analytics.signals import compute_signals
+from poke_pricer.reports.anomalies import scan_anomalies_df
+from poke_pricer.reports.top_movers import compute_top_movers as report_top_movers
+from poke_pricer.services.market import generate_market, write_market_db
+
+NAN = np.nan
+
+
+def _prices() -> pd.DataFrame:
+    """Card 7 on Jan 1, 2 (two sources), 5; card 3 on Jan 3 and 4."""
+    rows = [
+        (7, "2025-01-01", "a", 10.0),
+        (7, "2025-01-02", "a", 11.0),
+        (7, "2025-01-02", "b", 13.0),
+        (3, "2025-01-03", "a", 4.0),
+        (3, "2025-01-04", "a", 5.0),
+        (7, "2025-01-05", "b", 15.0),
+    ]
+    df = pd.DataFrame(rows, columns=["card_id", "date", "source", "price"])
+    df["date"] = pd.to_datetime(df["date"])
+    df["name"] = df["card_id"].map({7: "Eevee", 3: "Mew"})
+    df["set_code"], df["number"] = "JUN", df["card_id"].astype(str)
+    return df
+
+
+def test_panel_from_frame() -> None:
+    panel = PricePanel.from_frame(_prices())
+    assert panel.shape == (2, 5)
+    np.testing.assert_array_equal(panel.card_ids, [3, 7])
+    assert panel.dates[0] == np.datetime64("2025-01-01") and np.all(
+        np.diff(panel.dates) == np.timedelta64(1, "D")
+    )
+    np.testing.assert_array_equal(
+        panel.values,
+        [[NAN, NAN, 4.0, 5.0, NAN], [10.0, 12.0, NAN, NAN, 15.0]],  # mean over sources
+    )
+    np.testing.assert_array_equal(panel.source_values("b")[1], [NAN, 13.0, NAN, NAN, 15.0])
+    assert np.isnan(panel.source_values("unknown")).all()
+    dup = pd.concat([_prices(), _prices().iloc[[0]].assign(price=12.0)])  # 10 and 12 on Jan 1
+    np.testing.assert_array_equal(PricePanel.from_frame(dup).source_values("a")[1, :2], [11, 11])
+    assert panel.cards["name"].tolist() == ["Mew", "Eevee"]
+    assert panel.day_index("2025-01-05") == 4 and panel.day_index(date(2025, 1, 6)) is None
+    assert PricePanel.of(panel) is panel
+
+
+def test_panel_primitives() -> None:
+    v = np.array([[1.0, NAN, 3.0, 4.0, NAN, 8.0], [2.0, 2.0, NAN, NAN, NAN, 1.0]])
+    np.testing.assert_array_equal(shift(v, 2)[0], [NAN, NAN, 1.0, NAN, 3.0, 4.0])
+    np.testing.assert_array_equal(shift(v, -1)[1], [2.0, NAN, NAN, NAN, 1.0, NAN])
+    np.testing.assert_array_equal(ffill(v)[0], [1.0, 1.0, 3.0, 4.0, 4.0, 8.0])
+    # Against the last price on or before the day before (two days before)
+    np.testing.assert_allclose(returns(v)[0], [NAN, NAN, 2.0, 1 / 3, NAN, 1.0])
+    np.testing.assert_array_equal(returns(v, 2)[1], [NAN, NAN, NAN, NAN, NAN, -0.5])
+    np.testing.assert_array_equal(rolling(v, 3, "mean")[0], [1.0, 1.0, 2.0, 3.5, 3.5, 6.0])
+    np.testing.assert_array_equal(rolling(v, 3, "count")[1], [1, 2, 2, 1, NAN, 1])
+    np.testing.assert_array_equal(rolling(v, 3, "max", min_periods=2)[0], [NAN, NAN, 3, 4, 4, 8])
+    np.testing.assert_array_equal(rolling(v, 2, "min")[1], [2.0, 2.0, 2.0, NAN, NAN, 1.0])
+    np.testing.assert_array_equal(rank(v)[:, 0], [2.0, 1.0])
+    np.testing.assert_array_equal(rank(v, ascending=True)[:, 5], [2.0, 1.0])
+    np.testing.assert_array_equal(rank(np.ones((3, 1)))[:, 0], [1.0, 2.0, 3.0])  # card order
+    assert np.isnan(rank(v)[1, 3])
+    with pytest.raises(ValueError):
+        rolling(v, 0)
+
+
+def test_analytics_over_calendar_days() -> None:
+    df = _prices()
+    sig = compute_signals(df, windows=[2])
+    eevee = sig[sig["card_id"] == 7].reset_index(drop=True)
+    # A row per (card, date, source), each source a series of its own
+    assert eevee["date"].dt.day.tolist() == [1, 2, 2, 5]
+    assert eevee["source"].tolist() == ["a", "a", "b", "b"]
+    np.testing.assert_allclose(eevee["ret"], [NAN, 0.1, NAN, 15 / 13 - 1])
+    # Jan 5 against source b's last price by Jan 3: 13 on Jan 2
+    np.testing.assert_allclose(eevee["mom_2"], [NAN, NAN, NAN, 15 / 13 - 1])
+    np.testing.assert_allclose(eevee["sma_2"], [NAN, 10.5, NAN, 15.0])
+    assert "source" not in compute_signals(df.drop(columns="source"), windows=[2]).columns
+
+    movers = compute_top_movers(df, k=1, on_date="2025-01-05")
+    assert movers[["source", "price", "return_1d"]].values.tolist() == [
+        ["b", 15.0, pytest.approx(15 / 13 - 1)],  # against source b's own Jan 2 price
+        ["b", 15.0, pytest.approx(15 / 13 - 1)],
+    ]
+    assert compute_top_movers(df, on_date="2025-02-01").empty
+
+    top = report_top_movers(df, window_days=3, top_k=5)
+    assert top["card_id"].tolist() == [7]  # card 3's history doesn't reach 3 days back
+    assert top["ret_window"].iloc[0] == pytest.approx(15 / 13 - 1)  # source b's own return
+
+
+def test_one_panel_serves_every_function(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "t.db"))
+    write_market_db(generate_market(30, 60, 2, end=date(2025, 3, 1)))
+    df = load_prices_df()
+    panel = PricePanel.from_frame(df)
+    pd.testing.assert_frame_equal(compute_signals(panel), compute_signals(df))
+    pd.testing.assert_frame_equal(
+        backtest_momentum_topk(panel, top_k=3), backtest_momentum_topk(df, top_k=3)
+    )
+    pd.testing.assert_frame_equal(compute_top_movers(panel), compute_top_movers(df))
+    pd.testing.assert_frame_equal(scan_anomalies_df(panel), scan_anomalies_df(df))
+    pd.testing.assert_frame_equal(report_top_movers(panel), report_top_movers(df))
+    assert len(backtest_momentum_topk(panel, top_k=3)) > 0
+    assert backtest_momentum_topk(df.iloc[:0]).columns.tolist() == [
+        "date",
+        "portfolio_return",
+        "equity",
+    ]
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_signals_equal_panel_primitives_exactly(
+    dtype: type, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(signals_module, "_BLOCK_CELLS", 1_000)  # running totals in blocks
+    rng = np.random.default_rng(7)
+    n = 4_000
+    df = pd.DataFrame(
+        {
+            "card_id": rng.integers(0, 60, n),
+            "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 400, n), "D"),
+            "source": rng.choice(["a", "b"], n),
+            "price": rng.lognormal(3, 1, n).astype(dtype),
+        }
+    ).drop_duplicates(["card_id", "date", "source"])
+    windows = [1, 3, 7, 30, 365, 1000]
+    panel = PricePanel.from_frame(df)
+    signals = compute_signals(df, windows=windows)
+
+    # The same signals from the dense primitives on each source's layer
+    cells: list[tuple[np.ndarray, ...]] = []
+    columns: dict[str, list[np.ndarray]] = {}
+    for k, source in enumerate(panel.sources):
+        v = panel.source_values(source)
+        age = np.arange(1, v.shape[1] + 1) - np.argmax(~np.isnan(v), axis=1)[:, None]
+        dense = {"price": v, "ret": returns(v, 1)}
+        for w in windows:
+            dense[f"sma_{w}"] = np.where(age >= w, rolling(v, w, "mean"), np.nan)
+            dense[f"mom_{w}"] = returns(v, w)
+        card, day = np.nonzero(~np.isnan(v))
+        cells.append((card, np.full(len(card), k), day))
+        for name, values in dense.items():
+            columns.setdefault(name, []).append(values[card, day])
+    card, code, day = (np.concatenate(parts) for parts in zip(*cells, strict=True))
+    expected = panel.source_cells_frame(
+        card, code, day, {name: np.concatenate(parts) for name, parts in columns.items()}
+    )
+    pd.testing.assert_frame_equal(signals, expected, check_exact=True)
+    assert signals["sma_30"].notna().any() and signals["mom_365"].notna().any()
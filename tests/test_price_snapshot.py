@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import csv
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from poke_pricer.analytics import data_access, snapshot
+from poke_pricer.analytics.data_access import iter_prices, load_prices_df, price_snapshot
+from poke_pricer.analytics.snapshot import merge_rows
+from poke_pricer.cli import app
+from poke_pricer.db import data_version, get_engine
+from poke_pricer.ingest.csv_ingest import ingest_csv
+from poke_pricer.services.archive import archive_prices
+from poke_pricer.services.market import generate_market, write_market_file
+
+
+def _ingest(path: Path, rows: list[list[str]]) -> None:
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "set_code", "number", "date", "price", "source"])
+        w.writerows(rows)
+    ingest_csv(path)
+
+
+def _from_sql(monkeypatch: pytest.MonkeyPatch, start: date | None = None) -> pd.DataFrame:
+    with monkeypatch.context() as m:
+        m.setenv("POKEPRICER_PRICE_SNAPSHOT", "0")
+        return load_prices_df(start)
+
+
+def test_snapshot_is_reused_refreshed_and_rebuilt(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "t.db"))
+    monkeypatch.setenv("POKEPRICER_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("POKEPRICER_FRAME_CACHE_MB", "0")
+    market = tmp_path / "market.csv"
+    write_market_file(generate_market(20, 400, 2, end=date(2025, 1, 31)), market)
+    ingest_csv(market)
+    calls: list[str] = []
+    build, refresh = data_access._build_snapshot, data_access._refresh_snapshot
+
+    def counted_build(*args: Any) -> Any:
+        calls.append("build")
+        return build(*args)
+
+    def counted_refresh(*args: Any) -> Any:
+        calls.append("refresh")
+        return refresh(*args)
+
+    monkeypatch.setattr(data_access, "_build_snapshot", counted_build)
+    monkeypatch.setattr(data_access, "_refresh_snapshot", counted_refresh)
+
+    token, generation = data_version(get_engine()) or ("", 0)
+    # Windowed and chunked loads don't build it: they read their slice from SQL.
+    recent = load_prices_df(start=date(2025, 1, 1))
+    assert sum(len(c) for c in iter_prices(end=date(2024, 6, 30), chunk_cards=7)) > 0
+    assert calls == [] and not (tmp_path / "data" / "snapshots").exists()
+    pd.testing.assert_frame_equal(load_prices_df(), _from_sql(monkeypatch))
+    snap = price_snapshot()
+    assert snap is not None and snap.path == tmp_path / "data" / "snapshots" / token / (
+        f"g{generation}"
+    )
+    assert isinstance(snap.rows["price"], np.memmap) and calls == ["build"]
+    pd.testing.assert_frame_equal(recent, _from_sql(monkeypatch, date(2025, 1, 1)))
+    pd.testing.assert_frame_equal(load_prices_df(start=date(2025, 1, 1)), recent)
+
+    # New rows, some dated before existing ones of the same card: merged in, not re-read.
+    first = load_prices_df().iloc[0]
+    card = [first["name"], first["set_code"], first["number"]]
+    _ingest(
+        tmp_path / "more.csv",
+        [
+            [*card, "2025-02-01", "1.50", "tcgplayer"],
+            [*card, "2024-01-01", "0.50", "ebay"],
+            [*card, str(first["date"].date()), "2.25", "newsource"],
+            ["Brand New", "NEW", "1", "2024-06-01", "3.00", "tcgplayer"],
+        ],
+    )
+    assert price_snapshot(refresh=False) is None  # stale
+    load_prices_df(start=date(2025, 1, 1))
+    list(iter_prices(chunk_cards=7))
+    assert calls == ["build"]  # neither refreshes it
+    base_mtime = (snap.path / "price.npy").stat().st_mtime_ns
+    refreshed = price_snapshot()
+    assert calls == ["build", "refresh"] and refreshed is not None
+    # Appended as a delta beside the base; the base's files are left as they were.
+    assert refreshed.path == snap.path and refreshed.deltas == 1
+    assert refreshed.added is not None and len(refreshed.added["id"]) == 3
+    assert (snap.path / "price.npy").stat().st_mtime_ns == base_mtime
+    assert (snap.path / f"d{refreshed.version[1]}-{generation}").is_dir()
+    pd.testing.assert_frame_equal(load_prices_df(), _from_sql(monkeypatch))
+    same_day = load_prices_df(card_ids=[int(first["card_id"])], end=first["date"].date())
+    assert same_day["source"].iloc[-1] == "newsource"  # after the older rows of its day
+    chunks = list(iter_prices(chunk_cards=7))
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), load_prices_df())
+
+    with get_engine().connect() as conn:
+        rebuilt = build(conn, refreshed.version)
+    merged = merge_rows(refreshed.rows, refreshed.added)
+    for f, values in rebuilt.rows.items():
+        np.testing.assert_array_equal(merged[f], values)
+    assert rebuilt.watermarks == refreshed.watermarks
+
+    # Past the delta budget, the refresh writes a new base instead.
+    monkeypatch.setattr(snapshot, "_MAX_DELTAS", 1)
+    _ingest(tmp_path / "next.csv", [[*card, "2025-02-03", "1.60", "tcgplayer"]])
+    compacted = price_snapshot()
+    assert compacted is not None and compacted.added is None and compacted.deltas == 0
+    assert compacted.path != snap.path and not snap.path.exists()  # old base removed
+    pd.testing.assert_frame_equal(load_prices_df(), _from_sql(monkeypatch))
+
+    # Archiving moves rows between partitions: the next refresh reads everything again.
+    archive_prices(2025)
+    _ingest(tmp_path / "late.csv", [[*card, "2025-02-02", "1.75", "tcgplayer"]])
+    calls.clear()
+    pd.testing.assert_frame_equal(load_prices_df(), _from_sql(monkeypatch))
+    assert calls == ["refresh", "build"]
+    chunks = list(iter_prices(chunk_cards=7))
+    assert len(chunks) == 3 and calls == ["refresh", "build"]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), load_prices_df())
+
+    monkeypatch.setenv("POKEPRICER_PRICE_SNAPSHOT", "0")
+    assert price_snapshot() is None
+
+
+def test_db_snapshot_command(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "t.db"))
+    _ingest(tmp_path / "a.csv", [["Pikachu", "BASE", "58", "2024-03-01", "10.00", "x"]])
+    res = CliRunner().invoke(app, ["db", "snapshot"])
+    assert res.exit_code == 0, res.output
+    assert "Snapshot of 1 price rows" in res.output and "MiB" in res.output
+
+    monkeypatch.setenv("POKEPRICER_PRICE_SNAPSHOT", "0")
+    res = CliRunner().invoke(app, ["db", "snapshot"])
+    assert res.exit_code == 0 and "off" in res.output
@@ -35,3 +35,23 @@ def test_prices_export_csv(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> N
         "price",
     ]
     assert text[0].split(",") == expected_header
+
+
+def test_prices_memory_report(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    assert _runner().invoke(app, ["demo", "seed"]).exit_code == 0
+    result = _runner().invoke(app, ["prices", "memory"])
+    assert result.exit_code == 0, result.stdout
+    lines = result.stdout.splitlines()
+    assert lines[0].split() == ["column", "default", "compact", "compact_float32"]
+    assert [line.split()[0] for line in lines[1:9]] == [
+        "card_id",
+        "name",
+        "set_code",
+        "number",
+        "date",
+        "source",
+        "price",
+        "total",
+    ]
+    assert "of default" in lines[-1]
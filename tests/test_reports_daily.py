@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import csv
 from pathlib import Path
 
+import pandas as pd
 import pytest
 from typer.testing import CliRunner
 
 from poke_pricer.cli import app
+from poke_pricer.ingest.csv_ingest import ingest_csv
+from poke_pricer.reports.daily import write_daily_reports
 
 
 def _runner() -> CliRunner:
@@ -28,3 +32,31 @@ def test_reports_daily(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     assert (out_dir / "top_movers.csv").exists()
     # latest_prices.csv may be empty but should be written
     assert (out_dir / "latest_prices.csv").exists()
+
+
+def test_latest_prices_has_every_source(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "test.db"))
+    rows = [
+        ["Eevee", "SVI", "81", "2025-01-02", "11.00", "b"],
+        ["Eevee", "SVI", "81", "2025-01-02", "10.00", "a"],
+        ["Eevee", "SVI", "81", "2025-01-01", "9.00", "a"],
+        ["Mew", "PRO", "8", "2025-01-01", "40.00", "a"],  # not priced on the latest date
+    ]
+    path = tmp_path / "p.csv"
+    with path.open("w", newline="") as f:
+        csv.writer(f).writerows([["name", "set_code", "number", "date", "price", "source"], *rows])
+    ingest_csv(path)
+
+    write_daily_reports(tmp_path / "bundle")
+    latest = pd.read_csv(tmp_path / "bundle" / "latest_prices.csv")
+    assert list(latest.columns) == [
+        "card_id",
+        "name",
+        "set_code",
+        "number",
+        "source",
+        "price",
+        "date",
+    ]
+    assert sorted(zip(latest["source"], latest["price"], strict=True)) == [("a", 10.0), ("b", 11.0)]
+    assert set(latest["name"]) == {"Eevee"} and set(latest["date"]) == {"2025-01-02"}
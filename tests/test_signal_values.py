@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import csv
+from collections.abc import Sequence
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from typer.testing import CliRunner
+
+from poke_pricer.analytics.data_access import load_prices_df
+from poke_pricer.analytics.signals import compute_signals
+from poke_pricer.cli import app
+from poke_pricer.db import get_engine
+from poke_pricer.ingest.csv_ingest import ingest_csv
+from poke_pricer.services.archive import archive_prices
+from poke_pricer.services.market import generate_market, write_market_db
+from poke_pricer.services.signal_values import load_signal_values, materialize_signals
+
+
+def _ingest(path: Path, rows: list[list[str]]) -> None:
+    with path.open("w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "set_code", "number", "date", "price", "source"])
+        w.writerows(rows)
+    ingest_csv(path)
+
+
+def _table() -> Sequence[Any]:
+    """Every stored column of every row, as stored."""
+    with get_engine().connect() as conn:
+        return conn.execute(
+            text('SELECT * FROM signal_values ORDER BY card_id, source, date, "window"')
+        ).all()
+
+
+def _card(df: pd.DataFrame, i: int) -> list[str]:
+    row = df[df["card_id"] == df["card_id"].unique()[i]].iloc[0]
+    return [row["name"], row["set_code"], row["number"]]
+
+
+def test_incremental_equals_full_rebuild(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "t.db"))
+    write_market_db(generate_market(25, 120, 2, end=date(2025, 4, 30)))
+    run = materialize_signals()
+    assert run.full and run.windows == (7, 14, 30) and run.cards == 25
+
+    # The table holds compute_signals, a row per (card, source, date) and window.
+    expected = compute_signals(load_prices_df())
+    stored = load_signal_values()
+    sma_7 = stored[stored["window"] == 7].reset_index(drop=True)
+    assert sma_7["source"].tolist() == expected["source"].tolist()
+    pd.testing.assert_series_equal(sma_7["sma"], expected["sma_7"], check_names=False)
+    pd.testing.assert_series_equal(sma_7["ret"], expected["ret"], check_names=False)
+    mom_30 = stored[stored["window"] == 30].reset_index(drop=True)
+    pd.testing.assert_series_equal(mom_30["mom"], expected["mom_30"], check_names=False)
+    assert len(stored) == 3 * len(expected)
+
+    df = load_prices_df()
+    rounds = [
+        [  # a nightly ingest: the next day for some cards
+            *([*_card(df, i), "2025-05-01", f"{10 + i}.25", "tcgplayer"] for i in range(5)),
+            ["Brand New", "NEW", "1", "2025-05-01", "3.00", "tcgplayer"],
+        ],
+        [  # a late price between observed days, another source on a stored day, a backfill
+            [*_card(df, 7), "2025-03-15", "7.75", "newsource"],
+            [*_card(df, 8), "2025-04-30", "1.00", "newsource"],
+            [*_card(df, 9), "2024-12-01", "2.00", "tcgplayer"],
+            ["Brand New", "NEW", "1", "2025-05-03", "3.50", "tcgplayer"],
+        ],
+    ]
+    for k, rows in enumerate(rounds):
+        _ingest(tmp_path / f"more{k}.csv", rows)
+        run = materialize_signals()
+        assert not run.full and run.cards == len(rows)
+        incremental = _table()
+        assert materialize_signals(full=True).full
+        assert _table() == incremental
+    stored = load_signal_values(card_ids=[int(df["card_id"].iloc[0])])
+    assert stored["date"].max() == pd.Timestamp("2025-05-01")
+
+    assert materialize_signals().rows == 0  # nothing new
+    assert materialize_signals([30, 5]).full  # other windows: rebuilt
+    assert set(load_signal_values()["window"]) == {5, 30}
+    assert materialize_signals().windows == (5, 30)  # kept
+    archive_prices(2025)  # rows moved between partitions: rebuilt
+    assert materialize_signals().full
+    with pytest.raises(ValueError):
+        materialize_signals([0])
+
+
+def test_cli_signals_materialize(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("POKEPRICER_SQLITE_PATH", str(tmp_path / "t.db"))
+    write_market_db(generate_market(5, 40, 1, end=date(2025, 1, 31)))
+    observed = len(compute_signals(load_prices_df()))
+    runner = CliRunner()
+    result = runner.invoke(app, ["signals", "materialize", "--window", "10"])
+    assert result.exit_code == 0, result.output
+    assert "Rebuilt" in result.output and f"{observed} rows for 5 cards" in result.output
+    result = runner.invoke(app, ["signals", "materialize"])
+    assert result.exit_code == 0 and "Updated" in result.output
+    assert np.array_equal(load_signal_values()["window"].unique(), [10])
+    result = runner.invoke(app, ["signals", "materialize", "--window", "0"])
+    assert result.exit_code != 0